@@ -0,0 +1,139 @@
+"""partition_integration_audit_logs
+
+Revision ID: 3c6d8e1f2a47
+Revises: e5b12c49c0d1
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c6d8e1f2a47"
+down_revision: Union[str, Sequence[str], None] = "e5b12c49c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of time; later months are added by
+# api/scripts/manage_audit_partitions.py
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(month: date) -> None:
+    op.execute(
+        f"CREATE TABLE integration_audit_logs_p{month:%Y%m} "
+        "PARTITION OF integration_audit_logs "
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{_add_months(month, 1).isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    op.drop_index("ix_integration_audit_logs_created_at", table_name="integration_audit_logs")
+    op.drop_index("ix_integration_audit_logs_provider", table_name="integration_audit_logs")
+    op.drop_index("ix_integration_audit_logs_event", table_name="integration_audit_logs")
+    op.drop_index("ix_integration_audit_logs_user_id", table_name="integration_audit_logs")
+    op.rename_table("integration_audit_logs", "integration_audit_logs_old")
+    op.execute(
+        "ALTER INDEX integration_audit_logs_pkey "
+        "RENAME TO integration_audit_logs_old_pkey"
+    )
+
+    # The partition key must be part of the primary key
+    op.create_table(
+        "integration_audit_logs",
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", sa.UUID(as_uuid=True), nullable=True),
+        sa.Column("event", sa.String(), nullable=False),
+        sa.Column("provider", sa.String(), nullable=True),
+        sa.Column("metadata_json", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="integration_audit_logs_user_id_fkey", ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id", "created_at", name="integration_audit_logs_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    # Indexes on the partitioned table are created on every partition
+    op.create_index(
+        "ix_integration_audit_logs_user_id_created_at",
+        "integration_audit_logs",
+        ["user_id", sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.create_index("ix_integration_audit_logs_created_at", "integration_audit_logs", ["created_at"], unique=False)
+    op.create_index("ix_integration_audit_logs_event", "integration_audit_logs", ["event"], unique=False)
+    op.create_index("ix_integration_audit_logs_provider", "integration_audit_logs", ["provider"], unique=False)
+
+    # Rows outside every monthly partition (e.g. if the partition job stops
+    # running) land here instead of failing the insert
+    op.execute(
+        "CREATE TABLE integration_audit_logs_default "
+        "PARTITION OF integration_audit_logs DEFAULT"
+    )
+
+    today = datetime.now(timezone.utc).date()
+    # Offline (--sql) runs cannot look at the data; older rows then land in
+    # the default partition
+    oldest = None
+    if not context.is_offline_mode():
+        oldest = op.get_bind().execute(
+            sa.text("SELECT min(created_at) FROM integration_audit_logs_old")
+        ).scalar()
+    month = (oldest.date() if oldest else today).replace(day=1)
+    last = _add_months(today.replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        _create_month_partition(month)
+        month = _add_months(month, 1)
+
+    op.execute(
+        "INSERT INTO integration_audit_logs "
+        "(id, user_id, event, provider, metadata_json, created_at) "
+        "SELECT id, user_id, event, provider, metadata_json, created_at "
+        "FROM integration_audit_logs_old"
+    )
+    op.drop_table("integration_audit_logs_old")
+
+
+def downgrade() -> None:
+    op.rename_table("integration_audit_logs", "integration_audit_logs_partitioned")
+    op.execute(
+        "ALTER INDEX integration_audit_logs_pkey "
+        "RENAME TO integration_audit_logs_partitioned_pkey"
+    )
+    op.drop_index("ix_integration_audit_logs_user_id_created_at", table_name="integration_audit_logs_partitioned")
+    op.drop_index("ix_integration_audit_logs_created_at", table_name="integration_audit_logs_partitioned")
+    op.drop_index("ix_integration_audit_logs_event", table_name="integration_audit_logs_partitioned")
+    op.drop_index("ix_integration_audit_logs_provider", table_name="integration_audit_logs_partitioned")
+
+    op.create_table(
+        "integration_audit_logs",
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", sa.UUID(as_uuid=True), nullable=True),
+        sa.Column("event", sa.String(), nullable=False),
+        sa.Column("provider", sa.String(), nullable=True),
+        sa.Column("metadata_json", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="integration_audit_logs_user_id_fkey", ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id", name="integration_audit_logs_pkey"),
+    )
+    op.execute(
+        "INSERT INTO integration_audit_logs "
+        "(id, user_id, event, provider, metadata_json, created_at) "
+        "SELECT id, user_id, event, provider, metadata_json, created_at "
+        "FROM integration_audit_logs_partitioned"
+    )
+    # Dropping the partitioned table drops all of its partitions
+    op.drop_table("integration_audit_logs_partitioned")
+
+    op.create_index("ix_integration_audit_logs_user_id", "integration_audit_logs", ["user_id"], unique=False)
+    op.create_index("ix_integration_audit_logs_event", "integration_audit_logs", ["event"], unique=False)
+    op.create_index("ix_integration_audit_logs_provider", "integration_audit_logs", ["provider"], unique=False)
+    op.create_index("ix_integration_audit_logs_created_at", "integration_audit_logs", ["created_at"], unique=False)
@@ -0,0 +1,50 @@
+"""add_account_deletion_jobs
+
+Revision ID: b7e4f0c2d913
+Revises: 3c6d8e1f2a47
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e4f0c2d913"
+down_revision: Union[str, Sequence[str], None] = "3c6d8e1f2a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+deletion_job_statuses = sa.Enum(
+    "PENDING", "RUNNING", "COMPLETED", "FAILED", name="deletion_job_statuses"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_deletion_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", deletion_job_statuses, nullable=False),
+        sa.Column("requested_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("rides_total", sa.Integer(), nullable=False),
+        sa.Column("rides_deleted", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_account_deletion_jobs_user_id"), "account_deletion_jobs", ["user_id"], unique=False)
+    op.create_index(op.f("ix_account_deletion_jobs_status"), "account_deletion_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_account_deletion_jobs_status"), table_name="account_deletion_jobs")
+    op.drop_index(op.f("ix_account_deletion_jobs_user_id"), table_name="account_deletion_jobs")
+    op.drop_table("account_deletion_jobs")
+    deletion_job_statuses.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""add_deletion_job_confirmation_code
+
+Revision ID: d2a91c5e7f08
+Revises: b7e4f0c2d913
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a91c5e7f08"
+down_revision: Union[str, Sequence[str], None] = "b7e4f0c2d913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("account_deletion_jobs", sa.Column("confirmation_code", sa.String(), nullable=True))
+    op.create_index(op.f("ix_account_deletion_jobs_confirmation_code"), "account_deletion_jobs", ["confirmation_code"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_account_deletion_jobs_confirmation_code"), table_name="account_deletion_jobs")
+    op.drop_column("account_deletion_jobs", "confirmation_code")
@@ -0,0 +1,69 @@
+"""add_ride_members
+
+Revision ID: e8f3a6b14c52
+Revises: d2a91c5e7f08
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8f3a6b14c52"
+down_revision: Union[str, Sequence[str], None] = "d2a91c5e7f08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ride_member_roles = sa.Enum("DRIVER", "OWNER", "PASSENGER", name="ride_member_roles")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ride_members",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("ride_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("role", ride_member_roles, nullable=False),
+        sa.Column("departure_time", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["ride_id"], ["rides.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "ride_id"),
+    )
+    op.create_index(op.f("ix_ride_members_ride_id"), "ride_members", ["ride_id"], unique=False)
+    op.create_index(
+        "ix_ride_members_user_id_departure_time",
+        "ride_members",
+        ["user_id", "departure_time", "ride_id"],
+        unique=False,
+    )
+
+    # Backfill; a user keeps the strongest role per ride (driver, owner,
+    # passenger). api/scripts/rebuild_ride_members.py does the same later.
+    op.execute(
+        "INSERT INTO ride_members (user_id, ride_id, role, departure_time) "
+        "SELECT DISTINCT ON (user_id, ride_id) user_id, ride_id, role, departure_time "
+        "FROM ("
+        "SELECT car_drivers.driver_id AS user_id, rides.id AS ride_id, "
+        "'DRIVER'::ride_member_roles AS role, rides.departure_time, 1 AS rank "
+        "FROM rides JOIN car_drivers ON car_drivers.id = rides.car_driver_id "
+        "UNION ALL "
+        "SELECT cars.owner_id, rides.id, 'OWNER'::ride_member_roles, "
+        "rides.departure_time, 2 "
+        "FROM rides JOIN cars ON cars.id = rides.car_id "
+        "UNION ALL "
+        "SELECT passengers.user_id, rides.id, 'PASSENGER'::ride_member_roles, "
+        "rides.departure_time, 3 "
+        "FROM rides JOIN passengers ON passengers.ride_id = rides.id"
+        ") AS members "
+        "ORDER BY user_id, ride_id, rank"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ride_members_user_id_departure_time", table_name="ride_members")
+    op.drop_index(op.f("ix_ride_members_ride_id"), table_name="ride_members")
+    op.drop_table("ride_members")
+    ride_member_roles.drop(op.get_bind(), checkfirst=True)
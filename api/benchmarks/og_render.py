@@ -0,0 +1,363 @@
+"""Benchmark harness for the Open Graph rendering pipeline.
+
+Drives draw_ride_og_image, get_fitting_font_and_text and get_colored_seat
+over every car layout and realistic destination lengths, plus
+encode_og_image for every format the OG endpoint negotiates with the
+configured OG_*_QUALITY / OG_PNG_* settings, and reports latency
+percentiles, output size and memory per case. Each case runs in a fresh worker
+process, so its peak RSS and RSS growth belong to that case alone and
+include Pillow's native image buffers; py_alloc_peak_bytes only covers
+Python-level allocations. RSS is not reported on Windows.
+
+Usage:
+    python -m api.benchmarks.og_render --iterations 50 --output og.json
+    python -m api.benchmarks.og_render --compare og.json
+    python -m api.benchmarks.og_render --no-isolate  # faster, no RSS per case
+
+Results are written as JSON so runs before and after a Pillow upgrade,
+an og.py change or different encoder settings can be compared with
+--compare (latency and output size).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import partial
+from itertools import repeat
+from types import ModuleType
+from typing import Any
+
+import PIL
+
+from api.utils import og
+from api.utils.og_cache import _encode_options
+
+resource: ModuleType | None
+try:
+    import resource
+except ImportError:  # Windows has no getrusage
+    resource = None
+
+DESTINATIONS = {
+    "short": "Brno",
+    "medium": "Hradec Králové, hlavní nádraží",
+    "long": (
+        "Jindřichův Hradec, Náměstí Míru – parkoviště u zámku "
+        "a Rotundy sv. Ducha, směr Nová Bystřice"
+    ),
+}
+
+# Occupied passenger seats per layout: empty, partly and fully booked
+OCCUPANCY = {
+    "Coupe": {"empty": [], "full": [2]},
+    "Sedan": {"empty": [], "half": [3], "full": [2, 3, 4]},
+    "Minivan": {"empty": [], "half": [2, 4, 6], "full": [2, 3, 4, 5, 6, 7]},
+}
+
+DEPARTURE_TIME = datetime(2026, 7, 2, 15, 30, tzinfo=timezone.utc)
+
+# Report fields compared by --compare, with their column labels
+COMPARED_METRICS = {"p50_ms": "p50", "p95_ms": "p95", "output_bytes": "bytes"}
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    name: str
+    params: dict[str, Any]
+    func: Callable[[], object]
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    params: dict[str, Any]
+    iterations: int
+    cold_ms: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    py_alloc_peak_bytes: int
+    output_bytes: int | None
+    # Peak RSS of the process that ran the case, and how much the case
+    # raised it above the interpreter's footprint at the start of the case
+    peak_rss_kb: int | None
+    rss_delta_kb: int | None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _clear_og_caches() -> None:
+    og._resolve_font_face.cache_clear()
+    og._get_font.cache_clear()
+    og._load_logo.cache_clear()
+    og._load_car_sprite.cache_clear()
+    og._load_seat_sprite.cache_clear()
+    og._get_tinted_seat.cache_clear()
+    og._get_car_panel.cache_clear()
+
+
+def _measure(case: BenchmarkCase, iterations: int, warmup: int) -> BenchmarkResult:
+    """Time one cold call, then `iterations` warm calls of the case."""
+    func = case.func
+    _clear_og_caches()
+    rss_before = _peak_rss_kb()
+    started = time.perf_counter()
+    func()
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    for _ in range(warmup):
+        func()
+
+    timings: list[float] = []
+    output: object = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        output = func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Separate pass: tracemalloc slows calls down and would skew timings.
+    # It only sees Python allocators, not Pillow's internal image buffers.
+    tracemalloc.start()
+    func()
+    _, py_alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_rss = _peak_rss_kb()
+    timings.sort()
+    return BenchmarkResult(
+        name=case.name,
+        params=case.params,
+        iterations=iterations,
+        cold_ms=round(cold_ms, 3),
+        mean_ms=round(sum(timings) / len(timings), 3),
+        p50_ms=round(_percentile(timings, 50), 3),
+        p95_ms=round(_percentile(timings, 95), 3),
+        p99_ms=round(_percentile(timings, 99), 3),
+        py_alloc_peak_bytes=py_alloc_peak,
+        output_bytes=len(output) if isinstance(output, bytes) else None,
+        peak_rss_kb=peak_rss,
+        rss_delta_kb=(
+            peak_rss - rss_before
+            if peak_rss is not None and rss_before is not None
+            else None
+        ),
+    )
+
+
+def _run_cases(
+    cases: list[BenchmarkCase], iterations: int, warmup: int, isolate: bool
+) -> list[BenchmarkResult]:
+    if not isolate:
+        return [_measure(case, iterations, warmup) for case in cases]
+    # ru_maxrss is a process-wide high-water mark, so every case gets a
+    # fresh process; otherwise each would report the largest earlier peak
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        return list(executor.map(_measure, cases, repeat(iterations), repeat(warmup)))
+
+
+def run_benchmarks(
+    iterations: int = 30, warmup: int = 3, isolate: bool = True
+) -> dict[str, Any]:
+    """Run every benchmark case and return a JSON-serialisable report.
+
+    With isolate=False all cases share this process: faster, but the RSS
+    figures then describe the whole run rather than each case.
+    """
+    cases: list[BenchmarkCase] = []
+
+    for layout, occupancies in OCCUPANCY.items():
+        for occupancy_name, occupied in occupancies.items():
+            for length_name, destination in DESTINATIONS.items():
+                draw = partial(
+                    og.draw_ride_og_image,
+                    destination=destination,
+                    departure_time=DEPARTURE_TIME,
+                    car_name="Škoda Octavia Combi",
+                    car_layout=layout,
+                    occupied_seat_positions=occupied,
+                )
+                cases.append(
+                    BenchmarkCase(
+                        "draw_ride_og_image",
+                        {
+                            "layout": layout,
+                            "occupancy": occupancy_name,
+                            "destination": length_name,
+                        },
+                        draw,
+                    )
+                )
+
+    for length_name, destination in DESTINATIONS.items():
+        text = f"Cesta do: {destination}"
+        cases.append(
+            BenchmarkCase(
+                "get_fitting_font_and_text",
+                {"destination": length_name},
+                partial(
+                    og.get_fitting_font_and_text,
+                    text,
+                    max_width=560,
+                    initial_size=64,
+                    min_size=28,
+                ),
+            )
+        )
+
+    # Encoding only, on one busy canvas: the size/time trade-off behind the
+    # quality and compress_level defaults of each format
+    canvas = og.compose_ride_og_image(
+        destination=max(DESTINATIONS.values(), key=len),
+        departure_time=DEPARTURE_TIME,
+        car_name="Škoda Octavia Combi",
+        car_layout="Minivan",
+        occupied_seat_positions=[2, 4, 6],
+    )
+    encode_options = {
+        image_format: _encode_options(image_format)
+        for image_format in og.OG_MEDIA_TYPES
+    }
+    for image_format, options in encode_options.items():
+        cases.append(
+            BenchmarkCase(
+                "encode_og_image",
+                {"format": image_format},
+                partial(og.encode_og_image, canvas, image_format, **options),
+            )
+        )
+
+    seat_sprites = og._load_seat_sprites()
+    if seat_sprites is not None:
+        seat_free, _ = seat_sprites
+        cases.append(
+            BenchmarkCase(
+                "get_colored_seat",
+                {"color": og.SEAT_OCCUPIED_COLOR},
+                partial(og.get_colored_seat, seat_free, og.SEAT_OCCUPIED_COLOR),
+            )
+        )
+
+    results = _run_cases(cases, iterations, warmup, isolate)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "font_face": og._resolve_font_face(),
+            "iterations": iterations,
+            "warmup": warmup,
+            "isolated": isolate,
+            # Kept out of the case params so --compare matches cases across
+            # different encoder settings
+            "encode_options": encode_options,
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def _result_id(result: dict[str, Any]) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Return p50/p95 and output size deltas (in percent) for shared cases."""
+    baseline_by_id = {_result_id(r): r for r in baseline["results"]}
+    rows: list[dict[str, Any]] = []
+    for result in current["results"]:
+        before = baseline_by_id.get(_result_id(result))
+        if before is None:
+            continue
+        row: dict[str, Any] = {"case": _result_id(result)}
+        for metric in COMPARED_METRICS:
+            row[metric] = result[metric]
+            row[f"{metric}_change_pct"] = (
+                round((result[metric] - before[metric]) / before[metric] * 100, 1)
+                if before[metric] and result[metric] is not None
+                else None
+            )
+        rows.append(row)
+    return rows
+
+
+def _print_table(report: dict[str, Any]) -> None:
+    print(f"{'case':<78} {'p50':>8} {'p95':>8} {'p99':>8} {'bytes':>8} {'rss+kB':>8}")
+    for result in report["results"]:
+        output = result["output_bytes"]
+        rss_delta = result["rss_delta_kb"]
+        print(
+            f"{_result_id(result):<78} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{output if output is not None else '-':>8} "
+            f"{rss_delta if rss_delta is not None else '-':>8}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="run all cases in this process (faster, no per-case RSS)",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        iterations=args.iterations, warmup=args.warmup, isolate=not args.no_isolate
+    )
+    _print_table(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for row in compare_reports(baseline, report):
+            changes = " ".join(
+                f"{label} {row[f'{metric}_change_pct']:+}%"
+                for metric, label in COMPARED_METRICS.items()
+                if row[f"{metric}_change_pct"] is not None
+            )
+            print(f"{row['case']:<78} {changes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,112 @@ class Settings(BaseSettings):
     frontend_origin: str = Field(..., validation_alias="FRONTEND_ORIGIN", min_length=1)
     # Origin lockdown (Cloudflare Worker Secret)
     worker_secret: str | None = Field(None, validation_alias="WORKER_SECRET")
+    # Open Graph image render cache
+    og_cache_max_bytes: int = Field(
+        32 * 1024 * 1024, validation_alias="OG_CACHE_MAX_BYTES", ge=0
+    )
+    og_cache_redis_enabled: bool = Field(
+        False, validation_alias="OG_CACHE_REDIS_ENABLED"
+    )
+    og_cache_redis_ttl_seconds: int = Field(
+        7 * 24 * 3600, validation_alias="OG_CACHE_REDIS_TTL_SECONDS", gt=0
+    )
+    # Open Graph image encoding
+    og_png_compress_level: int = Field(
+        6, validation_alias="OG_PNG_COMPRESS_LEVEL", ge=0, le=9
+    )
+    og_png_quantize: bool = Field(False, validation_alias="OG_PNG_QUANTIZE")
+    og_webp_quality: int = Field(80, validation_alias="OG_WEBP_QUALITY", ge=1, le=100)
+    og_jpeg_quality: int = Field(85, validation_alias="OG_JPEG_QUALITY", ge=1, le=95)
+    # Open Graph render process pool (0 workers renders in the request thread)
+    og_render_workers: int = Field(2, validation_alias="OG_RENDER_WORKERS", ge=0)
+    og_render_max_pending: int = Field(
+        8, validation_alias="OG_RENDER_MAX_PENDING", ge=1
+    )
+    og_render_timeout_seconds: float = Field(
+        10.0, validation_alias="OG_RENDER_TIMEOUT_SECONDS", gt=0
+    )
+    og_render_retry_after_seconds: int = Field(
+        5, validation_alias="OG_RENDER_RETRY_AFTER_SECONDS", ge=1
+    )
+    # Open Graph pre-rendering after ride mutations (coalesced per ride)
+    og_prerender_enabled: bool = Field(True, validation_alias="OG_PRERENDER_ENABLED")
+    og_prerender_delay_seconds: float = Field(
+        2.0, validation_alias="OG_PRERENDER_DELAY_SECONDS", ge=0
+    )
+    # Cache of validated sessions in get_current_user (0 disables). A revoked
+    # session is rejected at once by the worker that revoked it; other workers
+    # may accept it for up to the TTL without Redis, and for up to the local
+    # TTL with Redis. Enable Redis when running more than one worker.
+    auth_session_cache_ttl_seconds: float = Field(
+        30.0, validation_alias="AUTH_SESSION_CACHE_TTL_SECONDS", ge=0
+    )
+    auth_session_cache_max_entries: int = Field(
+        10_000, validation_alias="AUTH_SESSION_CACHE_MAX_ENTRIES", ge=1
+    )
+    auth_session_cache_redis_enabled: bool = Field(
+        False, validation_alias="AUTH_SESSION_CACHE_REDIS_ENABLED"
+    )
+    # In-process tier kept in front of Redis (capped by the TTL above)
+    auth_session_cache_local_ttl_seconds: float = Field(
+        2.0, validation_alias="AUTH_SESSION_CACHE_LOCAL_TTL_SECONDS", ge=0
+    )
+    # Shared outbound HTTP client (OAuth providers, Graph API)
+    outbound_http2_enabled: bool = Field(
+        True, validation_alias="OUTBOUND_HTTP2_ENABLED"
+    )
+    outbound_http_max_connections: int = Field(
+        50, validation_alias="OUTBOUND_HTTP_MAX_CONNECTIONS", ge=1
+    )
+    oauth_x_timeout_seconds: float = Field(
+        5.0, validation_alias="OAUTH_X_TIMEOUT_SECONDS", gt=0
+    )
+    oauth_facebook_timeout_seconds: float = Field(
+        5.0, validation_alias="OAUTH_FACEBOOK_TIMEOUT_SECONDS", gt=0
+    )
+    # Avatar proxy disk cache (serves bytes instead of redirecting)
+    avatar_proxy_cache_enabled: bool = Field(
+        False, validation_alias="AVATAR_PROXY_CACHE_ENABLED"
+    )
+    avatar_cache_dir: str = Field(".avatar_cache", validation_alias="AVATAR_CACHE_DIR")
+    avatar_cache_max_bytes: int = Field(
+        64 * 1024 * 1024, validation_alias="AVATAR_CACHE_MAX_BYTES", ge=0
+    )
+    avatar_max_fetch_bytes: int = Field(
+        2 * 1024 * 1024, validation_alias="AVATAR_MAX_FETCH_BYTES", gt=0
+    )
+    # Buffered integration audit writer (bulk INSERT per batch or interval)
+    integration_audit_persist_enabled: bool = Field(
+        True, validation_alias="INTEGRATION_AUDIT_PERSIST_ENABLED"
+    )
+    integration_audit_batch_size: int = Field(
+        100, validation_alias="INTEGRATION_AUDIT_BATCH_SIZE", ge=1
+    )
+    integration_audit_flush_interval_ms: int = Field(
+        200, validation_alias="INTEGRATION_AUDIT_FLUSH_INTERVAL_MS", ge=1
+    )
+    integration_audit_queue_size: int = Field(
+        10_000, validation_alias="INTEGRATION_AUDIT_QUEUE_SIZE", ge=1
+    )
+    # Account deletion: bigger accounts are cleaned up by a background job
+    account_deletion_inline_max_rides: int = Field(
+        500, validation_alias="ACCOUNT_DELETION_INLINE_MAX_RIDES", ge=0
+    )
+    account_deletion_chunk_size: int = Field(
+        200, validation_alias="ACCOUNT_DELETION_CHUNK_SIZE", ge=1
+    )
+    account_deletion_max_attempts: int = Field(
+        5, validation_alias="ACCOUNT_DELETION_MAX_ATTEMPTS", ge=1
+    )
+    account_deletion_retry_delay_seconds: float = Field(
+        30.0, validation_alias="ACCOUNT_DELETION_RETRY_DELAY_SECONDS", ge=0
+    )
+    account_deletion_worker_enabled: bool = Field(
+        True, validation_alias="ACCOUNT_DELETION_WORKER_ENABLED"
+    )
+    account_deletion_claim_timeout_seconds: float = Field(
+        600.0, validation_alias="ACCOUNT_DELETION_CLAIM_TIMEOUT_SECONDS", gt=0
+    )
     # Development-only feature flags
     demo_fixtures_enabled: bool = Field(False, validation_alias="DEMO_FIXTURES_ENABLED")
     demo_fixture_whitelist_emails: str = Field(
@@ -1,15 +1,30 @@
 import os
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
+# Registers the flush hook that keeps the ride_members read model current
+from api.services import ride_members  # noqa: F401
+
 # Načtení proměnných z .env
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true"
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "10"))
+
+# Async drivers used for the sync URLs configured in DATABASE_URL
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
 
 
 def normalize_database_url(url: str) -> str:
@@ -19,6 +34,22 @@ def normalize_database_url(url: str) -> str:
     return url
 
 
+def to_async_database_url(url: str) -> str:
+    """Swap the sync DBAPI in a database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Žádný async ovladač pro databázi '{backend}'.")
+    parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    # asyncpg does not understand libpq's sslmode, it takes ssl instead
+    sslmode = parsed.query.get("sslmode")
+    if backend == "postgresql" and isinstance(sslmode, str):
+        parsed = parsed.difference_update_query(["sslmode"]).update_query_dict(
+            {"ssl": sslmode}
+        )
+    return parsed.render_as_string(hide_password=False)
+
+
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL není nastavený v .env souboru.")
 
@@ -31,6 +62,35 @@ engine = create_engine(DATABASE_URL, echo=SQLALCHEMY_ECHO, future=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Async session factory; bound to the engine on first use so the async
+# driver is only imported by processes that actually serve async routes
+AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False)
+_async_engine: AsyncEngine | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        assert DATABASE_URL is not None
+        url = to_async_database_url(DATABASE_URL)
+        pool_options = (
+            {"pool_size": ASYNC_DB_POOL_SIZE, "max_overflow": ASYNC_DB_MAX_OVERFLOW}
+            if not url.startswith("sqlite")
+            else {}
+        )
+        _async_engine = create_async_engine(
+            url, echo=SQLALCHEMY_ECHO, pool_pre_ping=True, **pool_options
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
 # Funkce pro získání databázové relace
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -38,3 +98,9 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# Async varianta pro routery, které čekají na databázi bez vlákna z threadpoolu
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -1,41 +1,54 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from api.config import settings
-from api.database import get_db
+from api.database import get_async_db, get_db
 from api.models import SocialSession, User
+from api.utils.session_cache import CachedPrincipal, session_validation_cache
 
 # Token path (default schema "Bearer <token>")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Read-only identity of the caller, detached from any DB session.
+
+    Routes that need the full User (relationships, writes) load it
+    explicitly with db.get(User, ctx.user.id).
+    """
+
+    id: UUID
+    email: str | None
+
+
 @dataclass
 class UserContext:
     """Current user context with a session_id."""
 
-    user: User
+    user: AuthenticatedUser
     session_id: UUID
 
 
-# Get current user from JWT token
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> UserContext:
-    """Decode JWT token and validate session in DB."""
-
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_access_token(token: str) -> tuple[UUID, UUID]:
+    """Return (user_id, session_id) from a valid access token."""
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -49,28 +62,69 @@ def get_current_user(
             or not isinstance(session_id, str)
             or token_type != "access"
         ):
-            raise credentials_exception
+            raise _credentials_exception()
 
-        user_uuid = UUID(user_id)
-        session_uuid = UUID(session_id)
+        return UUID(user_id), UUID(session_id)
     except (JWTError, ValueError):
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.query(User).filter(User.id == user_uuid).first()
-    if not user:
-        raise credentials_exception
 
-    # Validate session exists, not revoked, and not expired
-    session = (
-        db.query(SocialSession)
-        .filter(
+def _principal_query(user_uuid: UUID, session_uuid: UUID) -> Select[Any]:
+    """Build the single query resolving the user with an active session."""
+    return (
+        select(User.id, User.email, SocialSession.expires_at)
+        .join(SocialSession, SocialSession.user_id == User.id)
+        .where(
+            User.id == user_uuid,
             SocialSession.id == session_uuid,
             SocialSession.revoked_at.is_(None),
             SocialSession.expires_at > datetime.now(timezone.utc),
         )
-        .first()
     )
-    if not session:
-        raise credentials_exception
 
-    return UserContext(user=user, session_id=session_uuid)
+
+def _principal_from_row(row: Row[Any] | None) -> tuple[CachedPrincipal, datetime]:
+    """Return the principal and its session expiry, or reject the token."""
+    if not row:
+        raise _credentials_exception()
+    return CachedPrincipal(user_id=row.id, email=row.email), row.expires_at
+
+
+def _build_user_context(principal: CachedPrincipal, session_uuid: UUID) -> UserContext:
+    return UserContext(
+        user=AuthenticatedUser(id=principal.user_id, email=principal.email),
+        session_id=session_uuid,
+    )
+
+
+# Get current user from JWT token
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> UserContext:
+    """Decode JWT token and validate session in DB."""
+    user_uuid, session_uuid = _decode_access_token(token)
+    cached = session_validation_cache.get(session_uuid)
+    # Revocations invalidate the cache, so a hit is as good as a database check
+    if cached is not None and cached.user_id == user_uuid:
+        return _build_user_context(cached, session_uuid)
+    row = db.execute(_principal_query(user_uuid, session_uuid)).first()
+    principal, expires_at = _principal_from_row(row)
+    session_validation_cache.set(session_uuid, principal, expires_at)
+    return _build_user_context(principal, session_uuid)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserContext:
+    """get_current_user for async routes; neither the DB nor Redis blocks the loop."""
+    user_uuid, session_uuid = _decode_access_token(token)
+    cached = await session_validation_cache.get_async(session_uuid)
+    # Revocations invalidate the cache, so a hit is as good as a database check
+    if cached is not None and cached.user_id == user_uuid:
+        return _build_user_context(cached, session_uuid)
+    row = (await db.execute(_principal_query(user_uuid, session_uuid))).first()
+    principal, expires_at = _principal_from_row(row)
+    await session_validation_cache.set_async(session_uuid, principal, expires_at)
+    return _build_user_context(principal, session_uuid)
@@ -1,5 +1,6 @@
 import uuid
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from importlib import import_module
 from types import ModuleType
 
@@ -14,7 +15,13 @@ from slowapi.middleware import SlowAPIMiddleware
 from starlette.responses import Response
 
 from api.config import settings
+from api.database import dispose_async_engine
 from api.routers import auth, cars, health, invitations, rides
+from api.services.account_deletion import account_deletion_worker
+from api.services.avatar_refresh import avatar_refresher
+from api.services.http_client import close_http_client, start_http_client
+from api.utils.avatar_cache import avatar_cache
+from api.utils.integration_audit import audit_writer
 from api.utils.limiter import limiter
 from api.utils.logging_config import (
     get_logger,
@@ -24,6 +31,8 @@ from api.utils.logging_config import (
     setup_logging,
     start_operation_timer,
 )
+from api.utils.og_pool import og_render_pool
+from api.utils.og_prerender import og_prerenderer
 
 dev_fixtures: ModuleType | None
 try:
@@ -37,8 +46,31 @@ load_dotenv()
 setup_logging()
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start warm background resources and release them on shutdown."""
+    og_render_pool.start()
+    if settings.avatar_proxy_cache_enabled:
+        # Index the shared avatar directory before the first request
+        avatar_cache.load()
+    start_http_client()
+    account_deletion_worker.resume_pending()
+    try:
+        yield
+    finally:
+        og_prerenderer.shutdown()
+        og_render_pool.shutdown()
+        await avatar_refresher.shutdown()
+        audit_writer.shutdown()
+        account_deletion_worker.shutdown()
+        await close_http_client()
+        await dispose_async_engine()
+
+
 app = FastAPI(
     title="Sitzy API",
+    lifespan=lifespan,
     docs_url=None if settings.environment == "production" else "/docs",
     redoc_url=None if settings.environment == "production" else "/redoc",
     openapi_url=None if settings.environment == "production" else "/openapi.json",
@@ -138,6 +170,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -3,11 +3,16 @@ from datetime import datetime
 
 from sqlalchemy import JSON, DateTime
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import ForeignKey, String, UniqueConstraint, func, text
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
-from .utils.enums import CarLayout, InvitationStatus
+from .utils.enums import (
+    CarLayout,
+    DeletionJobStatus,
+    InvitationStatus,
+    RideMemberRole,
+)
 
 
 class Base(DeclarativeBase):
@@ -114,6 +119,16 @@ class SocialSession(Base):
 
 class IntegrationAuditLog(Base):
     __tablename__ = "integration_audit_logs"
+    # Range-partitioned by month on created_at (monthly partitions are managed
+    # by api/scripts/manage_audit_partitions.py), hence created_at in the PK
+    __table_args__ = (
+        Index(
+            "ix_integration_audit_logs_user_id_created_at",
+            "user_id",
+            text("created_at DESC"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -122,7 +137,6 @@ class IntegrationAuditLog(Base):
         PG_UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="SET NULL"),
         nullable=True,
-        index=True,
     )
     event: Mapped[str] = mapped_column(String, nullable=False, index=True)
     provider: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
@@ -131,7 +145,7 @@ class IntegrationAuditLog(Base):
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        nullable=False,
+        primary_key=True,
         server_default=text("now()"),
         index=True,
     )
@@ -284,3 +298,75 @@ class Seat(Base):
     position: Mapped[int] = mapped_column(primary_key=True)
 
     car: Mapped["Car"] = relationship(back_populates="seats")
+
+
+# Read model of "which rides involve a user", one row per user and ride
+# (kept in sync on flush by api.services.ride_members)
+class RideMember(Base):
+    __tablename__ = "ride_members"
+    __table_args__ = (
+        Index(
+            "ix_ride_members_user_id_departure_time",
+            "user_id",
+            "departure_time",
+            "ride_id",
+        ),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    ride_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("rides.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    # Strongest role when the user has several: driver, owner, passenger
+    role: Mapped[RideMemberRole] = mapped_column(
+        SqlEnum(RideMemberRole, name="ride_member_roles"), nullable=False
+    )
+    departure_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+# Background account cleanup: chunked rides of a large account, or a whole
+# provider-requested deletion (tracked by its confirmation code)
+class AccountDeletionJob(Base):
+    __tablename__ = "account_deletion_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
+    )
+    status: Mapped[DeletionJobStatus] = mapped_column(
+        SqlEnum(DeletionJobStatus, name="deletion_job_statuses"),
+        default=DeletionJobStatus.PENDING,
+        nullable=False,
+        index=True,
+    )
+    confirmation_code: Mapped[str | None] = mapped_column(
+        String, unique=True, nullable=True, index=True
+    )
+    # Rides departing after this moment are deleted
+    requested_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    rides_total: Mapped[int] = mapped_column(default=0, nullable=False)
+    rides_deleted: Mapped[int] = mapped_column(default=0, nullable=False)
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=func.now(),
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
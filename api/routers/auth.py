@@ -1,7 +1,7 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-import httpx
 from fastapi import (
     APIRouter,
     Depends,
@@ -14,38 +14,67 @@ from fastapi import (
 )
 from fastapi.responses import RedirectResponse
 from jose import JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from api.config import settings
-from api.database import get_db
+from api.database import get_async_db, get_db
 from api.deps import UserContext, get_current_user
-from api.models import IntegrationAuditLog, SocialAccount, SocialSession, User
+from api.models import (
+    AccountDeletionJob,
+    IntegrationAuditLog,
+    SocialAccount,
+    SocialSession,
+    User,
+)
 from api.schemas import (
+    AccountDeletionStatusOut,
     IntegrationAuditEventOut,
     SocialAccountDashboardOut,
     SocialDashboardOut,
     SocialSessionOut,
     UserOut,
 )
+from api.services.account_deletion import (
+    account_deletion_worker,
+    anonymize_user_data,
+    enqueue_account_deletion,
+)
+from api.services.avatar_refresh import (
+    AVATAR_MAX_AGE,
+    avatar_refresher,
+    fetch_avatar_bytes,
+    is_avatar_stale,
+    is_facebook_avatar,
+)
 from api.services.oauth_service import (
     FacebookOAuthClient,
     OAuthStateManager,
     XOAuthClient,
     create_or_update_session,
     find_or_create_user,
-    normalize_avatar_url,
 )
+from api.utils.avatar_cache import CachedAvatar, avatar_cache
 from api.utils.integration_audit import emit_integration_event
 from api.utils.limiter import limiter
 from api.utils.logging_config import get_logger
+from api.utils.og_cache import etag_matches
 from api.utils.security import (
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
 )
+from api.utils.session_cache import session_validation_cache
 
 router = APIRouter(tags=["auth"])
 logger = get_logger(__name__)
+
+# Inactive sessions older than this are left out of the social dashboard
+DASHBOARD_RECENT_SESSIONS = timedelta(days=30)
+
+# Browsers and the CDN keep cached avatars for the 12-hour staleness window
+AVATAR_CACHE_CONTROL = "public, max-age=43200, stale-while-revalidate=86400"
 state_manager = OAuthStateManager()
 x_client = XOAuthClient()
 fb_client = FacebookOAuthClient()
@@ -176,7 +205,7 @@ async def oauth_callback(
                 raise HTTPException(
                     status_code=400, detail="Missing PKCE code verifier."
                 )
-            token_data = x_client.exchange_code(code, code_verifier)
+            token_data = await x_client.exchange_code(code, code_verifier)
             emit_integration_event(
                 event="oauth_token_exchanged",
                 provider="x",
@@ -185,7 +214,7 @@ async def oauth_callback(
             logger.info("X token exchange complete, fetching user info")
             user_info = await x_client.get_user_info(token_data["access_token"])
         else:
-            token_data = fb_client.exchange_code(code)
+            token_data = await fb_client.exchange_code(code)
             emit_integration_event(
                 event="oauth_token_exchanged",
                 provider="facebook",
@@ -222,7 +251,7 @@ async def oauth_callback(
                 "social_id": social_id,
                 "email_missing": email_missing,
             },
-            db=db,
+            persist=True,
         )
 
         expires_in: int = int(token_data.get("expires_in", 7200))
@@ -248,9 +277,8 @@ async def oauth_callback(
                 "session_id": str(session.id),
                 "expires_in": expires_in,
             },
-            db=db,
+            persist=True,
         )
-        db.commit()
 
         access_token = create_access_token(
             {"sub": str(user.id), "session_id": str(session.id)}
@@ -342,9 +370,8 @@ def refresh_access_token(
         event="social_session_refreshed",
         user_id=UUID(user_id),
         metadata={"session_id": session_id},
-        db=db,
+        persist=True,
     )
-    db.commit()
 
     logger.info("Token refreshed", extra={"user_id": user_id, "session_id": session_id})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -368,9 +395,10 @@ def revoke_session(
             provider=social_account.provider if social_account else None,
             user_id=ctx.user.id,
             metadata={"session_id": str(ctx.session_id), "via": "current_session"},
-            db=db,
+            persist=True,
         )
         db.commit()
+        session_validation_cache.invalidate([ctx.session_id])
         logger.info(
             "Session revoked",
             extra={"user_id": str(ctx.user.id), "session_id": str(ctx.session_id)},
@@ -385,60 +413,51 @@ def revoke_session(
 
 
 @router.get("/me", response_model=UserOut)
-def read_me(ctx: UserContext = Depends(get_current_user)) -> UserOut:
+def read_me(
+    ctx: UserContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> UserOut:
     """Return current authenticated user."""
     logger.debug("User info requested", extra={"user_id": str(ctx.user.id)})
-    return UserOut.model_validate(ctx.user)
+    user = (
+        db.query(User)
+        .options(selectinload(User.social_accounts))
+        .filter(User.id == ctx.user.id)
+        .first()
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+    return UserOut.model_validate(user)
 
 
 @router.get("/social/dashboard", response_model=SocialDashboardOut)
 def get_social_dashboard(
     ctx: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db),
+    sessions_limit: int = Query(20, ge=1, le=100),
+    sessions_offset: int = Query(0, ge=0),
 ) -> SocialDashboardOut:
-    """Return linked social providers, session visibility and integration events."""
+    """Return linked social providers, session visibility and integration events.
+
+    Per-account session statistics are aggregated in SQL. The session list
+    only covers active sessions and sessions from the last 30 days, current
+    session first, and is paginated with sessions_limit/sessions_offset.
+    """
+    now = datetime.now(timezone.utc)
+    is_active = SocialSession.revoked_at.is_(None)
     accounts = (
-        db.query(SocialAccount)
+        db.query(
+            SocialAccount,
+            func.count(case((is_active, SocialSession.id))),
+            func.max(SocialSession.created_at),
+        )
+        .outerjoin(SocialSession, SocialSession.social_account_id == SocialAccount.id)
         .filter(SocialAccount.user_id == ctx.user.id)
+        .group_by(SocialAccount.id)
         .order_by(SocialAccount.linked_at.desc())
         .all()
     )
 
-    sessions = (
-        db.query(SocialSession)
-        .join(SocialAccount, SocialSession.social_account_id == SocialAccount.id)
-        .filter(SocialSession.user_id == ctx.user.id)
-        .order_by(SocialSession.created_at.desc())
-        .all()
-    )
-
-    session_rows: list[SocialSessionOut] = []
-    active_count_by_account: dict[UUID, int] = {}
-    last_login_by_account: dict[UUID, datetime] = {}
-
-    for session in sessions:
-        account_id = session.social_account_id
-        if session.revoked_at is None:
-            active_count_by_account[account_id] = (
-                active_count_by_account.get(account_id, 0) + 1
-            )
-
-        last_seen = last_login_by_account.get(account_id)
-        if last_seen is None or session.created_at > last_seen:
-            last_login_by_account[account_id] = session.created_at
-
-        session_rows.append(
-            SocialSessionOut(
-                id=session.id,
-                provider=session.social_account.provider,
-                created_at=session.created_at,
-                expires_at=session.expires_at,
-                revoked_at=session.revoked_at,
-                user_agent=session.user_agent,
-                is_current=session.id == ctx.session_id,
-            )
-        )
-
     account_rows = [
         SocialAccountDashboardOut(
             provider=account.provider,
@@ -446,10 +465,43 @@ def get_social_dashboard(
             linked_at=account.linked_at,
             provider_email=None if _is_fake_email(account.email) else account.email,
             has_real_email=not _is_fake_email(account.email),
-            active_sessions=active_count_by_account.get(account.id, 0),
-            last_login_at=last_login_by_account.get(account.id),
+            active_sessions=active_sessions,
+            last_login_at=last_login_at,
+        )
+        for account, active_sessions, last_login_at in accounts
+    ]
+
+    sessions = (
+        db.query(SocialSession, SocialAccount.provider)
+        .join(SocialAccount, SocialSession.social_account_id == SocialAccount.id)
+        .filter(
+            SocialSession.user_id == ctx.user.id,
+            or_(
+                and_(is_active, SocialSession.expires_at > now),
+                SocialSession.created_at >= now - DASHBOARD_RECENT_SESSIONS,
+            ),
+        )
+        .order_by(
+            case((SocialSession.id == ctx.session_id, 0), else_=1),
+            SocialSession.created_at.desc(),
+        )
+        .offset(sessions_offset)
+        .limit(sessions_limit + 1)
+        .all()
+    )
+    has_more_sessions = len(sessions) > sessions_limit
+
+    session_rows = [
+        SocialSessionOut(
+            id=session.id,
+            provider=provider,
+            created_at=session.created_at,
+            expires_at=session.expires_at,
+            revoked_at=session.revoked_at,
+            user_agent=session.user_agent,
+            is_current=session.id == ctx.session_id,
         )
-        for account in accounts
+        for session, provider in sessions[:sessions_limit]
     ]
 
     events = (
@@ -474,6 +526,7 @@ def get_social_dashboard(
         accounts=account_rows,
         sessions=session_rows,
         events=event_rows,
+        has_more_sessions=has_more_sessions,
     )
 
 
@@ -508,10 +561,11 @@ def revoke_session_by_id(
         provider=social_account.provider if social_account else None,
         user_id=ctx.user.id,
         metadata={"session_id": str(session_id), "via": "dashboard"},
-        db=db,
+        persist=True,
     )
 
     db.commit()
+    session_validation_cache.invalidate([session_id])
 
     if session_id == ctx.session_id:
         _clear_refresh_cookie(response)
@@ -545,9 +599,10 @@ def revoke_other_sessions(
             provider=None,
             user_id=ctx.user.id,
             metadata={"revoked_count": revoked_count, "via": "dashboard"},
-            db=db,
+            persist=True,
         )
         db.commit()
+        session_validation_cache.invalidate(session.id for session in sessions)
 
 
 @router.post(
@@ -590,6 +645,7 @@ def unlink_provider(
         raise HTTPException(status_code=404, detail="Provider is not linked.")
 
     current_session_will_be_revoked = False
+    unlinked_session_ids = [session.id for session in account_to_unlink.sessions]
     for session in account_to_unlink.sessions:
         if session.revoked_at is None:
             session.revoked_at = datetime.now(timezone.utc)
@@ -602,82 +658,15 @@ def unlink_provider(
         provider=account_to_unlink.provider,
         user_id=ctx.user.id,
         metadata={"provider": account_to_unlink.provider},
-        db=db,
+        persist=True,
     )
     db.commit()
+    session_validation_cache.invalidate(unlinked_session_ids)
 
     if current_session_will_be_revoked:
         _clear_refresh_cookie(response)
 
 
-def anonymize_user_data(user: User, db: Session) -> None:
-    """GDPR-compliant user anonymization (soft-deletion).
-
-    Preserves past rides and past passenger participations for other users
-    while deleting all future bookings, future rides, active sessions, and
-    OAuth linkages.
-    """
-    from datetime import datetime, timezone
-
-    from api.models import CarDriver, Passenger, Ride
-
-    now = datetime.now(timezone.utc)
-
-    # 1. Delete future passenger bookings for this user
-    future_bookings = (
-        db.query(Passenger)
-        .join(Ride)
-        .filter(Passenger.user_id == user.id, Ride.departure_time > now)
-        .all()
-    )
-    for booking in future_bookings:
-        db.delete(booking)
-
-    # 2. Delete future rides where this user is the driver
-    future_driver_rides = (
-        db.query(Ride)
-        .join(CarDriver)
-        .filter(CarDriver.driver_id == user.id, Ride.departure_time > now)
-        .all()
-    )
-    for ride in future_driver_rides:
-        db.delete(ride)
-
-    # 3. Handle owned cars:
-    # Delete future rides for their cars
-    for car in user.cars:
-        future_car_rides = (
-            db.query(Ride)
-            .filter(Ride.car_id == car.id, Ride.departure_time > now)
-            .all()
-        )
-        for ride in future_car_rides:
-            db.delete(ride)
-
-    # Delete cars that have no rides at all to clean database
-    for car in list(user.cars):
-        has_rides = db.query(Ride).filter(Ride.car_id == car.id).first() is not None
-        if not has_rides:
-            db.delete(car)
-
-    # 4. Deactivate driver status on all their CarDriver assignments
-    for cd in user.car_drivers:
-        cd.is_active = False
-
-    # 5. Delete OAuth linked accounts (so they cannot log back in)
-    for sa in list(user.social_accounts):
-        db.delete(sa)
-
-    # 6. Delete active sessions (so they are immediately logged out)
-    for ss in list(user.social_sessions):
-        db.delete(ss)
-
-    # 7. Anonymize user personal data
-    user.email = None
-    user.full_name = "Smazaný uživatel"
-    user.avatar_url = None
-
-
 @router.delete("/delete-account", status_code=status.HTTP_204_NO_CONTENT)
 @limiter.limit("3/minute")
 def delete_account(
@@ -691,7 +680,9 @@ def delete_account(
     Anonymizes the user to preserve past ride logs while deleting all future
     data and linked credentials.
     """
-    user = ctx.user
+    user = db.query(User).filter(User.id == ctx.user.id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
     user_id = str(user.id)
 
     logger.info(
@@ -701,11 +692,14 @@ def delete_account(
         event="account_deletion_requested",
         user_id=user.id,
         metadata={"email_present": user.email is not None},
-        db=db,
+        persist=True,
     )
 
-    anonymize_user_data(user, db)
+    deletion = anonymize_user_data(db, user.id)
     db.commit()
+    session_validation_cache.invalidate(deletion.session_ids)
+    if deletion.job_id is not None:
+        account_deletion_worker.submit(deletion.job_id)
 
     # Clear refresh cookie
     _clear_refresh_cookie(response)
@@ -723,14 +717,18 @@ def facebook_data_deletion_callback(
     """Facebook Data Deletion Callback (required for App Review).
 
     Facebook sends signed_request in a POST form request when user deletes app.
-    We return a confirmation URL with code for tracking deletion status.
+    The deletion is only queued here (keyed by the confirmation code) so the
+    reply does not depend on the account size; the returned URL leads to the
+    deletion-status page, which reads progress from /auth/deletion-status.
 
     See: https://developers.facebook.com/docs/apps/delete-data
     Returns:
     {
-        "url": "https://sitzy.example.com/deletion-status?code=...&status=confirmed",
+        "url": "https://sitzy.example.com/deletion-status?code=...",
         "confirmation_code": "..."
     }
+    Unknown Facebook users get "&status=confirmed" appended to the url,
+    as there is no job to report on.
     """
     import base64
     import hashlib
@@ -796,35 +794,39 @@ def facebook_data_deletion_callback(
 
         # Generate confirmation code for status tracking
         confirmation_code = secrets.token_urlsafe(16)
+        status_query = f"code={confirmation_code}"
 
         if social_account:
-            user = social_account.user
-            user_id = str(user.id)
+            user_id = str(social_account.user_id)
 
             logger.info(
-                "Facebook deletion callback - anonymizing user",
+                "Facebook deletion callback - queueing anonymization",
                 extra={"user_id": user_id, "facebook_id": facebook_user_id},
             )
 
-            anonymize_user_data(user, db)
+            job = enqueue_account_deletion(
+                db, social_account.user_id, confirmation_code=confirmation_code
+            )
             emit_integration_event(
                 event="account_deleted_by_provider_callback",
                 provider="facebook",
-                user_id=user.id,
+                user_id=social_account.user_id,
                 metadata={"facebook_user_id": str(facebook_user_id)},
-                db=db,
+                persist=True,
             )
             db.commit()
+            account_deletion_worker.submit(job.id)
         else:
             logger.info(
                 "Facebook deletion callback - user not found",
                 extra={"facebook_id": facebook_user_id},
             )
+            # Nothing to delete and no job to poll: the deletion is final
+            status_query += "&status=confirmed"
 
         # Return confirmation code and URL as per Facebook spec
         status_url = (
-            f"{settings.frontend_origin.rstrip('/')}"
-            f"/deletion-status?code={confirmation_code}&status=confirmed"
+            f"{settings.frontend_origin.rstrip('/')}" f"/deletion-status?{status_query}"
         )
         return {
             "url": status_url,
@@ -840,57 +842,97 @@ def facebook_data_deletion_callback(
         )
 
 
+@router.get(
+    "/deletion-status/{confirmation_code}", response_model=AccountDeletionStatusOut
+)
+@limiter.limit("30/minute")
+def get_deletion_status(
+    request: Request,
+    confirmation_code: str,
+    db: Session = Depends(get_db),
+) -> AccountDeletionStatusOut:
+    """Progress of a provider-requested deletion, for the deletion-status page."""
+    job = (
+        db.query(AccountDeletionJob)
+        .filter(AccountDeletionJob.confirmation_code == confirmation_code)
+        .first()
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown confirmation code.")
+    return AccountDeletionStatusOut.model_validate(job)
+
+
+def _load_avatar_source(
+    db: Session, user_id: UUID
+) -> tuple[str | None, datetime | None, str | None]:
+    """Return (avatar_url, updated_at, facebook social_id) of a user."""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return None, None, None
+    facebook_id = next(
+        (sa.social_id for sa in user.social_accounts if sa.provider == "facebook"),
+        None,
+    )
+    return user.avatar_url, user.updated_at, facebook_id
+
+
+async def _load_cached_avatar(user_id: UUID, avatar_url: str) -> CachedAvatar | None:
+    """Return avatar bytes from the disk cache, fetching them on a miss.
+
+    Entries older than the 12-hour staleness rule are re-fetched; if that
+    fails the old bytes are still served.
+    """
+    cached = await asyncio.to_thread(avatar_cache.get, user_id, avatar_url)
+    if cached is not None and cached.age_seconds < AVATAR_MAX_AGE.total_seconds():
+        return cached
+    fetched = await fetch_avatar_bytes(avatar_url)
+    if fetched is None:
+        return cached
+    content, media_type = fetched
+    return await asyncio.to_thread(
+        avatar_cache.set, user_id, avatar_url, content, media_type
+    )
+
+
 @router.get("/users/{user_id}/avatar")
 async def get_user_avatar(
-    user_id: UUID, db: Session = Depends(get_db)
-) -> RedirectResponse:
-    """Retrieve the user's avatar. If it is a Facebook avatar, dynamically
-    refresh it if expired (older than 12 hours) and redirect the client."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user or not user.avatar_url:
+    user_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """Serve the user's avatar.
+
+    Stale Facebook avatars (older than 12 hours) are refreshed in the
+    background; the client gets the current avatar immediately. With
+    AVATAR_PROXY_CACHE_ENABLED the bytes are served from a local disk cache
+    with a strong ETag, otherwise the client is redirected to the CDN.
+    """
+    avatar_url, updated_at, facebook_id = await db.run_sync(
+        _load_avatar_source, user_id
+    )
+    if not avatar_url:
         raise HTTPException(status_code=404, detail="Avatar not found")
 
-    is_facebook = "fbsbx.com" in user.avatar_url or "facebook.com" in user.avatar_url
-    if is_facebook:
-        # Check if the avatar is stale (older than 12 hours)
-        age = datetime.now(timezone.utc) - user.updated_at.astimezone(timezone.utc)
-        if age > timedelta(hours=12):
-            social_account = next(
-                (sa for sa in user.social_accounts if sa.provider == "facebook"), None
+    if is_facebook_avatar(avatar_url) and updated_at and is_avatar_stale(updated_at):
+        if facebook_id:
+            avatar_refresher.schedule(user_id, facebook_id)
+        else:
+            logger.warning(
+                f"User {user_id} has a Facebook avatar URL but no "
+                "associated Facebook social account"
             )
-            if social_account:
-                fb_id = social_account.social_id
-                app_token = (
-                    f"{settings.facebook_client_id}|{settings.facebook_client_secret}"
-                )
-                url = f"https://graph.facebook.com/v20.0/{fb_id}/picture"
-                params = {
-                    "redirect": "false",
-                    "type": "large",
-                    "access_token": app_token,
-                }
-                try:
-                    async with httpx.AsyncClient(timeout=5.0) as client:
-                        response = await client.get(url, params=params)
-                        if response.status_code == 200:
-                            data = response.json()
-                            new_avatar_url = data.get("data", {}).get("url")
-                            if new_avatar_url:
-                                user.avatar_url = normalize_avatar_url(new_avatar_url)
-                                db.commit()
-                                logger.info(
-                                    "Successfully refreshed Facebook avatar "
-                                    f"for user {user.id}"
-                                )
-                except Exception as e:
-                    logger.warning(
-                        "Failed to refresh Facebook avatar for user " f"{user.id}: {e}"
-                    )
-            else:
-                logger.warning(
-                    f"User {user.id} has a Facebook avatar URL but no "
-                    "associated Facebook social account"
+
+    if settings.avatar_proxy_cache_enabled:
+        cached = await _load_cached_avatar(user_id, avatar_url)
+        if cached is not None:
+            headers = {
+                "Cache-Control": AVATAR_CACHE_CONTROL,
+                "ETag": f'"{cached.etag}"',
+            }
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
                 )
+            return Response(
+                content=cached.content, media_type=cached.media_type, headers=headers
+            )
 
-    assert user.avatar_url is not None
-    return RedirectResponse(url=user.avatar_url)
+    return RedirectResponse(url=avatar_url)
@@ -15,6 +15,7 @@ from api.schemas import (
     RideOut,
 )
 from api.utils.logging_config import get_logger
+from api.utils.ride_loading import RIDE_OUT_OPTIONS
 from api.utils.seats import get_layout_seat_positions
 
 router = APIRouter()
@@ -47,8 +48,7 @@ def read_car_by_id(
             selectinload(Car.owner),
             selectinload(Car.seats),
             selectinload(Car.drivers),
-            selectinload(Car.rides),
-            selectinload(Car.rides).selectinload(Ride.car_driver),
+            selectinload(Car.rides).options(*RIDE_OUT_OPTIONS),
         )
         .filter(Car.id == car_id)
         .first()
@@ -62,7 +62,6 @@ def read_car_by_id(
             status_code=404, detail="Car not found or does not belong to you."
         )
 
-    db.refresh(car)
     return CarFullOut.from_orm_with_labels(car)
 
 
@@ -178,6 +177,7 @@ def list_car_rides(
         )
     rides = (
         db.query(Ride)
+        .options(*RIDE_OUT_OPTIONS)
         .filter(Ride.car_id == car_id)
         .order_by(Ride.departure_time.asc())
         .all()
@@ -190,7 +190,9 @@ def generate_demo_fixtures(
 
     if not ctx.user.email:
         current_user_email = _valid_demo_email("demo-current-user")
-        ctx.user.email = current_user_email
+        current_user = db.query(User).filter(User.id == ctx.user.id).first()
+        if current_user:
+            current_user.email = current_user_email
         db.flush()
     else:
         current_user_email = ctx.user.email
@@ -214,7 +216,10 @@ def generate_demo_fixtures(
     }
 
     emit_integration_event(
-        event="demo_fixtures_created", user_id=ctx.user.id, metadata=metadata, db=db
+        event="demo_fixtures_created",
+        user_id=ctx.user.id,
+        metadata=metadata,
+        persist=True,
     )
 
     db.commit()
@@ -269,7 +274,7 @@ def reset_demo_fixtures(
         event="demo_fixtures_reset",
         user_id=ctx.user.id,
         metadata={"deleted_cars": deleted_cars, "deleted_users": deleted_users},
-        db=db,
+        persist=True,
     )
 
     db.commit()
@@ -2,10 +2,11 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from api.database import get_db
-from api.deps import UserContext, get_current_user
+from api.database import get_async_db, get_db
+from api.deps import UserContext, get_current_user, get_current_user_async
 from api.models import Car, Invitation, Passenger, Ride
 from api.schemas import (
     InvitationOut,
@@ -16,6 +17,8 @@ from api.schemas import (
 from api.utils.enums import InvitationStatus
 from api.utils.integration_audit import emit_integration_event
 from api.utils.logging_config import get_logger
+from api.utils.og_prerender import og_prerenderer
+from api.utils.ride_loading import RIDE_OUT_OPTIONS
 from api.utils.seats import get_layout_seat_positions
 
 router = APIRouter()
@@ -27,28 +30,35 @@ def _assert_invitation_ride_not_past(invitation: Invitation) -> None:
         raise HTTPException(status_code=409, detail="Past rides are read-only.")
 
 
-@router.get("/received", response_model=list[InvitationOut])
-def get_received_invitations(
-    request: Request,
-    db: Session = Depends(get_db),
-    ctx: UserContext = Depends(get_current_user),
+def _list_received_invitations(
+    db: Session, user_id: UUID, email: str
 ) -> list[InvitationOut]:
-    """List of invitations received by the current user."""
-    if not ctx.user.email:
-        return []
     invitations = (
         db.query(Invitation)
-        .filter(Invitation.invited_email.ilike(ctx.user.email))
+        .options(selectinload(Invitation.ride).options(*RIDE_OUT_OPTIONS))
+        .filter(Invitation.invited_email.ilike(email))
         .order_by(Invitation.created_at.desc())
         .all()
     )
     logger.debug(
         "Invitations retrieved",
-        extra={"user_id": str(ctx.user.id), "count": len(invitations)},
+        extra={"user_id": str(user_id), "count": len(invitations)},
     )
     return [InvitationOut.from_orm_with_labels(inv) for inv in invitations]
 
 
+@router.get("/received", response_model=list[InvitationOut])
+async def get_received_invitations(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    ctx: UserContext = Depends(get_current_user_async),
+) -> list[InvitationOut]:
+    """List of invitations received by the current user."""
+    if not ctx.user.email:
+        return []
+    return await db.run_sync(_list_received_invitations, ctx.user.id, ctx.user.email)
+
+
 @router.get("/ride/{ride_id}", response_model=list[InvitationOut])
 def get_ride_invitations(
     ride_id: UUID,
@@ -57,7 +67,8 @@ def get_ride_invitations(
     ctx: UserContext = Depends(get_current_user),
 ) -> list[InvitationOut]:
     """List of invitations for a specific ride (only for car owner)."""
-    ride = db.query(Ride).join(Car).filter(Ride.id == ride_id).first()
+    # Every invitation's .ride resolves to this instance from the identity map
+    ride = db.query(Ride).options(*RIDE_OUT_OPTIONS).filter(Ride.id == ride_id).first()
     if not ride:
         raise HTTPException(status_code=404, detail="Ride not found.")
     if ride.car.owner_id != ctx.user.id:
@@ -179,9 +190,8 @@ def resolve_invitation_token(
             "ride_id": str(invitation.ride_id),
             "status": invitation.status.value,
         },
-        db=db,
+        persist=True,
     )
-    db.commit()
 
     driver_name = None
     car_name = None
@@ -291,6 +301,7 @@ def accept_invitation(
     )
     db.add(passenger)
     db.commit()
+    og_prerenderer.schedule(invitation.ride_id)
     logger.info(
         "Invitation accepted",
         extra={
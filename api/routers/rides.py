@@ -1,14 +1,20 @@
+import asyncio
+import base64
+import json
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import Response
-from sqlalchemy import or_
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from api.database import get_db
-from api.deps import UserContext, get_current_user
-from api.models import Car, CarDriver, Invitation, Passenger, Ride
+from api.config import settings
+from api.database import get_async_db, get_db
+from api.deps import UserContext, get_current_user, get_current_user_async
+from api.models import Car, CarDriver, Invitation, Passenger, Ride, RideMember
 from api.schemas import (
     InvitationCreate,
     InvitationOut,
@@ -18,15 +24,27 @@ from api.schemas import (
     RideUpdate,
     TransferDriverIn,
 )
-from api.utils.enums import InvitationStatus
+from api.utils.enums import InvitationStatus, RideScope
 from api.utils.logging_config import get_logger
-from api.utils.og import draw_ride_og_image
+from api.utils.og import OG_MEDIA_TYPES
+from api.utils.og_cache import (
+    OGRenderInputs,
+    etag_matches,
+    negotiate_og_format,
+    og_image_cache,
+)
+from api.utils.og_pool import OGRenderPoolBusy, og_render_pool
+from api.utils.og_prerender import og_prerenderer
+from api.utils.ride_loading import RIDE_OUT_OPTIONS
 from api.utils.seats import get_layout_seat_positions
 from api.utils.security import generate_token
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+RIDES_PAGE_SIZE = 20
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 def _swap_driver_and_passenger_seats(
     db: Session,
@@ -124,7 +142,7 @@ def _check_invitation_expiration(
 
 def _get_ride_or_404(ride_id: UUID, db: Session) -> Ride:
     """Helper to get a ride by ID or raise 404 if not found."""
-    ride = db.query(Ride).filter(Ride.id == ride_id).first()
+    ride = db.query(Ride).options(*RIDE_OUT_OPTIONS).filter(Ride.id == ride_id).first()
     if not ride:
         raise HTTPException(status_code=404, detail="Ride not found.")
     return ride
@@ -198,32 +216,116 @@ def _assert_ride_not_past(ride: Ride) -> None:
         raise HTTPException(status_code=409, detail="Past rides are read-only.")
 
 
-@router.get("/", response_model=list[RideOut])
-def get_my_rides(
-    request: Request,
-    db: Session = Depends(get_db),
-    ctx: UserContext = Depends(get_current_user),
-) -> list[RideOut]:
-    """Get all rides where the user is a passenger, car owner, or driver."""
-    rides = (
-        db.query(Ride)
-        .join(Car, Ride.car_id == Car.id)
-        .join(CarDriver, Ride.car_driver_id == CarDriver.id)
-        .outerjoin(Passenger, Ride.id == Passenger.ride_id)
-        .filter(
-            or_(
-                Car.owner_id == ctx.user.id,
-                CarDriver.driver_id == ctx.user.id,
-                Passenger.user_id == ctx.user.id,
+def _encode_ride_cursor(
+    scope: RideScope, departure_time: datetime, ride_id: UUID
+) -> str:
+    payload = json.dumps(
+        {"s": scope.value, "t": departure_time.isoformat(), "id": str(ride_id)}
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_ride_cursor(scope: RideScope, cursor: str) -> tuple[datetime, UUID]:
+    """Position (departure_time, id) after which the next page starts."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        if data["s"] != scope.value:
+            raise ValueError("Cursor belongs to another scope")
+        departure_time = datetime.fromisoformat(data["t"])
+        if departure_time.tzinfo is None:
+            departure_time = departure_time.replace(tzinfo=timezone.utc)
+        return departure_time, UUID(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from e
+
+
+def _list_my_rides(
+    db: Session,
+    user_id: UUID,
+    *,
+    scope: RideScope = RideScope.UPCOMING,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[RideOut], str | None]:
+    """Rides where the user is a passenger, car owner, or driver.
+
+    Keyset-paginated on (departure_time, id): upcoming rides soonest first,
+    past rides most recent first. The page is one range scan of the user's
+    ride_members rows. Returns the page and the cursor of the next one (None
+    on the last page).
+    """
+    now = datetime.now(timezone.utc)
+    query = db.query(RideMember.ride_id, RideMember.departure_time).filter(
+        RideMember.user_id == user_id
+    )
+    if scope == RideScope.UPCOMING:
+        query = query.filter(RideMember.departure_time >= now).order_by(
+            RideMember.departure_time.asc(), RideMember.ride_id.asc()
+        )
+        if cursor:
+            after_time, after_id = _decode_ride_cursor(scope, cursor)
+            query = query.filter(
+                tuple_(RideMember.departure_time, RideMember.ride_id)
+                > (after_time, after_id)
             )
+    else:
+        query = query.filter(RideMember.departure_time < now).order_by(
+            RideMember.departure_time.desc(), RideMember.ride_id.desc()
         )
-        .distinct()
+        if cursor:
+            before_time, before_id = _decode_ride_cursor(scope, cursor)
+            query = query.filter(
+                tuple_(RideMember.departure_time, RideMember.ride_id)
+                < (before_time, before_id)
+            )
+
+    if limit is not None:
+        query = query.limit(limit + 1)
+    members = query.all()
+    next_cursor = None
+    if limit is not None and len(members) > limit:
+        members = members[:limit]
+        last_id, last_time = members[-1]
+        next_cursor = _encode_ride_cursor(scope, last_time, last_id)
+
+    ride_ids = [ride_id for ride_id, _ in members]
+    rides_by_id = {
+        ride.id: ride
+        for ride in db.query(Ride)
+        .options(*RIDE_OUT_OPTIONS)
+        .filter(Ride.id.in_(ride_ids))
         .all()
-    )
+    }
+    rides = [rides_by_id[ride_id] for ride_id in ride_ids if ride_id in rides_by_id]
+
     logger.debug(
-        "Rides retrieved", extra={"user_id": str(ctx.user.id), "count": len(rides)}
+        "Rides retrieved",
+        extra={"user_id": str(user_id), "scope": scope.value, "count": len(rides)},
     )
-    return [RideOut.from_ride(ride) for ride in rides]
+    return [RideOut.from_ride(ride) for ride in rides], next_cursor
+
+
+@router.get("/", response_model=list[RideOut])
+async def get_my_rides(
+    request: Request,
+    response: Response,
+    scope: RideScope = RideScope.UPCOMING,
+    limit: int = Query(RIDES_PAGE_SIZE, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    ctx: UserContext = Depends(get_current_user_async),
+) -> list[RideOut]:
+    """Get a page of rides where the user is a passenger, car owner, or driver.
+
+    The cursor of the next page, if any, is sent in the X-Next-Cursor header.
+    """
+    rides, next_cursor = await db.run_sync(
+        _list_my_rides, ctx.user.id, scope=scope, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rides
 
 
 @router.post("/", response_model=RideOut)
@@ -275,6 +377,7 @@ def create_ride(
     db.add(ride)
     db.commit()
     db.refresh(ride)
+    og_prerenderer.schedule(ride.id)
 
     get_or_create_public_invitation(ride.id, db)
 
@@ -313,15 +416,9 @@ def get_or_create_public_invitation(ride_id: UUID, db: Session) -> Invitation:
     return public_invite
 
 
-@router.get("/{ride_id}", response_model=RideOut)
-def get_ride(
-    ride_id: UUID,
-    request: Request,
-    invite_token: str | None = None,
-    db: Session = Depends(get_db),
-    ctx: UserContext = Depends(get_current_user),
+def _get_ride_detail(
+    db: Session, ride_id: UUID, ctx: UserContext, invite_token: str | None
 ) -> RideOut:
-    """Get ride detail."""
     ride = _get_ride_or_404(ride_id, db)
     _assert_ride_access(
         ride,
@@ -334,6 +431,18 @@ def get_ride(
     return RideOut.from_ride(ride)
 
 
+@router.get("/{ride_id}", response_model=RideOut)
+async def get_ride(
+    ride_id: UUID,
+    request: Request,
+    invite_token: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    ctx: UserContext = Depends(get_current_user_async),
+) -> RideOut:
+    """Get ride detail."""
+    return await db.run_sync(_get_ride_detail, ride_id, ctx, invite_token)
+
+
 @router.patch("/{ride_id}", response_model=RideOut)
 def update_ride(
     ride_id: UUID,
@@ -350,6 +459,7 @@ def update_ride(
     ride.departure_time = ride_in.departure_time
     ride.destination = ride_in.destination
     db.commit()
+    og_prerenderer.schedule(ride_id)
     db.refresh(ride)
     return RideOut.from_ride(ride)
 
@@ -416,6 +526,7 @@ def book_seat(
     )
     db.add(passenger)
     db.commit()
+    og_prerenderer.schedule(ride_id)
     db.refresh(ride)
     logger.info(
         "Passenger booked seat",
@@ -453,6 +564,7 @@ def cancel_booking(
 
     db.delete(passenger)
     db.commit()
+    og_prerenderer.schedule(ride_id)
     return Response(status_code=204)
 
 
@@ -604,6 +716,7 @@ def transfer_driver(
     ride.car_driver = new_car_driver
 
     db.commit()
+    og_prerenderer.schedule(ride_id)
     db.refresh(ride)
 
     logger.info(
@@ -650,6 +763,7 @@ def leave_ride(
 
     db.delete(passenger)
     db.commit()
+    og_prerenderer.schedule(ride_id)
     logger.info(
         "Passenger left ride",
         extra={"user_id": str(ctx.user.id), "ride_id": str(ride_id)},
@@ -692,6 +806,7 @@ def remove_passenger(
 
     db.delete(passenger)
     db.commit()
+    og_prerenderer.schedule(ride_id)
     logger.info(
         "Passenger removed from ride",
         extra={
@@ -703,34 +818,90 @@ def remove_passenger(
     return Response(status_code=204)
 
 
-@router.get("/og/{ride_id}", response_class=Response)
-def get_ride_og_image(
-    ride_id: UUID,
-    db: Session = Depends(get_db),
-) -> Response:
-    """Public endpoint to generate real-time Open Graph image for a ride."""
+def _load_og_render_inputs(
+    db: Session, ride_id: UUID, image_format: str
+) -> OGRenderInputs:
     ride = db.query(Ride).filter(Ride.id == ride_id).first()
     if not ride:
         raise HTTPException(status_code=404, detail="Ride not found.")
+    return OGRenderInputs.from_ride(ride, image_format)
 
-    # Get occupied seat positions from passengers list
-    occupied_positions = [p.seat_position for p in ride.passengers]
 
-    # Call the Pillow image generator
-    try:
-        img_bytes = draw_ride_og_image(
-            destination=ride.destination,
-            departure_time=ride.departure_time,
-            car_name=ride.car.name,
-            car_layout=ride.car.layout.value,
-            occupied_seat_positions=occupied_positions,
+def _og_render_unavailable(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(settings.og_render_retry_after_seconds)},
+    )
+
+
+@router.get("/og/{ride_id}", response_class=Response)
+async def get_ride_og_image(
+    ride_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Public endpoint to generate real-time Open Graph image for a ride.
+
+    Rendered images are cached by a hash of their inputs, which is also sent
+    as a strong ETag so crawlers can revalidate with If-None-Match. WebP or
+    JPEG is served when the Accept header asks for it, PNG otherwise.
+    Renders are awaited on the event loop, so a crawler burst waiting on the
+    render pool does not tie up the threadpool.
+    """
+    image_format = negotiate_og_format(request.headers.get("accept"))
+    render_inputs = await db.run_sync(_load_og_render_inputs, ride_id, image_format)
+    render_key = render_inputs.key
+    headers = {
+        "Cache-Control": "public, max-age=60, must-revalidate",
+        "ETag": f'"{render_key}"',
+        "Vary": "Accept",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    img_bytes = await asyncio.to_thread(og_image_cache.get, render_key)
+    if img_bytes is None:
+        # Render in the dedicated process pool, shedding load when saturated
+        try:
+            rendered = await og_render_pool.render_async(render_inputs)
+        except OGRenderPoolBusy:
+            logger.warning(
+                "OG render pool saturated",
+                extra={"ride_id": str(ride_id), "pending": og_render_pool.pending},
+            )
+            raise _og_render_unavailable("Image rendering is busy, try again later.")
+        except TimeoutError:
+            logger.warning(
+                "OG render timed out",
+                extra={"ride_id": str(ride_id), "timeout": og_render_pool.timeout},
+            )
+            raise _og_render_unavailable("Image rendering timed out, try again later.")
+        except BrokenProcessPool:
+            raise _og_render_unavailable(
+                "Image rendering is unavailable, try again later."
+            )
+        except Exception as e:
+            logger.error(f"Failed to generate OG image for ride {ride_id}: {e}")
+            raise HTTPException(status_code=500, detail="Could not generate image.")
+
+        img_bytes = rendered.content
+        await asyncio.to_thread(og_image_cache.set, render_key, img_bytes)
+        headers["Server-Timing"] = (
+            f"og-compose;dur={rendered.compose_ms}, og-encode;dur={rendered.encode_ms}"
+        )
+        logger.info(
+            "OG image rendered",
+            extra={
+                "ride_id": str(ride_id),
+                "format": image_format,
+                "size_bytes": len(img_bytes),
+                "compose_ms": rendered.compose_ms,
+                "encode_ms": rendered.encode_ms,
+            },
         )
-    except Exception as e:
-        logger.error(f"Failed to generate OG image for ride {ride_id}: {e}")
-        raise HTTPException(status_code=500, detail="Could not generate image.")
 
     return Response(
-        content=img_bytes,
-        media_type="image/png",
-        headers={"Cache-Control": "public, max-age=60, must-revalidate"},
+        content=img_bytes, media_type=OG_MEDIA_TYPES[image_format], headers=headers
     )
@@ -6,7 +6,7 @@ from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 from .utils.base_models import BaseModelWithLabels
-from .utils.enums import CarLayout, InvitationStatus
+from .utils.enums import CarLayout, DeletionJobStatus, InvitationStatus
 
 if TYPE_CHECKING:
     from .models import Car, Invitation, Seat
@@ -112,6 +112,18 @@ class SocialDashboardOut(BaseModel):
     accounts: list[SocialAccountDashboardOut]
     sessions: list[SocialSessionOut]
     events: list[IntegrationAuditEventOut]
+    has_more_sessions: bool = False
+
+
+class AccountDeletionStatusOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    confirmation_code: str
+    status: DeletionJobStatus
+    requested_at: datetime
+    completed_at: datetime | None = None
+    rides_total: int
+    rides_deleted: int
 
 
 # === Car Driver ===
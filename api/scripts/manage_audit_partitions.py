@@ -0,0 +1,171 @@
+import argparse
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from api.database import SessionLocal
+
+# Setup basic logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("manage_audit_partitions")
+
+PARENT_TABLE = "integration_audit_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+@dataclass
+class PartitionReport:
+    created: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    default_rows_deleted: int = 0
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before) `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """Month covered by a monthly partition, None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def retention_cutoff(today: date, retention_months: int) -> date:
+    """First day that is still retained."""
+    return add_months(today.replace(day=1), -retention_months)
+
+
+def expired_partitions(
+    names: list[str], today: date, retention_months: int
+) -> list[str]:
+    """Monthly partitions whose whole range is older than the retention."""
+    cutoff = retention_cutoff(today, retention_months)
+    expired = []
+    for name in names:
+        month = partition_month(name)
+        if month is not None and add_months(month, 1) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+def _existing_partitions(db: Session) -> list[str]:
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE},
+    ).scalars()
+    return list(rows)
+
+
+def manage_audit_partitions(
+    *,
+    months_ahead: int = 3,
+    retention_months: int = 6,
+    detach_only: bool = False,
+    today: date | None = None,
+) -> PartitionReport:
+    """Create upcoming monthly partitions and remove expired ones.
+
+    Expired partitions are dropped, or only detached with `detach_only` so
+    they can be archived (e.g. pg_dump) and dropped by hand. Rows past the
+    retention that landed in the default partition cannot be detached and
+    are deleted in either mode. Creating a month fails while the default
+    partition still holds rows of that month, so run this well ahead of the
+    month boundary.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    report = PartitionReport()
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            logger.error("Audit log partitioning requires PostgreSQL.")
+            return report
+
+        existing = set(_existing_partitions(db))
+        current = today.replace(day=1)
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') "
+                    f"TO ('{add_months(month, 1).isoformat()}')"
+                )
+            )
+            report.created.append(name)
+
+        for name in expired_partitions(sorted(existing), today, retention_months):
+            if detach_only:
+                db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            else:
+                db.execute(text(f"DROP TABLE {name}"))
+            report.removed.append(name)
+
+        if DEFAULT_PARTITION in existing:
+            result = db.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+                {"cutoff": retention_cutoff(today, retention_months)},
+            )
+            report.default_rows_deleted = int(getattr(result, "rowcount", 0))
+
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error occurred while managing audit partitions: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(
+        f"Created {len(report.created)} partition(s), "
+        f"{'detached' if detach_only else 'dropped'} {len(report.removed)} "
+        f"partition(s) and deleted {report.default_rows_deleted} default "
+        f"partition row(s) older than {retention_months} month(s)."
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Create upcoming monthly partitions of integration_audit_logs and "
+            "drop (or detach) the ones past retention."
+        )
+    )
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--retention-months", type=int, default=6)
+    parser.add_argument(
+        "--detach-only",
+        action="store_true",
+        help="detach expired partitions instead of dropping them",
+    )
+    args = parser.parse_args()
+
+    manage_audit_partitions(
+        months_ahead=args.months_ahead,
+        retention_months=args.retention_months,
+        detach_only=args.detach_only,
+    )
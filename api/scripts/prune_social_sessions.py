@@ -0,0 +1,146 @@
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select
+
+from api.database import SessionLocal
+from api.models import SocialSession
+
+# Setup basic logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("prune_social_sessions")
+
+
+@dataclass
+class PruneStats:
+    expired: int = 0
+    revoked: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def deleted(self) -> int:
+        return self.expired + self.revoked
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+
+def _delete_chunk(column: Any, cutoff: datetime, chunk_size: int) -> int:
+    """Delete up to chunk_size sessions with column < cutoff in one transaction.
+
+    Ids are picked through the column's index with SKIP LOCKED, so rows held
+    by a concurrent request (e.g. a revoke in progress) are left for the
+    next run instead of blocking it.
+    """
+    db = SessionLocal()
+    try:
+        ids = (
+            db.execute(
+                select(SocialSession.id)
+                .where(column < cutoff)
+                .order_by(column)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return 0
+        db.execute(
+            delete(SocialSession)
+            .where(SocialSession.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return len(ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def prune_social_sessions(
+    *,
+    retention_days: int = 30,
+    chunk_size: int = 1000,
+    pause: float = 0.0,
+) -> PruneStats:
+    """Delete sessions that expired or were revoked over retention_days ago.
+
+    Work is split into chunks of chunk_size rows, each in its own short
+    transaction, with an optional pause between chunks to leave headroom
+    for live traffic.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    stats = PruneStats()
+    started = time.perf_counter()
+    logger.info(f"Pruning social sessions expired or revoked before {cutoff}...")
+
+    for label, column in (
+        ("expired", SocialSession.expires_at),
+        ("revoked", SocialSession.revoked_at),
+    ):
+        while True:
+            try:
+                count = _delete_chunk(column, cutoff, chunk_size)
+            except Exception as e:
+                logger.error(f"Error occurred while pruning sessions: {e}")
+                raise
+            if count == 0:
+                break
+            setattr(stats, label, getattr(stats, label) + count)
+            stats.chunks += 1
+            stats.elapsed = time.perf_counter() - started
+            logger.info(
+                f"Deleted {stats.deleted} session(s) so far "
+                f"({stats.rows_per_second:.0f} rows/s)"
+            )
+            if count < chunk_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+    stats.elapsed = time.perf_counter() - started
+    if stats.deleted == 0:
+        logger.info("No expired or revoked sessions to prune.")
+    else:
+        logger.info(
+            f"Pruned {stats.expired} expired and {stats.revoked} revoked "
+            f"session(s) in {stats.chunks} chunk(s), {stats.elapsed:.1f}s "
+            f"({stats.rows_per_second:.0f} rows/s)."
+        )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Delete expired and long-revoked social sessions in chunks."
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=30,
+        help="keep sessions expired or revoked within this many days",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--pause", type=float, default=0.0, help="seconds to sleep between chunks"
+    )
+    args = parser.parse_args()
+
+    prune_social_sessions(
+        retention_days=args.retention_days,
+        chunk_size=args.chunk_size,
+        pause=args.pause,
+    )
@@ -0,0 +1,89 @@
+import argparse
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import delete, exists, select
+
+from api.database import SessionLocal
+from api.models import Ride, RideMember
+from api.services.ride_members import sync_ride_members
+
+# Setup basic logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("rebuild_ride_members")
+
+
+def _rebuild_chunk(after: UUID | None, chunk_size: int) -> tuple[UUID | None, int]:
+    """Recompute members of the next chunk_size rides in one transaction.
+
+    Returns the last ride id of the chunk (None when done) and rows written.
+    """
+    db = SessionLocal()
+    try:
+        query = select(Ride.id).order_by(Ride.id).limit(chunk_size)
+        if after is not None:
+            query = query.where(Ride.id > after)
+        ride_ids = list(db.execute(query).scalars())
+        if not ride_ids:
+            return None, 0
+        written = sync_ride_members(db.connection(), ride_ids)
+        db.commit()
+        return ride_ids[-1], written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def rebuild_ride_members(*, chunk_size: int = 1000) -> int:
+    """Rebuild the ride_members read model from rides, cars and passengers.
+
+    Rides are walked by id in chunks, each in its own short transaction, so
+    the table stays usable while it is rebuilt. Returns rows written.
+    """
+    started = time.perf_counter()
+    logger.info("Rebuilding ride members...")
+    total = 0
+    after: UUID | None = None
+    while True:
+        try:
+            after, written = _rebuild_chunk(after, chunk_size)
+        except Exception as e:
+            logger.error(f"Error occurred while rebuilding ride members: {e}")
+            raise
+        if after is None:
+            break
+        total += written
+        logger.info(f"Wrote {total} ride member row(s) so far")
+
+    # Rows of rides deleted without the flush hook (e.g. by hand)
+    db = SessionLocal()
+    try:
+        orphans = db.execute(
+            delete(RideMember).where(~exists().where(Ride.id == RideMember.ride_id))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info(
+        f"Rebuilt {total} ride member row(s), removed "
+        f"{getattr(orphans, 'rowcount', 0)} orphaned row(s) in "
+        f"{time.perf_counter() - started:.1f}s."
+    )
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild (or backfill) the ride_members read model in chunks."
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    rebuild_ride_members(chunk_size=args.chunk_size)
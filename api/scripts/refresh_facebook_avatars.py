@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import or_, select
+
+from api.database import SessionLocal
+from api.models import SocialAccount, User
+from api.services.avatar_refresh import AVATAR_MAX_AGE, AvatarRefresher
+from api.services.http_client import close_http_client
+
+# Setup basic logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("refresh_facebook_avatars")
+
+
+def _find_expiring_avatars(margin: timedelta) -> list[tuple[UUID, str]]:
+    """Return (user_id, facebook_id) of avatars expiring within margin."""
+    cutoff = datetime.now(timezone.utc) - (AVATAR_MAX_AGE - margin)
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(User.id, SocialAccount.social_id)
+            .join(SocialAccount, SocialAccount.user_id == User.id)
+            .where(
+                SocialAccount.provider == "facebook",
+                or_(
+                    User.avatar_url.contains("fbsbx.com"),
+                    User.avatar_url.contains("facebook.com"),
+                ),
+                User.updated_at < cutoff,
+            )
+        ).all()
+        return [(user_id, facebook_id) for user_id, facebook_id in rows]
+    finally:
+        db.close()
+
+
+async def refresh_facebook_avatars(
+    *, margin: timedelta = timedelta(hours=1), concurrency: int = 5
+) -> int:
+    """Refresh Facebook avatars before the proxy sees them expire.
+
+    Returns the number of avatars refreshed.
+    """
+    targets = _find_expiring_avatars(margin)
+    if not targets:
+        logger.info("No expiring Facebook avatars found.")
+        return 0
+
+    logger.info(f"Refreshing {len(targets)} expiring Facebook avatar(s)...")
+    refresher = AvatarRefresher()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def refresh(user_id: UUID, facebook_id: str) -> str | None:
+        async with semaphore:
+            return await refresher.refresh(user_id, facebook_id)
+
+    try:
+        results = await asyncio.gather(
+            *(refresh(user_id, facebook_id) for user_id, facebook_id in targets)
+        )
+    finally:
+        await close_http_client()
+
+    refreshed = sum(1 for url in results if url)
+    logger.info(
+        f"Refreshed {refreshed} Facebook avatar(s), {len(targets) - refreshed} failed."
+    )
+    return refreshed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Refresh Facebook avatars that are about to expire."
+    )
+    parser.add_argument(
+        "--margin-minutes",
+        type=int,
+        default=60,
+        help="refresh avatars expiring within this many minutes",
+    )
+    parser.add_argument("--concurrency", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(
+        refresh_facebook_avatars(
+            margin=timedelta(minutes=args.margin_minutes),
+            concurrency=args.concurrency,
+        )
+    )
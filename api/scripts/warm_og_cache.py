@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import selectinload
+
+from api.config import settings
+from api.database import SessionLocal
+from api.models import Ride
+from api.utils.og_cache import (
+    OGImageCache,
+    OGRenderInputs,
+    RenderedOGImage,
+    og_image_cache,
+)
+from api.utils.og_pool import OGRenderPool, OGRenderPoolBusy
+from api.utils.og_prerender import PRERENDER_FORMATS
+
+# Setup basic logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("warm_og_cache")
+
+Cursor = tuple[datetime, UUID]
+
+
+@dataclass
+class WarmupStats:
+    scanned: int = 0
+    rendered: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rides_per_second(self) -> float:
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+
+def _load_checkpoint(path: str | None) -> Cursor | None:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return datetime.fromisoformat(data["departure_time"]), UUID(data["ride_id"])
+
+
+def _save_checkpoint(path: str | None, cursor: Cursor) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"departure_time": cursor[0].isoformat(), "ride_id": str(cursor[1])}, f
+        )
+    os.replace(tmp_path, path)
+
+
+def _fetch_chunk(
+    now: datetime, cursor: Cursor | None, chunk_size: int
+) -> tuple[list[OGRenderInputs], Cursor | None]:
+    """Load the next page of upcoming rides ordered by (departure_time, id).
+
+    The session is closed before rendering so no connection is held while
+    the workers are busy.
+    """
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(Ride)
+            .options(selectinload(Ride.car), selectinload(Ride.passengers))
+            .filter(Ride.departure_time > now)
+        )
+        if cursor is not None:
+            query = query.filter(tuple_(Ride.departure_time, Ride.id) > cursor)
+        rides = query.order_by(Ride.departure_time, Ride.id).limit(chunk_size).all()
+        if not rides:
+            return [], None
+        inputs = [
+            OGRenderInputs.from_ride(ride, image_format)
+            for ride in rides
+            for image_format in PRERENDER_FORMATS
+        ]
+        return inputs, (rides[-1].departure_time, rides[-1].id)
+    finally:
+        db.close()
+
+
+def warm_og_cache(
+    *,
+    chunk_size: int = 200,
+    rate: float | None = None,
+    checkpoint: str | None = None,
+    pool: OGRenderPool | None = None,
+    cache: OGImageCache = og_image_cache,
+) -> WarmupStats:
+    """Render OG images of all upcoming rides into the shared OG cache.
+
+    Rides are streamed with keyset pagination, already cached images are
+    skipped, renders are capped at `rate` per second and progress is stored
+    in `checkpoint` after every chunk so an interrupted run can resume.
+    """
+    if pool is None:
+        pool = OGRenderPool(
+            workers=max(settings.og_render_workers, 1),
+            max_pending=settings.og_render_max_pending,
+            timeout=settings.og_render_timeout_seconds,
+        )
+
+    stats = WarmupStats()
+    now = datetime.now(timezone.utc)
+    cursor = _load_checkpoint(checkpoint)
+    if cursor is not None:
+        logger.info(f"Resuming after ride {cursor[1]} departing {cursor[0]}")
+
+    started = time.perf_counter()
+    in_flight: dict[Future[RenderedOGImage], str] = {}
+    submitted = 0
+
+    def collect(futures: set[Future[RenderedOGImage]]) -> None:
+        for future in futures:
+            key = in_flight.pop(future)
+            try:
+                cache.set(key, future.result().content)
+                stats.rendered += 1
+            except Exception as e:
+                stats.failed += 1
+                logger.warning(f"Render failed for cache key {key[:12]}: {e}")
+
+    def submit(inputs: OGRenderInputs) -> Future[RenderedOGImage]:
+        # The pool frees a slot in a done-callback that runs after wait()
+        # has already woken up, so a just-finished render can still count
+        # as pending. Back off until the slot is actually released.
+        while True:
+            try:
+                return pool.submit(inputs)
+            except OGRenderPoolBusy:
+                done, _ = wait(in_flight, timeout=0.05, return_when=FIRST_COMPLETED)
+                collect(done)
+
+    try:
+        pool.start()
+        while True:
+            chunk, next_cursor = _fetch_chunk(now, cursor, chunk_size)
+            if next_cursor is None:
+                break
+
+            for inputs in chunk:
+                stats.scanned += 1
+                key = inputs.key
+                if cache.exists(key):
+                    stats.skipped += 1
+                    continue
+
+                if rate:
+                    # Pace submissions: the n-th render starts no earlier
+                    # than n / rate seconds into the run
+                    delay = started + submitted / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                while len(in_flight) >= pool.max_pending:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight[submit(inputs)] = key
+                submitted += 1
+
+            collect(set(in_flight))
+            cursor = next_cursor
+            _save_checkpoint(checkpoint, cursor)
+
+            stats.elapsed = time.perf_counter() - started
+            logger.info(
+                f"Processed {stats.scanned} ride image(s): {stats.rendered} rendered, "
+                f"{stats.skipped} cached, {stats.failed} failed "
+                f"({stats.rides_per_second:.1f}/s)"
+            )
+    finally:
+        pool.shutdown()
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(
+        f"OG cache warm-up finished in {stats.elapsed:.1f}s: {stats.rendered} "
+        f"rendered, {stats.skipped} already cached, {stats.failed} failed, "
+        f"{stats.rides_per_second:.1f} images/s"
+    )
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-render OG images of upcoming rides into the shared cache."
+    )
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument(
+        "--rate", type=float, default=None, help="max renders per second"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=".og_warmup_checkpoint.json",
+        help="file storing the last processed ride, used to resume",
+    )
+    args = parser.parse_args()
+
+    if not og_image_cache.shared:
+        logger.error(
+            "OG_CACHE_REDIS_ENABLED is off: rendered images would only live in "
+            "this process and be discarded on exit."
+        )
+        raise SystemExit(1)
+
+    warm_og_cache(
+        chunk_size=args.chunk_size, rate=args.rate, checkpoint=args.checkpoint
+    )
@@ -0,0 +1,469 @@
+"""Account anonymization (GDPR deletion) as set-based bulk statements.
+
+An account is released in the request transaction: sessions, OAuth links
+and personal data are removed with a handful of bulk DELETE/UPDATE
+statements, whatever the account size. Future rides are deleted in the same
+transaction for ordinary accounts; accounts with more than
+ACCOUNT_DELETION_INLINE_MAX_RIDES future rides get an AccountDeletionJob
+instead, which a background worker runs in chunks of short transactions.
+
+Provider deletion callbacks (Facebook) do no cleanup at all: they only
+record a job keyed by the confirmation code they return, and the worker
+performs the whole anonymization.
+
+A worker claims a job with a conditional UPDATE before touching it, so
+several app processes (or a restart mid-run) never process the same job
+at once. A running job whose worker died is claimable again once it has
+made no progress for ACCOUNT_DELETION_CLAIM_TIMEOUT_SECONDS.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import Select, and_, delete, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.database import SessionLocal
+from api.models import (
+    AccountDeletionJob,
+    Car,
+    CarDriver,
+    Invitation,
+    Passenger,
+    Ride,
+    RideMember,
+    Seat,
+    SocialAccount,
+    SocialSession,
+    User,
+)
+from api.services.ride_members import sync_ride_members
+from api.utils.enums import DeletionJobStatus
+from api.utils.logging_config import get_logger
+from api.utils.session_cache import session_validation_cache
+
+logger = get_logger(__name__)
+
+ANONYMIZED_FULL_NAME = "Smazaný uživatel"
+
+# Bulk statements bypass the identity map; nothing loaded needs syncing
+_BULK = {"synchronize_session": False}
+
+
+@dataclass(frozen=True)
+class AccountDeletionResult:
+    """Outcome of anonymize_user_data.
+
+    After committing, callers pass session_ids to
+    session_validation_cache.invalidate() and submit job_id (if any) to
+    account_deletion_worker.
+    """
+
+    session_ids: list[UUID] = field(default_factory=list)
+    job_id: UUID | None = None
+
+
+def _future_rides(user_id: UUID, cutoff: datetime) -> Select[tuple[UUID]]:
+    """Ids of rides after cutoff that the user drives or whose car they own."""
+    return select(Ride.id).where(
+        Ride.departure_time > cutoff,
+        or_(
+            Ride.car_driver_id.in_(
+                select(CarDriver.id).where(CarDriver.driver_id == user_id)
+            ),
+            Ride.car_id.in_(select(Car.id).where(Car.owner_id == user_id)),
+        ),
+    )
+
+
+def _delete_rides(db: Session, ride_ids: Select[tuple[UUID]] | Sequence[UUID]) -> int:
+    db.execute(
+        delete(RideMember)
+        .where(RideMember.ride_id.in_(ride_ids))
+        .execution_options(**_BULK)
+    )
+    db.execute(
+        delete(Passenger)
+        .where(Passenger.ride_id.in_(ride_ids))
+        .execution_options(**_BULK)
+    )
+    db.execute(
+        delete(Invitation)
+        .where(Invitation.ride_id.in_(ride_ids))
+        .execution_options(**_BULK)
+    )
+    result = db.execute(
+        delete(Ride).where(Ride.id.in_(ride_ids)).execution_options(**_BULK)
+    )
+    return int(getattr(result, "rowcount", 0))
+
+
+def _release_account(db: Session, user_id: UUID, cutoff: datetime) -> list[UUID]:
+    """Log the user out, unlink providers, cancel bookings and erase PII."""
+    session_ids = list(
+        db.execute(
+            delete(SocialSession)
+            .where(SocialSession.user_id == user_id)
+            .returning(SocialSession.id)
+            .execution_options(**_BULK)
+        ).scalars()
+    )
+    db.execute(
+        delete(SocialAccount)
+        .where(SocialAccount.user_id == user_id)
+        .execution_options(**_BULK)
+    )
+    booked_ride_ids = list(
+        db.execute(
+            delete(Passenger)
+            .where(
+                Passenger.user_id == user_id,
+                Passenger.ride_id.in_(
+                    select(Ride.id).where(Ride.departure_time > cutoff)
+                ),
+            )
+            .returning(Passenger.ride_id)
+            .execution_options(**_BULK)
+        ).scalars()
+    )
+    sync_ride_members(db.connection(), booked_ride_ids)
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(email=None, full_name=ANONYMIZED_FULL_NAME, avatar_url=None)
+        .execution_options(**_BULK)
+    )
+    return session_ids
+
+
+def _finish_cars(db: Session, user_id: UUID) -> None:
+    """Delete owned cars left without rides and deactivate driver roles."""
+    car_ids = list(
+        db.execute(
+            select(Car.id).where(
+                Car.owner_id == user_id, ~exists().where(Ride.car_id == Car.id)
+            )
+        ).scalars()
+    )
+    if car_ids:
+        for model, column in (
+            (Seat, Seat.car_id),
+            (CarDriver, CarDriver.car_id),
+            (Car, Car.id),
+        ):
+            db.execute(
+                delete(model).where(column.in_(car_ids)).execution_options(**_BULK)
+            )
+    db.execute(
+        update(CarDriver)
+        .where(CarDriver.driver_id == user_id)
+        .values(is_active=False)
+        .execution_options(**_BULK)
+    )
+
+
+def anonymize_user_data(
+    db: Session, user_id: UUID, *, now: datetime | None = None
+) -> AccountDeletionResult:
+    """GDPR-compliant user anonymization (soft-deletion).
+
+    Preserves past rides and past passenger participations for other users
+    while deleting all future bookings, future rides, sessions and OAuth
+    linkages. Does not commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    rides_total = db.execute(
+        select(func.count()).select_from(_future_rides(user_id, now).subquery())
+    ).scalar_one()
+
+    session_ids = _release_account(db, user_id, now)
+
+    if rides_total <= settings.account_deletion_inline_max_rides:
+        _delete_rides(db, _future_rides(user_id, now))
+        _finish_cars(db, user_id)
+        return AccountDeletionResult(session_ids=session_ids)
+
+    job = AccountDeletionJob(
+        user_id=user_id,
+        status=DeletionJobStatus.PENDING,
+        requested_at=now,
+        rides_total=rides_total,
+        rides_deleted=0,
+        attempts=0,
+    )
+    db.add(job)
+    db.flush()
+    logger.info(
+        "Account cleanup deferred to background job",
+        extra={"user_id": str(user_id), "rides_total": rides_total},
+    )
+    return AccountDeletionResult(session_ids=session_ids, job_id=job.id)
+
+
+def enqueue_account_deletion(
+    db: Session, user_id: UUID, *, confirmation_code: str
+) -> AccountDeletionJob:
+    """Record a deletion for the worker without touching the user's data.
+
+    Does not commit; submit the job to account_deletion_worker afterwards.
+    """
+    job = AccountDeletionJob(
+        user_id=user_id,
+        status=DeletionJobStatus.PENDING,
+        confirmation_code=confirmation_code,
+        requested_at=datetime.now(timezone.utc),
+        rides_total=0,
+        rides_deleted=0,
+        attempts=0,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def _claim_job(db: Session, job_id: UUID, claim_timeout: float) -> bool:
+    """Atomically mark a job running for this worker; False if it is taken.
+
+    Pending and failed jobs are claimable, running ones only once their
+    claim is stale. Every committed chunk bumps updated_at, which keeps a
+    live worker's claim fresh.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=claim_timeout)
+    result = db.execute(
+        update(AccountDeletionJob)
+        .where(
+            AccountDeletionJob.id == job_id,
+            or_(
+                AccountDeletionJob.status.in_(
+                    [DeletionJobStatus.PENDING, DeletionJobStatus.FAILED]
+                ),
+                and_(
+                    AccountDeletionJob.status == DeletionJobStatus.RUNNING,
+                    AccountDeletionJob.updated_at < stale_before,
+                ),
+            ),
+        )
+        .values(
+            status=DeletionJobStatus.RUNNING,
+            attempts=AccountDeletionJob.attempts + 1,
+            updated_at=now,
+        )
+        .execution_options(**_BULK)
+    )
+    db.commit()
+    return int(getattr(result, "rowcount", 0)) == 1
+
+
+def run_deletion_job(
+    job_id: UUID,
+    chunk_size: int,
+    session_factory: Callable[[], Session] = SessionLocal,
+    *,
+    claim_timeout: float | None = None,
+) -> DeletionJobStatus | None:
+    """Delete a job's rides chunk by chunk, committing progress after each.
+
+    Safe to re-run after a failure: finished chunks are gone, so the job
+    resumes where it stopped. Returns the final status (None if unknown);
+    RUNNING means another worker holds the job.
+    """
+    if claim_timeout is None:
+        claim_timeout = settings.account_deletion_claim_timeout_seconds
+    db = session_factory()
+    try:
+        if not _claim_job(db, job_id, claim_timeout):
+            job = db.get(AccountDeletionJob, job_id)
+            if job is None:
+                return None
+            if job.status == DeletionJobStatus.RUNNING:
+                logger.info(
+                    "Account cleanup job held by another worker",
+                    extra={"job_id": str(job_id)},
+                )
+            return job.status
+        job = db.get(AccountDeletionJob, job_id, populate_existing=True)
+        if job is None:
+            return None
+        # Releasing the account is idempotent; it is a no-op for jobs whose
+        # request already did it inline
+        session_ids = _release_account(db, job.user_id, job.requested_at)
+        # Count until the first chunk is gone, also when taking over a job
+        # from a worker that died before counting
+        if job.rides_deleted == 0:
+            job.rides_total = db.execute(
+                select(func.count()).select_from(
+                    _future_rides(job.user_id, job.requested_at).subquery()
+                )
+            ).scalar_one()
+        db.commit()
+        session_validation_cache.invalidate(session_ids)
+
+        while True:
+            ride_ids = list(
+                db.execute(
+                    _future_rides(job.user_id, job.requested_at).limit(chunk_size)
+                ).scalars()
+            )
+            if not ride_ids:
+                break
+            job.rides_deleted += _delete_rides(db, ride_ids)
+            db.commit()
+
+        _finish_cars(db, job.user_id)
+        job.status = DeletionJobStatus.COMPLETED
+        job.completed_at = datetime.now(timezone.utc)
+        job.last_error = None
+        db.commit()
+        logger.info(
+            "Account cleanup job completed",
+            extra={"job_id": str(job_id), "rides_deleted": job.rides_deleted},
+        )
+        return job.status
+    except Exception as e:
+        db.rollback()
+        logger.error(
+            "Account cleanup job failed",
+            extra={"job_id": str(job_id), "error": str(e)},
+        )
+        job = db.get(AccountDeletionJob, job_id)
+        if job is not None:
+            job.status = DeletionJobStatus.FAILED
+            job.last_error = str(e)[:500]
+            db.commit()
+        return DeletionJobStatus.FAILED
+    finally:
+        db.close()
+
+
+class AccountDeletionWorker:
+    """Daemon thread running account cleanup jobs, retried with a delay."""
+
+    def __init__(
+        self,
+        *,
+        chunk_size: int,
+        max_attempts: int,
+        retry_delay: float,
+        claim_timeout: float,
+        enabled: bool = True,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.claim_timeout = claim_timeout
+        self.enabled = enabled
+        self._session_factory = session_factory
+        self._queue: queue.Queue[UUID] = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._retries: set[threading.Timer] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: UUID) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="account-deletion-worker", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(job_id)
+
+    def resume_pending(self) -> int:
+        """Re-submit jobs left unfinished by a previous process."""
+        if not self.enabled:
+            return 0
+        db = self._session_factory()
+        try:
+            job_ids = list(
+                db.execute(
+                    select(AccountDeletionJob.id).where(
+                        or_(
+                            AccountDeletionJob.status.in_(
+                                [DeletionJobStatus.PENDING, DeletionJobStatus.RUNNING]
+                            ),
+                            (AccountDeletionJob.status == DeletionJobStatus.FAILED)
+                            & (AccountDeletionJob.attempts < self.max_attempts),
+                        )
+                    )
+                ).scalars()
+            )
+        finally:
+            db.close()
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop after the current chunk; unfinished jobs resume on next start."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            retries, self._retries = self._retries, set()
+        for timer in retries:
+            timer.cancel()
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+            self._stop.clear()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            status = run_deletion_job(
+                job_id,
+                self.chunk_size,
+                self._session_factory,
+                claim_timeout=self.claim_timeout,
+            )
+            if status == DeletionJobStatus.FAILED:
+                self._schedule_retry(job_id)
+            elif status == DeletionJobStatus.RUNNING:
+                # Held elsewhere; look again once a dead holder's claim expires
+                self._submit_later(job_id, self.claim_timeout)
+
+    def _schedule_retry(self, job_id: UUID) -> None:
+        db = self._session_factory()
+        try:
+            job = db.get(AccountDeletionJob, job_id)
+            attempts = job.attempts if job is not None else self.max_attempts
+        finally:
+            db.close()
+        if attempts >= self.max_attempts:
+            logger.error("Account cleanup job gave up", extra={"job_id": str(job_id)})
+            return
+        # Back off linearly with the number of attempts
+        self._submit_later(job_id, self.retry_delay * attempts)
+
+    def _submit_later(self, job_id: UUID, delay: float) -> None:
+        timer = threading.Timer(delay, self._retry, (job_id,))
+        timer.daemon = True
+        with self._lock:
+            self._retries.add(timer)
+        timer.start()
+
+    def _retry(self, job_id: UUID) -> None:
+        with self._lock:
+            self._retries = {t for t in self._retries if t.is_alive()}
+        self.submit(job_id)
+
+
+account_deletion_worker = AccountDeletionWorker(
+    chunk_size=settings.account_deletion_chunk_size,
+    max_attempts=settings.account_deletion_max_attempts,
+    retry_delay=settings.account_deletion_retry_delay_seconds,
+    claim_timeout=settings.account_deletion_claim_timeout_seconds,
+    enabled=settings.account_deletion_worker_enabled,
+)
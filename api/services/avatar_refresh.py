@@ -0,0 +1,178 @@
+"""Background refresh of expiring Facebook profile picture URLs.
+
+Facebook picture URLs are signed and expire, so the avatar proxy refreshes
+them through the Graph API. The proxy never waits for that: it redirects to
+the URL it has (stale-while-revalidate) and schedules a refresh here. At
+most one refresh per user is in flight, so a ride page showing the same
+passenger several times, or many viewers at once, costs one Graph call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import httpx
+
+from api.config import settings
+from api.database import SessionLocal
+from api.models import User
+from api.services.http_client import get_http_client, provider_timeout
+from api.services.oauth_service import normalize_avatar_url
+from api.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+GRAPH_PICTURE_URL = "https://graph.facebook.com/v20.0/{facebook_id}/picture"
+
+# Signed picture URLs are treated as stale after this age
+AVATAR_MAX_AGE = timedelta(hours=12)
+
+# After a failed refresh, wait this long before asking Facebook again
+REFRESH_RETRY_AFTER_SECONDS = 300.0
+
+
+def is_facebook_avatar(url: str | None) -> bool:
+    return url is not None and ("fbsbx.com" in url or "facebook.com" in url)
+
+
+def is_avatar_stale(updated_at: datetime, *, margin: timedelta = timedelta(0)) -> bool:
+    """Whether an avatar refreshed at updated_at is (within margin of) expiry."""
+    age = datetime.now(timezone.utc) - updated_at.astimezone(timezone.utc)
+    return age > AVATAR_MAX_AGE - margin
+
+
+async def fetch_facebook_avatar_url(facebook_id: str) -> str | None:
+    """Ask the Graph API for a fresh signed picture URL."""
+    app_token = f"{settings.facebook_client_id}|{settings.facebook_client_secret}"
+    response = await get_http_client().get(
+        GRAPH_PICTURE_URL.format(facebook_id=facebook_id),
+        params={"redirect": "false", "type": "large", "access_token": app_token},
+        timeout=provider_timeout("facebook"),
+    )
+    if response.status_code != 200:
+        logger.warning(
+            "Facebook avatar lookup failed",
+            extra={"status_code": response.status_code},
+        )
+        return None
+    url = response.json().get("data", {}).get("url")
+    return normalize_avatar_url(url) if url else None
+
+
+async def fetch_avatar_bytes(avatar_url: str) -> tuple[bytes, str] | None:
+    """Download avatar bytes for the disk cache; returns (content, media_type).
+
+    Returns None for errors, non-image responses and bodies larger than
+    AVATAR_MAX_FETCH_BYTES.
+    """
+    provider = "facebook" if is_facebook_avatar(avatar_url) else "x"
+    limit = settings.avatar_max_fetch_bytes
+    try:
+        async with get_http_client().stream(
+            "GET",
+            avatar_url,
+            timeout=provider_timeout(provider),
+            follow_redirects=True,
+        ) as response:
+            media_type = response.headers.get("content-type", "").split(";")[0]
+            if response.status_code != 200 or not media_type.startswith("image/"):
+                logger.warning(
+                    "Avatar download failed",
+                    extra={"status_code": response.status_code},
+                )
+                return None
+            content = b""
+            async for chunk in response.aiter_bytes():
+                content += chunk
+                if len(content) > limit:
+                    logger.warning("Avatar too large to cache", extra={"limit": limit})
+                    return None
+    except httpx.HTTPError as e:
+        logger.warning("Avatar download failed", extra={"error": str(e)})
+        return None
+    return content, media_type
+
+
+def _store_avatar_url(user_id: UUID, avatar_url: str) -> None:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user:
+            user.avatar_url = avatar_url
+            # Facebook often returns the same URL; without a change onupdate
+            # would not fire and the avatar would stay stale, re-triggering a
+            # Graph call on every request
+            user.updated_at = datetime.now(timezone.utc)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class AvatarRefresher:
+    """Single-flight scheduler for Facebook avatar refreshes, one per user."""
+
+    def __init__(self, retry_after: float = REFRESH_RETRY_AFTER_SECONDS) -> None:
+        self.retry_after = retry_after
+        self._inflight: dict[UUID, asyncio.Task[str | None]] = {}
+        self._failed_at: dict[UUID, float] = {}
+
+    def schedule(
+        self, user_id: UUID, facebook_id: str
+    ) -> asyncio.Task[str | None] | None:
+        """Start a background refresh unless one is running or recently failed.
+
+        Must be called from the event loop. Returns the in-flight task, or
+        None while backing off after a failure.
+        """
+        task = self._inflight.get(user_id)
+        if task is not None:
+            return task
+        failed_at = self._failed_at.get(user_id)
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+            return None
+
+        task = asyncio.create_task(self.refresh(user_id, facebook_id))
+        self._inflight[user_id] = task
+        task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        return task
+
+    async def refresh(self, user_id: UUID, facebook_id: str) -> str | None:
+        """Fetch and store a fresh picture URL; returns it or None on failure."""
+        try:
+            avatar_url = await fetch_facebook_avatar_url(facebook_id)
+            if avatar_url:
+                await asyncio.to_thread(_store_avatar_url, user_id, avatar_url)
+        except Exception as e:
+            avatar_url = None
+            logger.warning(
+                "Failed to refresh Facebook avatar",
+                extra={"user_id": str(user_id), "error": str(e)},
+            )
+
+        if avatar_url:
+            self._failed_at.pop(user_id, None)
+            logger.info("Refreshed Facebook avatar", extra={"user_id": str(user_id)})
+        else:
+            if len(self._failed_at) >= 10_000:
+                self._failed_at.clear()
+            self._failed_at[user_id] = time.monotonic()
+        return avatar_url
+
+    def pending(self) -> set[UUID]:
+        return set(self._inflight)
+
+    async def shutdown(self) -> None:
+        """Cancel refreshes still in flight."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+avatar_refresher = AvatarRefresher()
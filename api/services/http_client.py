@@ -0,0 +1,65 @@
+"""Shared outbound HTTP client for OAuth providers and the Graph API.
+
+One AsyncClient is opened in the app lifespan and reused by every outbound
+call, so connections (and their TLS sessions) to x.com and facebook.com
+are kept alive between logins instead of being re-established per call.
+"""
+
+from __future__ import annotations
+
+from importlib.util import find_spec
+
+import httpx
+
+from api.config import settings
+from api.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+
+def provider_timeout(provider: str) -> httpx.Timeout:
+    """Request timeout for an OAuth provider."""
+    seconds = {
+        "x": settings.oauth_x_timeout_seconds,
+        "facebook": settings.oauth_facebook_timeout_seconds,
+    }.get(provider, 5.0)
+    return httpx.Timeout(seconds)
+
+
+def _http2_available() -> bool:
+    if not settings.outbound_http2_enabled:
+        return False
+    if find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the h2 package is not installed")
+        return False
+    return True
+
+
+def start_http_client() -> httpx.AsyncClient:
+    """Open the shared client (idempotent)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(
+                max_connections=settings.outbound_http_max_connections,
+                max_keepalive_connections=settings.outbound_http_max_connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, opening it outside the app lifespan too."""
+    return start_http_client()
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
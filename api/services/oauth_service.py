@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 
 from api import models
 from api.config import settings
+from api.services.http_client import get_http_client, provider_timeout
 from api.utils.logging_config import get_logger
 from api.utils.security import generate_token
 
@@ -120,45 +121,45 @@ class XOAuthClient:
         query = urlencode(params)
         return f"{self.AUTHORIZE_URL}?{query}"
 
-    def exchange_code(self, code: str, code_verifier: str) -> dict[str, str]:
+    async def exchange_code(self, code: str, code_verifier: str) -> dict[str, str]:
         """Exchange authorization code for access token."""
-        with httpx.Client(timeout=httpx.Timeout(5.0)) as client:
-            try:
-                response = client.post(
-                    self.TOKEN_URL,
-                    data={
-                        "grant_type": "authorization_code",
-                        "code": code,
-                        "redirect_uri": str(settings.x_redirect_uri),
-                        "code_verifier": code_verifier,
-                        "client_id": settings.x_client_id,
-                    },
-                    auth=(settings.x_client_id, settings.x_client_secret),
-                )
-                response.raise_for_status()
-                result: dict[str, str] = response.json()
-                logger.info("X OAuth token exchange successful")
-                return result
-            except httpx.HTTPError as e:
-                logger.error("X OAuth token exchange failed", extra={"error": str(e)})
-                raise
+        try:
+            response = await get_http_client().post(
+                self.TOKEN_URL,
+                data={
+                    "grant_type": "authorization_code",
+                    "code": code,
+                    "redirect_uri": str(settings.x_redirect_uri),
+                    "code_verifier": code_verifier,
+                    "client_id": settings.x_client_id,
+                },
+                auth=(settings.x_client_id, settings.x_client_secret),
+                timeout=provider_timeout("x"),
+            )
+            response.raise_for_status()
+            result: dict[str, str] = response.json()
+            logger.info("X OAuth token exchange successful")
+            return result
+        except httpx.HTTPError as e:
+            logger.error("X OAuth token exchange failed", extra={"error": str(e)})
+            raise
 
     async def get_user_info(self, access_token: str) -> dict[str, str | None]:
         """Fetch user profile from X API."""
-        async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-            response = await client.get(
-                self.USER_URL,
-                params={"user.fields": "id,name,profile_image_url"},
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            response.raise_for_status()
-            data = response.json().get("data", {})
-            return {
-                "id": data.get("id"),
-                "email": data.get("email") or None,
-                "full_name": data.get("name"),
-                "avatar_url": normalize_avatar_url(data.get("profile_image_url")),
-            }
+        response = await get_http_client().get(
+            self.USER_URL,
+            params={"user.fields": "id,name,profile_image_url"},
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=provider_timeout("x"),
+        )
+        response.raise_for_status()
+        data = response.json().get("data", {})
+        return {
+            "id": data.get("id"),
+            "email": data.get("email") or None,
+            "full_name": data.get("name"),
+            "avatar_url": normalize_avatar_url(data.get("profile_image_url")),
+        }
 
 
 class FacebookOAuthClient:
@@ -178,50 +179,50 @@ class FacebookOAuthClient:
         query = urlencode(params)
         return f"{self.AUTHORIZE_URL}?{query}"
 
-    def exchange_code(self, code: str) -> dict[str, str]:
+    async def exchange_code(self, code: str) -> dict[str, str]:
         """Exchange authorization code for access token."""
-        with httpx.Client(timeout=httpx.Timeout(5.0)) as client:
-            try:
-                response = client.get(
-                    self.TOKEN_URL,
-                    params={
-                        "client_id": settings.facebook_client_id,
-                        "client_secret": settings.facebook_client_secret,
-                        "redirect_uri": str(settings.facebook_redirect_uri),
-                        "code": code,
-                    },
-                )
-                response.raise_for_status()
-                result: dict[str, str] = response.json()
-                logger.info("Facebook OAuth token exchange successful")
-                return result
-            except httpx.HTTPError as e:
-                logger.error(
-                    "Facebook OAuth token exchange failed", extra={"error": str(e)}
-                )
-                raise
-
-    async def get_user_info(self, access_token: str) -> dict[str, str | None]:
-        """Fetch user profile from Facebook Graph API."""
-        async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-            response = await client.get(
-                self.USER_URL,
+        try:
+            response = await get_http_client().get(
+                self.TOKEN_URL,
                 params={
-                    "fields": "id,name,email,picture",
-                    "access_token": access_token,
+                    "client_id": settings.facebook_client_id,
+                    "client_secret": settings.facebook_client_secret,
+                    "redirect_uri": str(settings.facebook_redirect_uri),
+                    "code": code,
                 },
+                timeout=provider_timeout("facebook"),
             )
             response.raise_for_status()
-            data = response.json()
-
-            return {
-                "id": data.get("id"),
-                "email": data.get("email") or None,
-                "full_name": data.get("name"),
-                "avatar_url": normalize_avatar_url(
-                    data.get("picture", {}).get("data", {}).get("url")
-                ),
-            }
+            result: dict[str, str] = response.json()
+            logger.info("Facebook OAuth token exchange successful")
+            return result
+        except httpx.HTTPError as e:
+            logger.error(
+                "Facebook OAuth token exchange failed", extra={"error": str(e)}
+            )
+            raise
+
+    async def get_user_info(self, access_token: str) -> dict[str, str | None]:
+        """Fetch user profile from Facebook Graph API."""
+        response = await get_http_client().get(
+            self.USER_URL,
+            params={
+                "fields": "id,name,email,picture",
+                "access_token": access_token,
+            },
+            timeout=provider_timeout("facebook"),
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        return {
+            "id": data.get("id"),
+            "email": data.get("email") or None,
+            "full_name": data.get("name"),
+            "avatar_url": normalize_avatar_url(
+                data.get("picture", {}).get("data", {}).get("url")
+            ),
+        }
 
 
 def find_or_create_user(
@@ -0,0 +1,138 @@
+"""ride_members read model: which rides involve a user, and in what role.
+
+A user is a member of a ride as its driver, as the owner of its car or as a
+passenger; "my rides" is a range scan of ix_ride_members_user_id_departure_time
+instead of an OR across three joined tables.
+
+Rows are recomputed per ride from the source tables in the flush that
+changes a ride, a passenger, a car's owner or a car driver's user, so they
+commit (or roll back) with the change itself. Bulk UPDATE/DELETE statements
+bypass the flush and must call sync_ride_members() themselves.
+api/scripts/rebuild_ride_members.py rebuilds the whole table.
+"""
+
+from collections.abc import Collection, Iterable
+from itertools import chain
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Connection, delete, event, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from api.models import Base, Car, CarDriver, Passenger, Ride, RideMember
+from api.utils.enums import RideMemberRole
+
+SYNC_CHUNK_SIZE = 500
+
+# Strongest role first; a user keeps only the first role found for a ride
+_MEMBER_SOURCES = (
+    (
+        RideMemberRole.DRIVER,
+        select(Ride.id, CarDriver.driver_id, Ride.departure_time).join(
+            CarDriver, Ride.car_driver_id == CarDriver.id
+        ),
+    ),
+    (
+        RideMemberRole.OWNER,
+        select(Ride.id, Car.owner_id, Ride.departure_time).join(
+            Car, Ride.car_id == Car.id
+        ),
+    ),
+    (
+        RideMemberRole.PASSENGER,
+        select(Ride.id, Passenger.user_id, Ride.departure_time).join(
+            Passenger, Passenger.ride_id == Ride.id
+        ),
+    ),
+)
+
+
+def _member_rows(connection: Connection, ride_ids: list[UUID]) -> list[dict[str, Any]]:
+    members: dict[tuple[UUID, UUID], dict[str, Any]] = {}
+    for role, source in _MEMBER_SOURCES:
+        for ride_id, user_id, departure_time in connection.execute(
+            source.where(Ride.id.in_(ride_ids))
+        ):
+            members.setdefault(
+                (user_id, ride_id),
+                {
+                    "user_id": user_id,
+                    "ride_id": ride_id,
+                    "role": role,
+                    "departure_time": departure_time,
+                },
+            )
+    return list(members.values())
+
+
+def sync_ride_members(connection: Connection, ride_ids: Collection[UUID]) -> int:
+    """Recompute the members of the given rides; returns rows written.
+
+    Rides that no longer exist simply lose their rows.
+    """
+    ordered = sorted(ride_ids)
+    written = 0
+    for start in range(0, len(ordered), SYNC_CHUNK_SIZE):
+        chunk = ordered[start : start + SYNC_CHUNK_SIZE]
+        rows = _member_rows(connection, chunk)
+        connection.execute(delete(RideMember).where(RideMember.ride_id.in_(chunk)))
+        if rows:
+            connection.execute(insert(RideMember), rows)
+        written += len(rows)
+    return written
+
+
+def _changed(obj: Base, *attributes: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+def _previous(obj: Base, attribute: str) -> Iterable[Any]:
+    return inspect(obj).attrs[attribute].history.deleted or ()
+
+
+def _affected_ride_ids(session: Session) -> set[UUID]:
+    ride_ids: set[UUID] = set()
+    car_ids: set[UUID] = set()
+    car_driver_ids: set[UUID] = set()
+
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, Ride):
+            ride_ids.add(obj.id)
+        elif isinstance(obj, Passenger):
+            ride_ids.add(obj.ride_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Ride):
+            if _changed(obj, "departure_time", "car_id", "car_driver_id"):
+                ride_ids.add(obj.id)
+        elif isinstance(obj, Passenger):
+            if _changed(obj, "user_id", "ride_id"):
+                ride_ids.add(obj.ride_id)
+                ride_ids.update(_previous(obj, "ride_id"))
+        elif isinstance(obj, Car):
+            if _changed(obj, "owner_id"):
+                car_ids.add(obj.id)
+        elif isinstance(obj, CarDriver):
+            if _changed(obj, "driver_id"):
+                car_driver_ids.add(obj.id)
+
+    if car_ids or car_driver_ids:
+        ride_ids.update(
+            session.connection()
+            .execute(
+                select(Ride.id).where(
+                    Ride.car_id.in_(car_ids) | Ride.car_driver_id.in_(car_driver_ids)
+                )
+            )
+            .scalars()
+        )
+    ride_ids.discard(None)  # type: ignore[arg-type]
+    return ride_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_after_flush(session: Session, flush_context: object) -> None:
+    ride_ids = _affected_ride_ids(session)
+    if ride_ids:
+        sync_ride_members(session.connection(), ride_ids)
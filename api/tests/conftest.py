@@ -1,5 +1,6 @@
 import os
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator, Mapping
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from types import SimpleNamespace
 from typing import Any
@@ -11,6 +12,9 @@ from fastapi.testclient import TestClient
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 from starlette.requests import Request as StarletteRequest
 from starlette.responses import Response as StarletteResponse
 
@@ -30,11 +34,21 @@ os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
 os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
 os.environ.setdefault("FRONTEND_ORIGIN", "http://localhost:5173")
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+os.environ.setdefault("OG_RENDER_WORKERS", "0")
+os.environ.setdefault("OG_PRERENDER_ENABLED", "false")
+os.environ.setdefault("INTEGRATION_AUDIT_PERSIST_ENABLED", "false")
 os.environ["WORKER_SECRET"] = ""
 
-from api.database import get_db  # noqa: E402
-from api.deps import UserContext, get_current_user  # noqa: E402
-from api.models import User  # noqa: E402
+from api.database import get_async_db, get_db  # noqa: E402
+from api.deps import (  # noqa: E402
+    AuthenticatedUser,
+    UserContext,
+    get_current_user,
+    get_current_user_async,
+)
+from api.models import Base, Car, CarDriver, Ride, User  # noqa: E402
+from api.utils import integration_audit  # noqa: E402
+from api.utils.enums import CarLayout  # noqa: E402
 from api.utils.limiter import limiter  # noqa: E402
 
 
@@ -74,6 +88,12 @@ class FakeQuery:
     def limit(self, *args: Any, **kwargs: Any) -> "FakeQuery":
         return self
 
+    def offset(self, *args: Any, **kwargs: Any) -> "FakeQuery":
+        return self
+
+    def group_by(self, *args: Any, **kwargs: Any) -> "FakeQuery":
+        return self
+
     def distinct(self) -> "FakeQuery":
         return self
 
@@ -92,7 +112,7 @@ class FakeDB:
         self.commit_called = False
         self.flush_called = False
 
-    def query(self, model: Any) -> FakeQuery:
+    def query(self, model: Any, *columns: Any) -> FakeQuery:
         return self.query_results.get(model, FakeQuery())
 
     def add(self, instance: Any) -> None:
@@ -197,6 +217,16 @@ class FakeDB:
             pass
 
 
+class FakeAsyncDB:
+    """AsyncSession stand-in that runs run_sync() callbacks on a FakeDB."""
+
+    def __init__(self, sync_db: FakeDB):
+        self.sync_db = sync_db
+
+    async def run_sync(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        return fn(self.sync_db, *args, **kwargs)
+
+
 def create_client(
     *,
     router: Any,
@@ -213,26 +243,132 @@ def create_client(
     def _get_db_override() -> Generator[FakeDB, None, None]:
         yield fake_db
 
+    async def _get_async_db_override() -> AsyncGenerator[FakeAsyncDB, None]:
+        yield FakeAsyncDB(fake_db)
+
     app.dependency_overrides[get_db] = _get_db_override
+    app.dependency_overrides[get_async_db] = _get_async_db_override
 
     if current_user is not None:
         app.dependency_overrides[get_current_user] = lambda: current_user
+        app.dependency_overrides[get_current_user_async] = lambda: current_user
 
     return TestClient(app)
 
 
+def create_sqlite_engine() -> Engine:
+    """In-memory SQLite database with the full schema.
+
+    All sessions and threads share one connection, so data committed by
+    code under test (scripts, workers) is visible to the test. SQLite has
+    no now(), which server defaults rely on, so it is registered here.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.create_function(
+            "now", 0, lambda: datetime.now(timezone.utc).isoformat()
+        )
+
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def sqlite_engine() -> Generator[Engine, None, None]:
+    engine = create_sqlite_engine()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(sqlite_engine: Engine) -> sessionmaker[Session]:
+    """Sessions on a fresh SQLite database; patch it in as SessionLocal."""
+    return sessionmaker(bind=sqlite_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker[Session]) -> Generator[Session, None, None]:
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@dataclass
+class SeededCar:
+    owner: User
+    car: Car
+    driver: CarDriver
+    rides: list[Ride]
+
+
+def seed_car(
+    db: Session,
+    rides: Mapping[str, datetime],
+    *,
+    owner: User | None = None,
+    name: str = "Car",
+) -> SeededCar:
+    """Commit a car driven by its owner, with a ride per destination.
+
+    A new "Owner" user is created unless one is given. Rides are returned
+    in the order of the mapping.
+    """
+    if owner is None:
+        owner = User(email="owner@example.com", full_name="Owner")
+        db.add(owner)
+        db.flush()
+    car = Car(owner_id=owner.id, name=name, layout=CarLayout.SEDAQ)
+    db.add(car)
+    db.flush()
+    driver = CarDriver(car_id=car.id, driver_id=owner.id)
+    db.add(driver)
+    db.flush()
+    seeded_rides = [
+        Ride(
+            car_id=car.id,
+            car_driver_id=driver.id,
+            departure_time=departure_time,
+            destination=destination,
+        )
+        for destination, departure_time in rides.items()
+    ]
+    db.add_all(seeded_rides)
+    db.commit()
+    return SeededCar(owner=owner, car=car, driver=driver, rides=seeded_rides)
+
+
+class RecordingAuditWriter:
+    """Stand-in for the buffered audit writer that keeps queued rows."""
+
+    def __init__(self) -> None:
+        self.rows: list[dict[str, Any]] = []
+
+    def enqueue(self, row: dict[str, Any]) -> bool:
+        self.rows.append(row)
+        return True
+
+    def events(self) -> list[str]:
+        return [row["event"] for row in self.rows]
+
+
+@pytest.fixture
+def audit_events(monkeypatch: pytest.MonkeyPatch) -> RecordingAuditWriter:
+    writer = RecordingAuditWriter()
+    monkeypatch.setattr(integration_audit, "audit_writer", writer)
+    return writer
+
+
 @pytest.fixture
 def fake_user_context() -> UserContext:
-    user = User(
-        id=uuid4(),
-        email="owner@example.com",
-        full_name="Owner User",
-        avatar_url=None,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
-    )
     return UserContext(
-        user=user, session_id=UUID("11111111-1111-1111-1111-111111111111")
+        user=AuthenticatedUser(id=uuid4(), email="owner@example.com"),
+        session_id=UUID("11111111-1111-1111-1111-111111111111"),
     )
 
 
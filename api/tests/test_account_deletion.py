@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from api.config import settings
+from api.models import (
+    AccountDeletionJob,
+    Car,
+    CarDriver,
+    Passenger,
+    Ride,
+    Seat,
+    SocialAccount,
+    SocialSession,
+    User,
+)
+from api.routers import auth
+from api.services.account_deletion import (
+    _claim_job,
+    anonymize_user_data,
+    enqueue_account_deletion,
+    run_deletion_job,
+)
+from api.utils.enums import CarLayout, DeletionJobStatus
+
+from .conftest import create_client, seed_car
+
+
+def _seed(db, future_rides: int) -> tuple[User, User, Ride]:
+    now = datetime.now(timezone.utc)
+    owner = User(email="owner@example.com", full_name="Owner", avatar_url="http://a")
+    other = User(email="other@example.com", full_name="Other")
+    db.add_all([owner, other])
+    db.flush()
+
+    account = SocialAccount(user_id=owner.id, provider="x", social_id="x-1")
+    db.add(account)
+    db.flush()
+    db.add(
+        SocialSession(
+            user_id=owner.id,
+            social_account_id=account.id,
+            access_token="token",
+            expires_at=now + timedelta(days=7),
+        )
+    )
+
+    # A car with history and an unused one, plus a car owned by someone else
+    used = seed_car(
+        db,
+        {
+            "Past": now - timedelta(days=3),
+            **{
+                f"Future {i}": now + timedelta(days=1, minutes=i)
+                for i in range(future_rides)
+            },
+        },
+        owner=owner,
+        name="Used",
+    )
+    others = seed_car(db, {"Other": now + timedelta(days=3)}, owner=other, name="Other")
+    spare_car = Car(owner_id=owner.id, name="Spare", layout=CarLayout.SEDAQ)
+    db.add(spare_car)
+    db.flush()
+    db.add_all(
+        [Seat(car_id=spare_car.id, position=1), Seat(car_id=used.car.id, position=1)]
+    )
+    past, others_ride = used.rides[0], others.rides[0]
+
+    future_ride_ids = db.execute(
+        select(Ride.id).where(Ride.destination.like("Future%"))
+    ).scalars()
+    db.add_all(
+        Passenger(user_id=other.id, ride_id=ride_id, seat_position=1)
+        for ride_id in future_ride_ids
+    )
+    db.add_all(
+        [
+            Passenger(user_id=other.id, ride_id=past.id, seat_position=1),
+            Passenger(user_id=owner.id, ride_id=others_ride.id, seat_position=2),
+        ]
+    )
+    db.commit()
+    return owner, other, past
+
+
+def _destinations(db) -> list[str]:
+    return sorted(db.execute(select(Ride.destination)).scalars())
+
+
+def test_anonymize_user_data_runs_inline_for_small_accounts(session_factory):
+    db = session_factory()
+    owner, other, past = _seed(db, future_rides=3)
+
+    result = anonymize_user_data(db, owner.id)
+    db.commit()
+    db.expire_all()
+
+    assert len(result.session_ids) == 1
+    assert result.job_id is None
+    assert owner.email is None
+    assert owner.full_name == "Smazaný uživatel"
+    assert owner.avatar_url is None
+    assert _destinations(db) == ["Other", "Past"]
+    # Past participations survive, future bookings on others' rides do not
+    passengers = db.execute(select(Passenger)).scalars().all()
+    assert [(p.user_id, p.ride_id) for p in passengers] == [(other.id, past.id)]
+    assert db.execute(select(SocialSession)).scalars().all() == []
+    assert db.execute(select(SocialAccount)).scalars().all() == []
+    assert sorted(db.execute(select(Car.name)).scalars()) == ["Other", "Used"]
+    assert db.execute(select(Seat.car_id)).scalars().all() == [past.car_id]
+    driver = db.execute(
+        select(CarDriver).where(CarDriver.driver_id == owner.id)
+    ).scalar_one()
+    assert driver.is_active is False
+    db.close()
+
+
+def test_large_account_is_released_inline_and_cleaned_up_in_chunks(
+    session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "account_deletion_inline_max_rides", 2)
+    db = session_factory()
+    owner, other, past = _seed(db, future_rides=5)
+
+    result = anonymize_user_data(db, owner.id)
+    db.commit()
+    db.expire_all()
+
+    # The account is logged out and anonymized before any ride is touched
+    assert owner.email is None
+    assert db.execute(select(SocialSession)).scalars().all() == []
+    assert len(_destinations(db)) == 7
+    assert result.job_id is not None
+    db.close()
+
+    status = run_deletion_job(result.job_id, 2, session_factory)
+
+    db = session_factory()
+    job = db.get(AccountDeletionJob, result.job_id)
+    assert status == DeletionJobStatus.COMPLETED
+    assert job is not None
+    assert (job.status, job.rides_total, job.rides_deleted) == (
+        DeletionJobStatus.COMPLETED,
+        5,
+        5,
+    )
+    assert job.attempts == 1
+    assert job.completed_at is not None
+    assert _destinations(db) == ["Other", "Past"]
+    assert sorted(db.execute(select(Car.name)).scalars()) == ["Other", "Used"]
+    db.close()
+
+    # Re-running a finished job is a no-op
+    assert run_deletion_job(result.job_id, 2, session_factory) == (
+        DeletionJobStatus.COMPLETED
+    )
+
+
+def test_provider_deletion_is_queued_and_reported_by_confirmation_code(
+    session_factory,
+):
+    db = session_factory()
+    owner, other, past = _seed(db, future_rides=3)
+
+    job = enqueue_account_deletion(db, owner.id, confirmation_code="code-123")
+    db.commit()
+    db.expire_all()
+
+    # Nothing is touched until the worker runs
+    assert owner.email == "owner@example.com"
+    assert len(_destinations(db)) == 5
+    client = create_client(router=auth.router, prefix="/auth", fake_db=db)
+    pending = client.get("/auth/deletion-status/code-123").json()
+    assert pending["status"] == "Pending"
+    assert pending["completed_at"] is None
+
+    assert run_deletion_job(job.id, 2, session_factory) == (DeletionJobStatus.COMPLETED)
+
+    db.expire_all()
+    assert owner.email is None
+    assert db.execute(select(SocialSession)).scalars().all() == []
+    assert _destinations(db) == ["Other", "Past"]
+    done = client.get("/auth/deletion-status/code-123").json()
+    assert done["status"] == "Completed"
+    assert (done["rides_total"], done["rides_deleted"]) == (3, 3)
+    assert done["completed_at"] is not None
+    assert client.get("/auth/deletion-status/unknown").status_code == 404
+    db.close()
+
+
+def test_deletion_job_is_claimed_by_one_worker_at_a_time(session_factory):
+    db = session_factory()
+    owner, other, past = _seed(db, future_rides=3)
+    job = enqueue_account_deletion(db, owner.id, confirmation_code="code-claim")
+    db.commit()
+    job_id = job.id
+
+    # Another worker claimed the job and is making progress
+    assert _claim_job(db, job_id, claim_timeout=600)
+    assert not _claim_job(db, job_id, claim_timeout=600)
+    assert run_deletion_job(job_id, 2, session_factory) == DeletionJobStatus.RUNNING
+    db.expire_all()
+    assert owner.email == "owner@example.com"
+    assert len(_destinations(db)) == 5
+
+    # Its claim goes stale when it stops committing progress, e.g. it died
+    job = db.get(AccountDeletionJob, job_id)
+    job.updated_at = datetime.now(timezone.utc) - timedelta(minutes=11)
+    db.commit()
+    db.close()
+
+    assert run_deletion_job(job_id, 2, session_factory, claim_timeout=600) == (
+        DeletionJobStatus.COMPLETED
+    )
+    db = session_factory()
+    job = db.get(AccountDeletionJob, job_id)
+    assert (job.attempts, job.rides_total, job.rides_deleted) == (2, 3, 3)
+    assert _destinations(db) == ["Other", "Past"]
+    db.close()
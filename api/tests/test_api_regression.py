@@ -1,6 +1,7 @@
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import pytest
 
@@ -11,6 +12,7 @@ from api.models import (
     Invitation,
     Passenger,
     Ride,
+    RideMember,
     SocialAccount,
     SocialSession,
 )
@@ -150,7 +152,12 @@ def test_list_car_rides_for_owner(fake_user_context):
 def test_get_my_rides_includes_owner_rides(fake_user_context):
     car = _car(fake_user_context.user.id)
     ride = _ride(car, fake_user_context.user.id)
-    fake_db = FakeDB(query_results={Ride: FakeQuery(all_result=[ride])})
+    fake_db = FakeDB(
+        query_results={
+            RideMember.ride_id: FakeQuery(all_result=[(ride.id, ride.departure_time)]),
+            Ride: FakeQuery(all_result=[ride]),
+        }
+    )
     client = create_client(
         router=rides.router,
         prefix="/rides",
@@ -516,7 +523,7 @@ def test_remove_passenger_rejects_current_driver(
 def test_get_received_invitations_returns_empty_for_user_without_email(
     fake_user_context,
 ):
-    fake_user_context.user.email = None
+    fake_user_context.user = replace(fake_user_context.user, email=None)
     client = create_client(
         router=invitations.router,
         prefix="/invitations",
@@ -702,8 +709,8 @@ def test_social_dashboard_returns_accounts_sessions_and_events(fake_user_context
 
     fake_db = FakeDB(
         query_results={
-            SocialAccount: FakeQuery(all_result=[account]),
-            SocialSession: FakeQuery(all_result=[session]),
+            SocialAccount: FakeQuery(all_result=[(account, 1, now)]),
+            SocialSession: FakeQuery(all_result=[(session, account.provider)]),
             IntegrationAuditLog: FakeQuery(all_result=[event]),
         }
     )
@@ -721,11 +728,18 @@ def test_social_dashboard_returns_accounts_sessions_and_events(fake_user_context
     assert payload["accounts"][0]["provider"] == "x"
     assert payload["accounts"][0]["provider_email"] is None
     assert payload["accounts"][0]["has_real_email"] is False
+    assert payload["accounts"][0]["active_sessions"] == 1
     assert payload["sessions"][0]["is_current"] is False
+    assert payload["sessions"][0]["provider"] == "x"
+    assert payload["has_more_sessions"] is False
     assert payload["events"][0]["event"] == "social_session_created"
 
 
-def test_revoke_session_by_id_marks_revoked(fake_user_context):
+def test_revoke_session_by_id_marks_revoked(fake_user_context, monkeypatch):
+    invalidated: list[UUID] = []
+    monkeypatch.setattr(
+        auth.session_validation_cache, "invalidate", lambda ids: invalidated.extend(ids)
+    )
     now = datetime.now(timezone.utc)
     account = SimpleNamespace(provider="facebook")
     session_id = uuid4()
@@ -749,6 +763,7 @@ def test_revoke_session_by_id_marks_revoked(fake_user_context):
     assert response.status_code == 204
     assert session.revoked_at is not None
     assert fake_db.commit_called is True
+    assert invalidated == [session_id]
 
 
 def test_unlink_provider_rejects_when_only_provider_left(fake_user_context):
@@ -867,7 +882,9 @@ def test_get_ride_allows_public_invitation_with_any_user_email(
     car = _car(uuid4())
     ride = _ride(car, car.owner_id)
     # Ensure user email is different from public@sitzy.local
-    fake_user_context.user.email = "different-email@example.com"
+    fake_user_context.user = replace(
+        fake_user_context.user, email="different-email@example.com"
+    )
 
     invitation = SimpleNamespace(
         id=uuid4(),
@@ -911,24 +928,9 @@ def test_invitation_schema_allows_local_domain():
         InvitationCreate(invited_email="invalid-email")
 
 
-def test_get_my_rides_includes_driver_rides_real_db():
-    from sqlalchemy import create_engine, event
-    from sqlalchemy.orm import sessionmaker
-
+def test_get_my_rides_includes_driver_rides_real_db(db):
     from api.deps import UserContext
-    from api.models import Base, Car, CarDriver, Passenger, Ride, User
-
-    engine = create_engine("sqlite:///:memory:")
-
-    @event.listens_for(engine, "connect")
-    def connect(dbapi_connection, connection_record):
-        dbapi_connection.create_function(
-            "now", 0, lambda: datetime.now(timezone.utc).isoformat()
-        )
-
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    db = Session()
+    from api.models import Car, CarDriver, Passenger, Ride, User
 
     # Create users
     user_a = User(email="user_a@example.com", full_name="User A")
@@ -963,14 +965,14 @@ def test_get_my_rides_includes_driver_rides_real_db():
 
     # User B (driver, not owner, not passenger) gets their rides
     ctx_b = UserContext(user=user_b, session_id=uuid4())
-    res_b = rides.get_my_rides(request=None, db=db, ctx=ctx_b)
+    res_b, _ = rides._list_my_rides(db, ctx_b.user.id)
 
     assert len(res_b) == 1
     assert res_b[0].id == ride.id
 
     # User A (owner, not driver, passenger) gets their rides
     ctx_a = UserContext(user=user_a, session_id=uuid4())
-    res_a = rides.get_my_rides(request=None, db=db, ctx=ctx_a)
+    res_a, _ = rides._list_my_rides(db, ctx_a.user.id)
 
     assert len(res_a) == 1
     assert res_a[0].id == ride.id
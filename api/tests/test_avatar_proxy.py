@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
@@ -8,7 +9,9 @@ from fastapi.testclient import TestClient
 from api.models import SocialAccount, User
 from api.routers import auth
 from api.schemas import PassengerOut, UserBasicOut, UserOut
+from api.services import avatar_refresh
 from api.services.oauth_service import normalize_avatar_url
+from api.utils.avatar_cache import AvatarDiskCache
 
 from .conftest import FakeDB, FakeQuery, create_client
 
@@ -128,30 +131,36 @@ def test_avatar_proxy_route_redirects_fresh_facebook_immediately():
     assert response.headers["location"] == fb_url
 
 
-def test_avatar_proxy_route_refreshes_stale_facebook(monkeypatch):
-    user_id = uuid4()
-    old_fb_url = "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=123"
-    new_fb_url = (
-        "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=123-new-token"
-    )
+class RecordingRefresher:
+    def __init__(self):
+        self.scheduled = []
 
+    def schedule(self, user_id, facebook_id):
+        self.scheduled.append((user_id, facebook_id))
+
+
+def _stale_facebook_user(user_id, avatar_url):
     user = User(
         id=user_id,
         email="test@example.com",
         full_name="Test User",
-        avatar_url=old_fb_url,
+        avatar_url=avatar_url,
         created_at=datetime.now(timezone.utc),
         # updated_at is 15 hours ago (stale)
         updated_at=datetime.now(timezone.utc) - timedelta(hours=15),
     )
+    user.social_accounts = [
+        SocialAccount(provider="facebook", social_id="fb-123", user_id=user_id)
+    ]
+    return user
 
-    social_account = SocialAccount(
-        provider="facebook",
-        social_id="fb-123",
-        user_id=user_id,
-        user=user,
-    )
-    user.social_accounts = [social_account]
+
+def test_avatar_proxy_route_serves_stale_facebook_and_refreshes_in_background(
+    monkeypatch,
+):
+    user_id = uuid4()
+    old_fb_url = "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=123"
+    user = _stale_facebook_user(user_id, old_fb_url)
 
     class CustomFakeDB(FakeDB):
         def query(self, model):
@@ -159,58 +168,177 @@ def test_avatar_proxy_route_refreshes_stale_facebook(monkeypatch):
                 return FakeQuery(first_result=user)
             return FakeQuery()
 
-    # Mock the httpx call
-    class FakeResponse:
-        status_code = 200
+    refresher = RecordingRefresher()
+    monkeypatch.setattr(auth, "avatar_refresher", refresher)
 
-        def json(self):
-            return {"data": {"url": new_fb_url}}
+    client = create_client(router=auth.router, prefix="/auth", fake_db=CustomFakeDB())
+    response = client.get(f"/auth/users/{user_id}/avatar", follow_redirects=False)
 
-    class FakeAsyncClient:
-        def __init__(self, *args, **kwargs):
-            pass
+    # The current URL is served without waiting for Facebook
+    assert response.headers["location"] == old_fb_url
+    assert refresher.scheduled == [(user_id, "fb-123")]
 
-        async def __aenter__(self):
-            return self
 
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
+def test_avatar_proxy_route_does_not_refresh_fresh_facebook(monkeypatch):
+    user_id = uuid4()
+    fb_url = "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=123"
+    user = _stale_facebook_user(user_id, fb_url)
+    user.updated_at = datetime.now(timezone.utc)
 
-        async def get(self, url, params=None):
-            return FakeResponse()
+    class CustomFakeDB(FakeDB):
+        def query(self, model):
+            if model == User:
+                return FakeQuery(first_result=user)
+            return FakeQuery()
 
-    monkeypatch.setattr(auth.httpx, "AsyncClient", FakeAsyncClient)
+    refresher = RecordingRefresher()
+    monkeypatch.setattr(auth, "avatar_refresher", refresher)
 
     client = create_client(router=auth.router, prefix="/auth", fake_db=CustomFakeDB())
-    response = client.get(f"/auth/users/{user_id}/avatar", follow_redirects=False)
+    client.get(f"/auth/users/{user_id}/avatar", follow_redirects=False)
 
-    # Verify redirect location is the new URL
-    assert response.headers["location"] == new_fb_url
-    # Verify database avatar_url was updated
-    assert user.avatar_url == new_fb_url
+    assert refresher.scheduled == []
 
 
-def test_avatar_proxy_route_graceful_on_facebook_error(monkeypatch):
+def test_avatar_refresher_is_single_flight_per_user(monkeypatch):
+    new_fb_url = "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=new"
+    fetches = []
+    stored = []
+
+    async def fake_fetch(facebook_id):
+        fetches.append(facebook_id)
+        await asyncio.sleep(0)
+        return new_fb_url
+
+    monkeypatch.setattr(avatar_refresh, "fetch_facebook_avatar_url", fake_fetch)
+    monkeypatch.setattr(
+        avatar_refresh,
+        "_store_avatar_url",
+        lambda user_id, url: stored.append((user_id, url)),
+    )
+    refresher = avatar_refresh.AvatarRefresher()
     user_id = uuid4()
-    old_fb_url = "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=123"
 
+    async def run():
+        first = refresher.schedule(user_id, "fb-123")
+        second = refresher.schedule(user_id, "fb-123")
+        assert first is second
+        assert refresher.pending() == {user_id}
+        return await first
+
+    assert asyncio.run(run()) == new_fb_url
+    assert fetches == ["fb-123"]
+    assert stored == [(user_id, new_fb_url)]
+    assert refresher.pending() == set()
+
+
+def test_store_avatar_url_marks_avatar_fresh_even_if_url_is_unchanged(monkeypatch):
+    fb_url = "https://platform-lookaside.fbsbx.com/platform/profilepic/?asid=123"
+    stale = datetime.now(timezone.utc) - timedelta(hours=13)
+    user = User(id=uuid4(), avatar_url=fb_url, updated_at=stale)
+
+    class ClosingFakeDB(FakeDB):
+        def close(self):
+            pass
+
+    db = ClosingFakeDB({User: FakeQuery(first_result=user)})
+    monkeypatch.setattr(avatar_refresh, "SessionLocal", lambda: db)
+
+    avatar_refresh._store_avatar_url(user.id, fb_url)
+
+    assert db.commit_called is True
+    assert user.avatar_url == fb_url
+    assert not avatar_refresh.is_avatar_stale(user.updated_at)
+
+
+def test_avatar_refresher_backs_off_after_failure(monkeypatch):
+    fetches = []
+
+    async def failing_fetch(facebook_id):
+        fetches.append(facebook_id)
+        raise Exception("Facebook API down")
+
+    monkeypatch.setattr(avatar_refresh, "fetch_facebook_avatar_url", failing_fetch)
+    refresher = avatar_refresh.AvatarRefresher(retry_after=60)
+    user_id = uuid4()
+
+    async def run():
+        result = await refresher.schedule(user_id, "fb-123")
+        # A failed user is not retried until the back-off elapses
+        return result, refresher.schedule(user_id, "fb-123")
+
+    result, retry = asyncio.run(run())
+    assert result is None
+    assert retry is None
+    assert fetches == ["fb-123"]
+
+
+def test_avatar_disk_cache_replaces_old_avatar_and_survives_restart(tmp_path):
+    user_id = uuid4()
+    cache = AvatarDiskCache(directory=str(tmp_path), max_bytes=1000)
+
+    cache.set(user_id, "https://example.com/old.png", b"old", "image/png")
+    stored = cache.set(user_id, "https://example.com/new.png", b"new", "image/png")
+
+    assert cache.get(user_id, "https://example.com/old.png") is None
+    assert len(cache) == 1
+
+    reopened = AvatarDiskCache(directory=str(tmp_path), max_bytes=1000)
+    cached = reopened.get(user_id, "https://example.com/new.png")
+    assert cached.content == b"new"
+    assert cached.etag == stored.etag
+
+
+def test_avatar_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = AvatarDiskCache(directory=str(tmp_path), max_bytes=10)
+    first, second, third = uuid4(), uuid4(), uuid4()
+
+    cache.set(first, "https://example.com/a.png", b"aaaa", "image/png")
+    cache.set(second, "https://example.com/b.png", b"bbbb", "image/png")
+    cache.get(first, "https://example.com/a.png")
+    cache.set(third, "https://example.com/c.png", b"cccc", "image/png")
+
+    assert cache.get(second, "https://example.com/b.png") is None
+    assert cache.get(first, "https://example.com/a.png") is not None
+    assert cache.size_bytes == 8
+    assert len(list(tmp_path.iterdir())) == 2
+    # Non-image content is never cached
+    assert cache.set(first, "https://example.com/a", b"<html>", "text/html") is None
+
+
+def test_avatar_disk_cache_enforces_max_bytes_across_workers(tmp_path):
+    worker = AvatarDiskCache(directory=str(tmp_path), max_bytes=10)
+    other_worker = AvatarDiskCache(directory=str(tmp_path), max_bytes=10)
+    worker.load()
+    other_worker.load()
+    first, second, third = uuid4(), uuid4(), uuid4()
+
+    worker.set(first, "https://example.com/a.png", b"aaaa", "image/png")
+    other_worker.set(second, "https://example.com/b.png", b"bbbb", "image/png")
+    other_worker.set(first, "https://example.com/a2.png", b"AAAA", "image/png")
+    worker.set(third, "https://example.com/c.png", b"cccc", "image/png")
+
+    # The budget holds for the shared directory, not per worker
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= 10
+    assert worker.size_bytes == 8
+    # The other worker's replacement removed the first avatar, and the
+    # least recently used file it wrote was evicted by this worker
+    assert worker.get(first, "https://example.com/a.png") is None
+    assert other_worker.get(second, "https://example.com/b.png") is None
+    assert other_worker.get(first, "https://example.com/a2.png").content == b"AAAA"
+
+
+def test_avatar_proxy_route_serves_cached_bytes_with_etag(monkeypatch, tmp_path):
+    user_id = uuid4()
+    avatar_url = "https://pbs.twimg.com/profile_images/1/avatar.jpg"
     user = User(
         id=user_id,
         email="test@example.com",
         full_name="Test User",
-        avatar_url=old_fb_url,
+        avatar_url=avatar_url,
         created_at=datetime.now(timezone.utc),
-        # stale
-        updated_at=datetime.now(timezone.utc) - timedelta(hours=15),
-    )
-
-    social_account = SocialAccount(
-        provider="facebook",
-        social_id="fb-123",
-        user_id=user_id,
-        user=user,
+        updated_at=datetime.now(timezone.utc),
     )
-    user.social_accounts = [social_account]
 
     class CustomFakeDB(FakeDB):
         def query(self, model):
@@ -218,24 +346,62 @@ def test_avatar_proxy_route_graceful_on_facebook_error(monkeypatch):
                 return FakeQuery(first_result=user)
             return FakeQuery()
 
-    # Mock the httpx call to fail
-    class FakeAsyncClient:
-        def __init__(self, *args, **kwargs):
-            pass
+    fetches = []
 
-        async def __aenter__(self):
-            return self
+    async def fake_fetch(url):
+        fetches.append(url)
+        return b"jpeg-bytes", "image/jpeg"
 
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
+    monkeypatch.setattr(auth.settings, "avatar_proxy_cache_enabled", True)
+    monkeypatch.setattr(
+        auth, "avatar_cache", AvatarDiskCache(directory=str(tmp_path), max_bytes=1000)
+    )
+    monkeypatch.setattr(auth, "fetch_avatar_bytes", fake_fetch)
+
+    client = create_client(router=auth.router, prefix="/auth", fake_db=CustomFakeDB())
+    response = client.get(f"/auth/users/{user_id}/avatar", follow_redirects=False)
+
+    assert response.status_code == 200
+    assert response.content == b"jpeg-bytes"
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "max-age=43200" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+
+    revalidated = client.get(
+        f"/auth/users/{user_id}/avatar", headers={"If-None-Match": etag}
+    )
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert fetches == [avatar_url]
+
+
+def test_avatar_proxy_route_redirects_when_download_fails(monkeypatch, tmp_path):
+    user_id = uuid4()
+    avatar_url = "https://pbs.twimg.com/profile_images/1/avatar.jpg"
+    user = User(
+        id=user_id,
+        email="test@example.com",
+        full_name="Test User",
+        avatar_url=avatar_url,
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+
+    class CustomFakeDB(FakeDB):
+        def query(self, model):
+            if model == User:
+                return FakeQuery(first_result=user)
+            return FakeQuery()
 
-        async def get(self, url, params=None):
-            raise Exception("Facebook API down")
+    async def failing_fetch(url):
+        return None
 
-    monkeypatch.setattr(auth.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(auth.settings, "avatar_proxy_cache_enabled", True)
+    monkeypatch.setattr(
+        auth, "avatar_cache", AvatarDiskCache(directory=str(tmp_path), max_bytes=1000)
+    )
+    monkeypatch.setattr(auth, "fetch_avatar_bytes", failing_fetch)
 
     client = create_client(router=auth.router, prefix="/auth", fake_db=CustomFakeDB())
     response = client.get(f"/auth/users/{user_id}/avatar", follow_redirects=False)
 
-    # Should fall back to redirecting to the old avatar URL instead of failing with 500
-    assert response.headers["location"] == old_fb_url
+    assert response.headers["location"] == avatar_url
@@ -5,13 +5,15 @@ from uuid import uuid4
 import pytest
 
 from api.config import settings
-from api.models import Car, IntegrationAuditLog, User
+from api.models import Car, User
 from api.routers import dev_fixtures
 
 from .conftest import FakeDB, FakeQuery, create_client, fake_user_context
 
 
-def test_seed_success_creates_demo_entities(fake_user_context, monkeypatch):
+def test_seed_success_creates_demo_entities(
+    fake_user_context, monkeypatch, audit_events
+):
     fake_db = FakeDB()
     client = create_client(
         router=dev_fixtures.router,
@@ -39,9 +41,9 @@ def test_seed_success_creates_demo_entities(fake_user_context, monkeypatch):
         and "invitation_token" in meta
     )
 
-    # integration event should have been added and db.commit called
+    # integration event should have been queued and db.commit called
     assert fake_db.commit_called is True
-    assert any(isinstance(a, IntegrationAuditLog) for a in fake_db.added)
+    assert audit_events.events() == ["demo_fixtures_created"]
 
 
 def test_seed_forbidden_when_disabled(fake_user_context, monkeypatch):
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from api.models import IntegrationAuditLog
+from api.utils import integration_audit
+from api.utils.integration_audit import AuditEventWriter, emit_integration_event
+
+
+def _row(event_name: str) -> dict:
+    return {
+        "user_id": None,
+        "event": event_name,
+        "provider": None,
+        "metadata_json": {},
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def _stored_events(session_factory) -> list[str]:
+    db = session_factory()
+    try:
+        return sorted(row.event for row in db.query(IntegrationAuditLog).all())
+    finally:
+        db.close()
+
+
+def test_audit_writer_flushes_batches_in_background(session_factory):
+    writer = AuditEventWriter(
+        batch_size=2,
+        flush_interval=0.01,
+        max_queue=100,
+        session_factory=session_factory,
+    )
+    for i in range(5):
+        assert writer.enqueue(_row(f"event_{i}")) is True
+
+    writer.shutdown()
+
+    assert _stored_events(session_factory) == [f"event_{i}" for i in range(5)]
+    assert writer.pending() == 0
+
+
+def test_audit_writer_drops_and_counts_events_when_full(session_factory):
+    writer = AuditEventWriter(
+        batch_size=10,
+        flush_interval=60,
+        max_queue=2,
+        session_factory=session_factory,
+    )
+    # No flush thread, so nothing is drained while we enqueue
+    writer._ensure_started = lambda: None
+    for i in range(5):
+        writer.enqueue(_row(f"event_{i}"))
+
+    assert writer.dropped == 3
+    assert writer.flush() == 2
+    assert _stored_events(session_factory) == ["event_0", "event_1"]
+
+
+def test_audit_writer_isolates_failing_rows(session_factory):
+    writer = AuditEventWriter(
+        batch_size=10,
+        flush_interval=60,
+        max_queue=10,
+        session_factory=session_factory,
+    )
+    writer._write([_row("good"), {**_row("bad"), "event": None}, _row("other")])
+
+    assert _stored_events(session_factory) == ["good", "other"]
+    assert writer.failed == 1
+
+
+def test_emit_integration_event_queues_only_persisted_events(monkeypatch):
+    writer = AuditEventWriter(
+        batch_size=10, flush_interval=60, max_queue=10, enabled=True
+    )
+    writer._ensure_started = lambda: None
+    monkeypatch.setattr(integration_audit, "audit_writer", writer)
+    user_id = uuid4()
+
+    emit_integration_event(event="logged_only", user_id=user_id)
+    emit_integration_event(
+        event="persisted", provider="x", user_id=user_id, persist=True
+    )
+
+    assert writer.pending() == 1
+    row = writer._queue.get_nowait()
+    assert row["event"] == "persisted"
+    assert row["user_id"] == user_id
+    assert row["created_at"].tzinfo is not None
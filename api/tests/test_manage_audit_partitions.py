@@ -0,0 +1,101 @@
+from datetime import date
+from types import SimpleNamespace
+
+from api.scripts import manage_audit_partitions as partitions_module
+from api.scripts.manage_audit_partitions import (
+    add_months,
+    expired_partitions,
+    manage_audit_partitions,
+    partition_month,
+    partition_name,
+)
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_name_round_trips():
+    name = partition_name(date(2026, 10, 1))
+
+    assert name == "integration_audit_logs_p202610"
+    assert partition_month(name) == date(2026, 10, 1)
+    assert partition_month("integration_audit_logs_default") is None
+
+
+def test_expired_partitions_keeps_retention_window():
+    names = [
+        "integration_audit_logs_default",
+        "integration_audit_logs_p202603",
+        "integration_audit_logs_p202604",
+        "integration_audit_logs_p202605",
+        "integration_audit_logs_p202610",
+    ]
+
+    expired = expired_partitions(names, today=date(2026, 10, 18), retention_months=6)
+
+    # Cutoff is 2026-04-01: March ends there, April is still retained
+    assert expired == ["integration_audit_logs_p202603"]
+
+
+def test_manage_audit_partitions_skips_non_postgres(monkeypatch):
+    class FakeSession:
+        closed = False
+
+        def get_bind(self):
+            return SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
+        def close(self):
+            self.closed = True
+
+    session = FakeSession()
+    monkeypatch.setattr(partitions_module, "SessionLocal", lambda: session)
+
+    report = manage_audit_partitions(today=date(2026, 10, 18))
+
+    assert report.created == [] and report.removed == []
+    assert session.closed is True
+
+
+def test_manage_audit_partitions_prunes_default_partition(monkeypatch):
+    class FakeSession:
+        def __init__(self):
+            self.statements = []
+
+        def get_bind(self):
+            return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+        def execute(self, statement, params=None):
+            sql = str(statement)
+            self.statements.append((sql, params))
+            if "pg_inherits" in sql:
+                return SimpleNamespace(
+                    scalars=lambda: [
+                        "integration_audit_logs_default",
+                        "integration_audit_logs_p202603",
+                    ]
+                )
+            return SimpleNamespace(rowcount=7)
+
+        def commit(self):
+            pass
+
+        def close(self):
+            pass
+
+    session = FakeSession()
+    monkeypatch.setattr(partitions_module, "SessionLocal", lambda: session)
+
+    report = manage_audit_partitions(
+        months_ahead=0, detach_only=True, today=date(2026, 10, 18)
+    )
+
+    assert report.removed == ["integration_audit_logs_p202603"]
+    # Rows routed to the default partition are pruned to the same cutoff,
+    # even when expired monthly partitions are only detached
+    assert report.default_rows_deleted == 7
+    assert (
+        "DELETE FROM integration_audit_logs_default WHERE created_at < :cutoff",
+        {"cutoff": date(2026, 4, 1)},
+    ) in session.statements
@@ -5,8 +5,9 @@ from uuid import UUID, uuid4
 import pytest
 from jose import JWTError
 
-from api.models import SocialSession
+from api.models import SocialSession, User
 from api.routers import auth
+from api.services.account_deletion import AccountDeletionResult
 
 from .conftest import FakeDB, FakeQuery, create_client
 
@@ -72,11 +73,11 @@ def test_oauth_callback_success_returns_access_and_cookie(
         "validate_and_consume_state",
         lambda state: ("facebook", None),
     )
-    monkeypatch.setattr(
-        auth.fb_client,
-        "exchange_code",
-        lambda code: {"access_token": "provider-token", "expires_in": 3600},
-    )
+
+    async def _fake_fb_exchange_code(code: str):
+        return {"access_token": "provider-token", "expires_in": 3600}
+
+    monkeypatch.setattr(auth.fb_client, "exchange_code", _fake_fb_exchange_code)
 
     async def _fake_fb_user_info(access_token: str):
         return {
@@ -224,11 +225,24 @@ def test_revoke_without_session_returns_204(fake_user_context):
     assert fake_db.commit_called is False
 
 
+def _db_user(ctx) -> User:
+    return User(
+        id=ctx.user.id,
+        email=ctx.user.email,
+        full_name="Owner User",
+        avatar_url=None,
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+
+
 def test_me_returns_authenticated_user(fake_user_context):
     client = create_client(
         router=auth.router,
         prefix="/auth",
-        fake_db=FakeDB(),
+        fake_db=FakeDB(
+            query_results={User: FakeQuery(first_result=_db_user(fake_user_context))}
+        ),
         current_user=fake_user_context,
     )
 
@@ -240,8 +254,23 @@ def test_me_returns_authenticated_user(fake_user_context):
     assert data["email"] == "owner@example.com"
 
 
-def test_delete_account_deletes_user_and_clears_cookie(fake_user_context):
-    fake_db = FakeDB()
+def _record_anonymization(monkeypatch: pytest.MonkeyPatch) -> list[UUID]:
+    anonymized: list[UUID] = []
+
+    def fake_anonymize(db, user_id):
+        anonymized.append(user_id)
+        return AccountDeletionResult()
+
+    monkeypatch.setattr(auth, "anonymize_user_data", fake_anonymize)
+    return anonymized
+
+
+def test_delete_account_deletes_user_and_clears_cookie(
+    fake_user_context, monkeypatch: pytest.MonkeyPatch
+):
+    anonymized = _record_anonymization(monkeypatch)
+    user = _db_user(fake_user_context)
+    fake_db = FakeDB(query_results={User: FakeQuery(first_result=user)})
     client = create_client(
         router=auth.router,
         prefix="/auth",
@@ -252,9 +281,7 @@ def test_delete_account_deletes_user_and_clears_cookie(fake_user_context):
     response = client.delete("/auth/delete-account")
 
     assert response.status_code == 204
-    assert fake_user_context.user.email is None
-    assert fake_user_context.user.full_name == "Smazaný uživatel"
-    assert fake_user_context.user.avatar_url is None
+    assert anonymized == [user.id]
     assert fake_db.commit_called is True
     assert "refresh_token=" in response.headers.get("set-cookie", "")
 
@@ -264,26 +291,23 @@ def test_facebook_deletion_callback_success(monkeypatch: pytest.MonkeyPatch):
     import json
 
     from api.models import SocialAccount
-    from api.routers import auth
 
-    # Mock user and social account
-    fake_user = SimpleNamespace(
-        id=uuid4(),
-        email="fb-user@example.com",
-        full_name="FB User",
-        avatar_url="http://avatar",
-        cars=[],
-        social_accounts=[],
-        social_sessions=[],
-        car_drivers=[],
-    )
+    queued: list[tuple[UUID, str]] = []
+    submitted: list[UUID] = []
+    job_id = uuid4()
+
+    def fake_enqueue(db, user_id, *, confirmation_code):
+        queued.append((user_id, confirmation_code))
+        return SimpleNamespace(id=job_id)
+
+    monkeypatch.setattr(auth, "enqueue_account_deletion", fake_enqueue)
+    monkeypatch.setattr(auth.account_deletion_worker, "submit", submitted.append)
     fake_social = SimpleNamespace(
         id=uuid4(),
         provider="facebook",
         social_id="fb-123",
-        user=fake_user,
+        user_id=uuid4(),
     )
-    fake_user.social_accounts.append(fake_social)
 
     fake_db = FakeDB(query_results={SocialAccount: FakeQuery(first_result=fake_social)})
     client = create_client(router=auth.router, prefix="/auth", fake_db=fake_db)
@@ -312,10 +336,10 @@ def test_facebook_deletion_callback_success(monkeypatch: pytest.MonkeyPatch):
     assert "url" in data
     assert "deletion-status" in data["url"]
     assert "confirmation_code" in data
-    assert data["url"].endswith(f"code={data['confirmation_code']}&status=confirmed")
-    assert fake_user.email is None
-    assert fake_user.full_name == "Smazaný uživatel"
-    assert fake_user.avatar_url is None
+    assert data["url"].endswith(f"code={data['confirmation_code']}")
+    # Only queued; the worker does the anonymization
+    assert queued == [(fake_social.user_id, data["confirmation_code"])]
+    assert submitted == [job_id]
     assert fake_db.commit_called is True
 
 
@@ -350,6 +374,8 @@ def test_facebook_deletion_callback_user_not_found():
     data = response.json()
     assert "url" in data
     assert "confirmation_code" in data
+    # No job is stored, so the status page must not poll for one
+    assert data["url"].endswith(f"code={data['confirmation_code']}&status=confirmed")
     assert fake_db.commit_called is False
 
 
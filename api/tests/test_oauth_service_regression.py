@@ -87,7 +87,7 @@ def test_facebook_get_user_info_prefers_picture_data_url(
         async def get(self, *args, **kwargs):
             return _FakeResponse()
 
-    monkeypatch.setattr(oauth_service.httpx, "AsyncClient", _FakeAsyncClient)
+    monkeypatch.setattr(oauth_service, "get_http_client", _FakeAsyncClient)
     client = oauth_service.FacebookOAuthClient()
 
     user_info = asyncio.run(client.get_user_info("provider-token"))
@@ -129,7 +129,7 @@ def test_facebook_get_user_info_normalizes_http_avatar_url(
         async def get(self, *args, **kwargs):
             return _FakeResponse()
 
-    monkeypatch.setattr(oauth_service.httpx, "AsyncClient", _FakeAsyncClient)
+    monkeypatch.setattr(oauth_service, "get_http_client", _FakeAsyncClient)
     client = oauth_service.FacebookOAuthClient()
 
     user_info = asyncio.run(client.get_user_info("provider-token"))
@@ -293,3 +293,21 @@ def test_create_or_update_session_sets_expiry_and_tokens():
     assert session.expires_at > datetime.now(timezone.utc) + timedelta(minutes=50)
     assert session.created_at >= before
     assert len(added) == 1
+
+
+def test_shared_http_client_is_reused_until_closed(monkeypatch: pytest.MonkeyPatch):
+    from api.services import http_client
+
+    # Without the h2 package the client falls back to HTTP/1.1
+    monkeypatch.setattr(http_client, "find_spec", lambda name: None)
+    monkeypatch.setattr(http_client, "_client", None)
+
+    first = http_client.start_http_client()
+    assert http_client.get_http_client() is first
+
+    asyncio.run(http_client.close_http_client())
+    assert first.is_closed
+
+    second = http_client.get_http_client()
+    assert second is not first
+    asyncio.run(http_client.close_http_client())
@@ -0,0 +1,94 @@
+import json
+
+from api.benchmarks import og_render
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert og_render._percentile(values, 50) == 50.0
+    assert og_render._percentile(values, 99) == 99.0
+    assert og_render._percentile([3.0], 95) == 3.0
+
+
+def test_og_benchmark_emits_comparable_json(monkeypatch, tmp_path):
+    monkeypatch.setattr(og_render, "DESTINATIONS", {"short": "Brno"})
+    monkeypatch.setattr(og_render, "OCCUPANCY", {"Coupe": {"full": [2]}})
+
+    output = tmp_path / "og.json"
+    og_render.main(["--iterations", "2", "--warmup", "0", "--output", str(output)])
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    names = [r["name"] for r in report["results"]]
+    assert names == [
+        "draw_ride_og_image",
+        "get_fitting_font_and_text",
+        "encode_og_image",
+        "encode_og_image",
+        "encode_og_image",
+        "get_colored_seat",
+    ]
+    draw = report["results"][0]
+    assert draw["params"] == {
+        "layout": "Coupe",
+        "occupancy": "full",
+        "destination": "short",
+    }
+    assert draw["p50_ms"] <= draw["p95_ms"] <= draw["p99_ms"]
+    assert draw["output_bytes"] > 0
+    # Each case ran in its own process and reports only its own RSS growth
+    assert draw["peak_rss_kb"] > 0
+    assert 0 <= draw["rss_delta_kb"] < draw["peak_rss_kb"]
+    assert report["meta"]["iterations"] == 2
+    assert report["meta"]["isolated"] is True
+
+    # Every negotiated format is encoded, with its settings in the meta
+    encodes = {r["params"]["format"]: r for r in report["results"][2:5]}
+    assert set(encodes) == {"webp", "jpeg", "png"}
+    assert all(r["output_bytes"] > 0 for r in encodes.values())
+    assert report["meta"]["encode_options"]["webp"] == {"quality": 80}
+
+    rows = og_render.compare_reports(report, report)
+    assert len(rows) == 6
+    assert all(row["p50_ms_change_pct"] in (0.0, None) for row in rows)
+
+
+def test_compare_reports_tracks_output_size():
+    def report(webp_bytes):
+        return {
+            "results": [
+                {
+                    "name": "encode_og_image",
+                    "params": {"format": "webp"},
+                    "p50_ms": 10.0,
+                    "p95_ms": 12.0,
+                    "output_bytes": webp_bytes,
+                },
+                {
+                    "name": "get_colored_seat",
+                    "params": {},
+                    "p50_ms": 1.0,
+                    "p95_ms": 1.0,
+                    "output_bytes": None,
+                },
+            ]
+        }
+
+    # e.g. a lower OG_WEBP_QUALITY: same case, smaller output
+    encode, seat = og_render.compare_reports(report(20_000), report(15_000))
+
+    assert encode["case"] == "encode_og_image[format=webp]"
+    assert encode["output_bytes_change_pct"] == -25.0
+    assert seat["output_bytes_change_pct"] is None
+
+
+def test_og_benchmark_runs_without_rusage(monkeypatch):
+    # Windows has no resource module; RSS is then simply not reported
+    monkeypatch.setattr(og_render, "resource", None)
+    monkeypatch.setattr(og_render, "DESTINATIONS", {"short": "Brno"})
+    monkeypatch.setattr(og_render, "OCCUPANCY", {"Coupe": {"full": [2]}})
+
+    report = og_render.run_benchmarks(iterations=1, warmup=0, isolate=False)
+
+    draw = report["results"][0]
+    assert draw["peak_rss_kb"] is None
+    assert draw["rss_delta_kb"] is None
@@ -1,6 +1,8 @@
+import io
 from datetime import datetime, timezone
 from uuid import uuid4
 
+import pytest
 from fastapi.testclient import TestClient
 
 from api.models import Car, Ride
@@ -50,3 +52,443 @@ def test_format_czech_datetime():
     dt_winter = datetime(2026, 12, 24, 16, 30, tzinfo=timezone.utc)
     formatted_winter = format_czech_datetime(dt_winter)
     assert "Čtvrtek 24. 12. v 17:30" in formatted_winter
+
+
+def test_og_assets_are_decoded_once(monkeypatch):
+    from PIL import Image
+
+    from api.utils import og
+
+    og._load_logo.cache_clear()
+    og._load_car_sprite.cache_clear()
+    og._load_seat_sprite.cache_clear()
+    og._get_tinted_seat.cache_clear()
+
+    opened: list[str] = []
+    original_open = Image.open
+
+    def counting_open(fp, *args, **kwargs):
+        opened.append(str(fp))
+        return original_open(fp, *args, **kwargs)
+
+    monkeypatch.setattr(og.Image, "open", counting_open)
+
+    for _ in range(3):
+        og.draw_ride_og_image(
+            destination="Brno",
+            departure_time=datetime.now(timezone.utc),
+            car_name="Škoda Superb",
+            car_layout="Minivan",
+            occupied_seat_positions=[2, 5],
+        )
+
+    # Logo, car body and seat sprite are each read from disk only once
+    assert len(opened) == 3
+    assert og._load_car_sprite("Minivan") is og._load_car_sprite("Minivan")
+
+
+def test_og_fonts_are_memoized_per_face_and_size(monkeypatch):
+    from api.utils import og
+
+    og._resolve_font_face.cache_clear()
+    og._get_font.cache_clear()
+
+    calls: list[tuple[str, int]] = []
+    original_truetype = og.ImageFont.truetype
+
+    def counting_truetype(font, size=10, *args, **kwargs):
+        calls.append((font, size))
+        return original_truetype(font, size, *args, **kwargs)
+
+    monkeypatch.setattr(og.ImageFont, "truetype", counting_truetype)
+
+    first = og._load_font(32)
+    assert og._load_font(32) is first
+    og.get_fitting_font_and_text("Cesta do: " + "Brno " * 40, 560, 64, 28)
+    calls_after_first_fit = len(calls)
+    og.get_fitting_font_and_text("Cesta do: " + "Brno " * 40, 560, 64, 28)
+
+    assert calls_after_first_fit == len(calls)
+    assert len(calls) == len(set(calls))
+
+
+def test_get_fitting_font_and_text_shrinks_then_truncates():
+    from api.utils import og
+
+    font, text = og.get_fitting_font_and_text("Cesta do: Brno", 560, 64, 28)
+    assert text == "Cesta do: Brno"
+
+    long_text = "Cesta do: " + "Hradec Králové " * 20
+    font, text = og.get_fitting_font_and_text(long_text, 560, 64, 28)
+    assert text.endswith("...")
+    assert long_text.startswith(text[:-3])
+    assert og._text_length(font, text, 28) <= 560
+    longer = long_text[: len(text) - 2] + "..."
+    assert og._text_length(font, longer, 28) > 560
+
+
+def _make_og_ride(ride_id, passengers=None):
+    return Ride(
+        id=ride_id,
+        destination="Olomouc",
+        departure_time=datetime(2026, 7, 2, 15, 30, tzinfo=timezone.utc),
+        car=Car(name="Škoda Superb", layout=CarLayout.PRAQ),
+        passengers=passengers or [],
+    )
+
+
+def test_og_image_endpoint_serves_cached_render_and_304(monkeypatch):
+    from api.utils.og_cache import OGRenderInputs, og_image_cache
+
+    og_image_cache.clear()
+    renders: list[OGRenderInputs] = []
+    original_render = OGRenderInputs.render
+
+    def counting_render(self):
+        renders.append(self)
+        return original_render(self)
+
+    monkeypatch.setattr(OGRenderInputs, "render", counting_render)
+
+    ride_id = uuid4()
+    fake_db = FakeDB({Ride: FakeQuery(first_result=_make_og_ride(ride_id))})
+    client = create_client(router=rides.router, prefix="/api/rides", fake_db=fake_db)
+
+    first = client.get(f"/api/rides/og/{ride_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    second = client.get(f"/api/rides/og/{ride_id}")
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == etag
+    assert len(renders) == 1
+
+    not_modified = client.get(
+        f"/api/rides/og/{ride_id}", headers={"If-None-Match": f'W/"x", {etag}'}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert len(renders) == 1
+
+
+def test_og_render_key_depends_on_occupancy_only_as_a_set():
+    from api.models import Passenger
+    from api.utils.og_cache import OGRenderInputs
+
+    ride_a = _make_og_ride(
+        uuid4(), [Passenger(seat_position=3), Passenger(seat_position=2)]
+    )
+    ride_b = _make_og_ride(
+        uuid4(), [Passenger(seat_position=2), Passenger(seat_position=3)]
+    )
+    ride_c = _make_og_ride(uuid4(), [Passenger(seat_position=4)])
+
+    key_a = OGRenderInputs.from_ride(ride_a).key
+    assert key_a == OGRenderInputs.from_ride(ride_b).key
+    assert key_a != OGRenderInputs.from_ride(ride_c).key
+
+
+def test_og_image_cache_evicts_least_recently_used_by_size():
+    from api.utils.og_cache import OGImageCache
+
+    cache = OGImageCache(max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # "a" becomes most recently used
+    cache.set("c", b"cccc")
+
+    assert "b" not in cache
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.size_bytes == 8
+
+    cache.set("huge", b"x" * 11)
+    assert "huge" not in cache
+
+
+@pytest.mark.parametrize(
+    "error", ["busy", TimeoutError, "broken"], ids=["busy", "timeout", "broken"]
+)
+def test_og_image_endpoint_returns_503_when_render_pool_unavailable(monkeypatch, error):
+    from concurrent.futures.process import BrokenProcessPool
+
+    from api.utils.og_cache import og_image_cache
+    from api.utils.og_pool import OGRenderPoolBusy
+
+    og_image_cache.clear()
+    exception = {"busy": OGRenderPoolBusy, "broken": BrokenProcessPool}.get(
+        error, error
+    )
+
+    async def unavailable(inputs):
+        raise exception
+
+    monkeypatch.setattr(rides.og_render_pool, "render_async", unavailable)
+
+    ride_id = uuid4()
+    fake_db = FakeDB({Ride: FakeQuery(first_result=_make_og_ride(ride_id))})
+    client = create_client(router=rides.router, prefix="/api/rides", fake_db=fake_db)
+
+    response = client.get(f"/api/rides/og/{ride_id}")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+
+def test_og_render_pool_renders_in_worker_process():
+    import asyncio
+
+    from api.utils.og_cache import OGRenderInputs
+    from api.utils.og_pool import OGRenderPool
+
+    inputs = OGRenderInputs.from_ride(_make_og_ride(uuid4()))
+    pool = OGRenderPool(workers=1, max_pending=2, timeout=60)
+    try:
+        pool.start()
+        assert pool.render(inputs).content == inputs.render().content
+        rendered = asyncio.run(pool.render_async(inputs))
+        assert rendered.content == inputs.render().content
+    finally:
+        pool.shutdown()
+    assert pool.pending == 0
+
+
+def test_og_render_pool_rejects_jobs_beyond_max_pending(monkeypatch):
+    from concurrent.futures import Future
+
+    from api.utils.og_cache import OGRenderInputs
+    from api.utils.og_pool import OGRenderPool, OGRenderPoolBusy
+
+    class StalledExecutor:
+        def submit(self, fn, *args):
+            return Future()
+
+    pool = OGRenderPool(workers=1, max_pending=1, timeout=0.01)
+    monkeypatch.setattr(pool, "_ensure_executor", lambda: StalledExecutor())
+    inputs = OGRenderInputs.from_ride(_make_og_ride(uuid4()))
+
+    pool.submit(inputs)
+    with pytest.raises(OGRenderPoolBusy):
+        pool.render(inputs)
+    assert pool.pending == 1
+
+
+def test_og_render_pool_render_async_times_out_without_blocking(monkeypatch):
+    import asyncio
+    from concurrent.futures import Future
+
+    from api.utils.og_cache import OGRenderInputs
+    from api.utils.og_pool import OGRenderPool
+
+    class StalledExecutor:
+        def submit(self, fn, *args):
+            return Future()
+
+    pool = OGRenderPool(workers=1, max_pending=2, timeout=0.01)
+    monkeypatch.setattr(pool, "_ensure_executor", lambda: StalledExecutor())
+    inputs = OGRenderInputs.from_ride(_make_og_ride(uuid4()))
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(pool.render_async(inputs))
+    # The stalled job was cancelled and released its slot
+    assert pool.pending == 0
+
+
+def test_car_panel_is_precomposited_once_per_occupancy_variant():
+    from api.utils import og
+
+    og._get_car_panel.cache_clear()
+
+    def render(layout, occupied):
+        og.draw_ride_og_image(
+            destination="Brno",
+            departure_time=datetime.now(timezone.utc),
+            car_name="Škoda Superb",
+            car_layout=layout,
+            occupied_seat_positions=occupied,
+        )
+
+    render("Minivan", [2, 5])
+    render("Minivan", [5, 2, 2])
+    # Positions outside the layout do not create new variants
+    render("Minivan", [2, 5, 9])
+    render("Minivan", [1, 2, 5])
+    assert og._get_car_panel.cache_info().currsize == 1
+
+    render("Sedan", [2, 5])
+    assert og._get_car_panel.cache_info().currsize == 2
+
+    # The panel only ever covers the right-hand side of the canvas
+    panel, (left, top) = og._get_car_panel("Coupe", frozenset({1}))
+    assert left >= 640 and top >= 0
+    assert left + panel.width <= og.CANVAS_SIZE[0]
+
+
+def test_seat_tint_matches_per_band_scaling_and_is_memoized():
+    from PIL import Image
+
+    from api.utils import og
+
+    og._get_tinted_seat.cache_clear()
+    seat = Image.new("RGBA", (4, 1))
+    seat.putdata(
+        [(0, 0, 0, 0), (128, 128, 128, 255), (255, 255, 255, 200), (7, 99, 254, 17)]
+    )
+
+    tinted = og.get_colored_seat(seat, "#3b82f6")
+
+    expected = [
+        (int(r * 0x3B / 255.0), int(g * 0x82 / 255.0), int(b * 0xF6 / 255.0), a)
+        for r, g, b, a in (seat.getpixel((x, 0)) for x in range(4))
+    ]
+    assert [tinted.getpixel((x, 0)) for x in range(4)] == expected
+
+    assert og._get_tinted_seat("#f59e0b") is og._get_tinted_seat("#f59e0b")
+    assert og._get_tinted_seat.cache_info().misses == 1
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, "png"),
+        ("*/*", "png"),
+        ("image/*,*/*;q=0.8", "png"),
+        ("image/png,image/jpeg;q=0.9", "jpeg"),
+        ("image/avif,image/webp,image/apng,*/*;q=0.8", "webp"),
+        ("image/webp;q=0, image/jpeg", "jpeg"),
+        ("IMAGE/WEBP", "webp"),
+    ],
+)
+def test_negotiate_og_format(accept, expected):
+    from api.utils.og_cache import negotiate_og_format
+
+    assert negotiate_og_format(accept) == expected
+
+
+def test_og_image_endpoint_negotiates_webp_with_separate_etag():
+    from PIL import Image
+
+    from api.utils.og_cache import og_image_cache
+
+    og_image_cache.clear()
+    ride_id = uuid4()
+    fake_db = FakeDB({Ride: FakeQuery(first_result=_make_og_ride(ride_id))})
+    client = create_client(router=rides.router, prefix="/api/rides", fake_db=fake_db)
+
+    png = client.get(f"/api/rides/og/{ride_id}")
+    webp = client.get(f"/api/rides/og/{ride_id}", headers={"Accept": "image/webp"})
+
+    assert webp.status_code == 200
+    assert webp.headers["content-type"] == "image/webp"
+    assert webp.headers["vary"] == "Accept"
+    assert "og-encode;dur=" in webp.headers["server-timing"]
+    assert webp.headers["etag"] != png.headers["etag"]
+    assert len(webp.content) < len(png.content)
+    assert Image.open(io.BytesIO(webp.content)).size == (1200, 630)
+
+
+def test_encode_og_image_quantized_png_is_smaller():
+    from PIL import Image
+
+    from api.utils import og
+
+    canvas = og.compose_ride_og_image(
+        destination="Brno",
+        departure_time=datetime.now(timezone.utc),
+        car_name="Škoda Superb",
+        car_layout="Sedan",
+        occupied_seat_positions=[2],
+    )
+    full = og.encode_og_image(canvas)
+    quantized = og.encode_og_image(canvas, quantize=True)
+
+    assert len(quantized) < len(full)
+    assert Image.open(io.BytesIO(quantized)).mode == "P"
+    with pytest.raises(ValueError):
+        og.encode_og_image(canvas, "gif")
+
+
+def test_og_prerenderer_coalesces_burst_into_single_render(monkeypatch):
+    import threading
+
+    from api.utils import og_prerender
+    from api.utils.og_cache import OGRenderInputs, og_image_cache
+
+    og_image_cache.clear()
+    ride = _make_og_ride(uuid4())
+    rendered = threading.Event()
+    renders: list[OGRenderInputs] = []
+    original_render = OGRenderInputs.render
+
+    def counting_render(self):
+        renders.append(self)
+        result = original_render(self)
+        rendered.set()
+        return result
+
+    class _Session:
+        closed = False
+
+        def query(self, model):
+            return FakeQuery(first_result=ride)
+
+        def close(self):
+            self.closed = True
+
+    session = _Session()
+    monkeypatch.setattr(OGRenderInputs, "render", counting_render)
+    monkeypatch.setattr(og_prerender, "SessionLocal", lambda: session)
+
+    prerenderer = og_prerender.OGPrerenderer(delay=0.05)
+    for _ in range(5):
+        prerenderer.schedule(ride.id)
+    assert prerenderer.pending() == {ride.id}
+
+    assert rendered.wait(timeout=5)
+    assert len(renders) == 1
+    assert OGRenderInputs.from_ride(ride).key in og_image_cache
+    assert session.closed
+
+
+def test_og_prerenderer_disabled_and_shutdown_do_not_render():
+    from api.utils.og_prerender import OGPrerenderer
+
+    disabled = OGPrerenderer(delay=0, enabled=False)
+    disabled.schedule(uuid4())
+    assert disabled.pending() == set()
+
+    prerenderer = OGPrerenderer(delay=60)
+    prerenderer.schedule(uuid4())
+    prerenderer.shutdown()
+    assert prerenderer.pending() == set()
+
+
+def test_cancel_booking_schedules_og_prerender(fake_user_context, monkeypatch):
+    from types import SimpleNamespace
+
+    from api.models import Passenger
+
+    ride = SimpleNamespace(
+        id=uuid4(),
+        car=SimpleNamespace(owner_id=uuid4()),
+        departure_time=datetime(2099, 1, 1, tzinfo=timezone.utc),
+    )
+    booking = SimpleNamespace(user_id=fake_user_context.user.id, seat_position=2)
+    scheduled: list = []
+
+    monkeypatch.setattr(rides, "_get_ride_or_404", lambda ride_id, db: ride)
+    monkeypatch.setattr(rides.og_prerenderer, "schedule", scheduled.append)
+
+    fake_db = FakeDB({Passenger: FakeQuery(first_result=booking)})
+    client = create_client(
+        router=rides.router,
+        prefix="/rides",
+        fake_db=fake_db,
+        current_user=fake_user_context,
+    )
+    response = client.delete(f"/rides/{ride.id}/book")
+
+    assert response.status_code == 204
+    assert fake_db.deleted == [booking]
+    assert scheduled == [ride.id]
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api.models import SocialAccount, SocialSession, User
+from api.scripts import prune_social_sessions as prune_module
+from api.scripts.prune_social_sessions import prune_social_sessions
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(prune_module, "SessionLocal", session_factory)
+    return session_factory
+
+
+def _seed(Session, *, old_expired: int, old_revoked: int) -> None:
+    now = datetime.now(timezone.utc)
+    db = Session()
+    user = User(email="owner@example.com", full_name="Owner")
+    db.add(user)
+    db.flush()
+    account = SocialAccount(user_id=user.id, provider="x", social_id="x-1")
+    db.add(account)
+    db.flush()
+
+    def social_session(expires_at, revoked_at=None):
+        return SocialSession(
+            user_id=user.id,
+            social_account_id=account.id,
+            access_token="token",
+            expires_at=expires_at,
+            revoked_at=revoked_at,
+        )
+
+    db.add_all(social_session(now - timedelta(days=40)) for _ in range(old_expired))
+    db.add_all(
+        social_session(now + timedelta(days=1), now - timedelta(days=40))
+        for _ in range(old_revoked)
+    )
+    db.add_all(
+        [
+            # Active, recently expired and recently revoked sessions are kept
+            social_session(now + timedelta(days=1)),
+            social_session(now - timedelta(days=1)),
+            social_session(now + timedelta(days=1), now - timedelta(days=1)),
+        ]
+    )
+    db.commit()
+    db.close()
+
+
+def _remaining(Session) -> int:
+    db = Session()
+    try:
+        return db.query(SocialSession).count()
+    finally:
+        db.close()
+
+
+def test_prune_social_sessions_deletes_in_chunks(session_factory):
+    _seed(session_factory, old_expired=7, old_revoked=5)
+
+    stats = prune_social_sessions(retention_days=30, chunk_size=3)
+
+    assert stats.expired == 7
+    assert stats.revoked == 5
+    # 3 + 3 + 1 expired, 3 + 2 revoked
+    assert stats.chunks == 5
+    assert _remaining(session_factory) == 3
+
+
+def test_prune_social_sessions_without_candidates(session_factory):
+    _seed(session_factory, old_expired=0, old_revoked=0)
+
+    stats = prune_social_sessions()
+
+    assert stats.deleted == 0
+    assert stats.rows_per_second == 0.0
+    assert _remaining(session_factory) == 3
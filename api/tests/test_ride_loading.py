@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from api.deps import AuthenticatedUser, UserContext
+from api.models import Car, Invitation, Passenger, User
+from api.routers import cars, invitations, rides
+from api.utils.enums import InvitationStatus
+
+from .conftest import create_client, create_sqlite_engine, seed_car
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args: object) -> None:
+        self.count += 1
+
+
+def _seed(
+    engine, ride_count: int, *, first_departure: datetime | None = None
+) -> tuple[User, Car]:
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    departure = first_departure or datetime.now(timezone.utc) + timedelta(days=1)
+    seeded = seed_car(
+        db, {f"Ride {i}": departure + timedelta(hours=i) for i in range(ride_count)}
+    )
+    passengers = [
+        User(email=f"p{i}@example.com", full_name=f"Passenger {i}") for i in range(2)
+    ]
+    db.add_all(passengers)
+    db.flush()
+    for i, ride in enumerate(seeded.rides):
+        db.add_all(
+            Passenger(user_id=user.id, ride_id=ride.id, seat_position=position)
+            for position, user in enumerate(passengers, start=2)
+        )
+        for email in ("public@sitzy.local", "owner@example.com"):
+            db.add(
+                Invitation(
+                    ride_id=ride.id,
+                    invited_email=email,
+                    token=f"token-{i}-{email}",
+                    status=InvitationStatus.PENDING,
+                    expires_at=departure,
+                )
+            )
+    db.commit()
+    db.close()
+    return seeded.owner, seeded.car
+
+
+def _count_queries(ride_count: int, fetch) -> tuple[int, list[dict]]:
+    """Queries one request makes against rides seeded in a fresh session."""
+    engine = create_sqlite_engine()
+    owner, car = _seed(engine, ride_count)
+    db = sessionmaker(bind=engine)()
+    ctx = UserContext(
+        user=AuthenticatedUser(id=owner.id, email=owner.email), session_id=None
+    )
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        payload = fetch(db, ctx, car)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        db.close()
+    return counter.count, payload
+
+
+def _my_rides(db, ctx, car):
+    client = create_client(
+        router=rides.router, prefix="/rides", fake_db=db, current_user=ctx
+    )
+    return client.get("/rides/", params={"limit": 100}).json()
+
+
+def _car_rides(db, ctx, car):
+    client = create_client(
+        router=cars.router, prefix="/cars", fake_db=db, current_user=ctx
+    )
+    return client.get(f"/cars/{car.id}/rides").json()
+
+
+def _car_detail(db, ctx, car):
+    client = create_client(
+        router=cars.router, prefix="/cars", fake_db=db, current_user=ctx
+    )
+    return client.get(f"/cars/{car.id}").json()["rides"]
+
+
+def _received_invitations(db, ctx, car):
+    client = create_client(
+        router=invitations.router, prefix="/invitations", fake_db=db, current_user=ctx
+    )
+    return [inv["ride"] for inv in client.get("/invitations/received").json()]
+
+
+@pytest.mark.parametrize(
+    ("fetch", "queries"),
+    [
+        # ride_members page; rides with car, owner and driver joined;
+        # passengers; invitations
+        (_my_rides, 4),
+        # plus the car ownership check
+        (_car_rides, 4),
+        # car; owner, seats, drivers, rides; passengers; invitations
+        (_car_detail, 7),
+        # invitations; their rides; passengers; invitations
+        (_received_invitations, 4),
+    ],
+)
+def test_ride_listings_use_a_fixed_number_of_queries(fetch, queries):
+    small_count, small = _count_queries(2, fetch)
+    large_count, large = _count_queries(25, fetch)
+
+    assert len(small) == 2
+    assert len(large) == 25
+    assert small_count == large_count == queries
+    ride = large[0]
+    assert ride["driver"]["full_name"] == "Owner"
+    assert ride["car"]["owner_name"] == "Owner"
+    assert sorted(p["full_name"] for p in ride["passengers"]) == [
+        "Passenger 0",
+        "Passenger 1",
+    ]
+    assert ride["public_invite_token"].endswith("public@sitzy.local")
+
+
+def _pages(client, scope: str, limit: int) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        params = {"scope": scope, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/rides/", params=params)
+        assert response.status_code == 200
+        pages.append([ride["destination"] for ride in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_my_rides_are_keyset_paginated_by_scope(sqlite_engine):
+    # Rides 0-5 departed over the last hours, rides 6-9 are still ahead
+    owner, car = _seed(
+        sqlite_engine,
+        10,
+        first_departure=datetime.now(timezone.utc) - timedelta(hours=5, minutes=30),
+    )
+    db = sessionmaker(bind=sqlite_engine)()
+    ctx = UserContext(
+        user=AuthenticatedUser(id=owner.id, email=owner.email), session_id=None
+    )
+    client = create_client(
+        router=rides.router, prefix="/rides", fake_db=db, current_user=ctx
+    )
+
+    assert _pages(client, "upcoming", 2) == [
+        ["Ride 6", "Ride 7"],
+        ["Ride 8", "Ride 9"],
+    ]
+    assert _pages(client, "past", 4) == [
+        ["Ride 5", "Ride 4", "Ride 3", "Ride 2"],
+        ["Ride 1", "Ride 0"],
+    ]
+    db.close()
+
+
+def test_my_rides_rejects_foreign_or_garbled_cursors(sqlite_engine):
+    owner, car = _seed(sqlite_engine, 3)
+    db = sessionmaker(bind=sqlite_engine)()
+    ctx = UserContext(
+        user=AuthenticatedUser(id=owner.id, email=owner.email), session_id=None
+    )
+    client = create_client(
+        router=rides.router, prefix="/rides", fake_db=db, current_user=ctx
+    )
+    cursor = client.get("/rides/", params={"limit": 1}).headers["X-Next-Cursor"]
+
+    past = client.get("/rides/", params={"scope": "past", "cursor": cursor})
+    garbled = client.get("/rides/", params={"cursor": "not-a-cursor"})
+
+    assert past.status_code == 400
+    assert garbled.status_code == 400
+    db.close()
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, insert
+
+from api.models import CarDriver, Passenger, RideMember, User
+from api.scripts import rebuild_ride_members as rebuild_module
+from api.scripts.rebuild_ride_members import rebuild_ride_members
+from api.utils.enums import RideMemberRole
+
+from .conftest import seed_car
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(rebuild_module, "SessionLocal", session_factory)
+    return session_factory
+
+
+def _seed(db, ride_count: int = 1):
+    departure = datetime.now(timezone.utc) + timedelta(days=1)
+    seeded = seed_car(
+        db, {f"Ride {i}": departure + timedelta(hours=i) for i in range(ride_count)}
+    )
+    other = User(email="other@example.com", full_name="Other")
+    db.add(other)
+    db.commit()
+    return seeded.owner, other, seeded.car, seeded.rides
+
+
+def _members(db) -> set[tuple]:
+    return {
+        (member.user_id, member.ride_id, member.role)
+        for member in db.query(RideMember).all()
+    }
+
+
+def test_flush_keeps_ride_members_in_step_with_rides(session_factory):
+    db = session_factory()
+    owner, other, car, (ride,) = _seed(db)
+    assert _members(db) == {(owner.id, ride.id, RideMemberRole.DRIVER)}
+
+    passenger = Passenger(user_id=other.id, ride_id=ride.id, seat_position=2)
+    db.add(passenger)
+    db.commit()
+    assert _members(db) == {
+        (owner.id, ride.id, RideMemberRole.DRIVER),
+        (other.id, ride.id, RideMemberRole.PASSENGER),
+    }
+
+    # Handing the wheel to the passenger: the owner keeps the ride as owner
+    new_driver = CarDriver(car_id=car.id, driver_id=other.id)
+    db.add(new_driver)
+    db.flush()
+    ride.car_driver_id = new_driver.id
+    db.commit()
+    assert _members(db) == {
+        (owner.id, ride.id, RideMemberRole.OWNER),
+        (other.id, ride.id, RideMemberRole.DRIVER),
+    }
+
+    later = ride.departure_time + timedelta(days=2)
+    ride.departure_time = later
+    db.commit()
+    assert {member.departure_time for member in db.query(RideMember).all()} == {
+        later.replace(tzinfo=None)
+    }
+
+    db.delete(ride)
+    db.commit()
+    assert _members(db) == set()
+    db.close()
+
+
+def test_rolled_back_changes_leave_ride_members_untouched(session_factory):
+    db = session_factory()
+    owner, other, car, (ride,) = _seed(db)
+
+    db.add(Passenger(user_id=other.id, ride_id=ride.id, seat_position=2))
+    db.flush()
+    db.rollback()
+
+    assert _members(db) == {(owner.id, ride.id, RideMemberRole.DRIVER)}
+    db.close()
+
+
+def test_rebuild_ride_members_restores_rows_in_chunks(session_factory):
+    db = session_factory()
+    owner, other, car, rides = _seed(db, ride_count=5)
+    db.add_all(
+        Passenger(user_id=other.id, ride_id=ride.id, seat_position=2) for ride in rides
+    )
+    db.commit()
+    expected = _members(db)
+
+    # Simulate drift: lost rows and a row of a ride deleted behind the hook
+    db.execute(delete(RideMember).where(RideMember.user_id == other.id))
+    db.execute(
+        insert(RideMember).values(
+            user_id=owner.id,
+            ride_id=uuid4(),
+            role=RideMemberRole.OWNER,
+            departure_time=datetime.now(timezone.utc),
+        )
+    )
+    db.commit()
+
+    written = rebuild_ride_members(chunk_size=2)
+
+    assert written == 10
+    assert _members(db) == expected
+    db.close()
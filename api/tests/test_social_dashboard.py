@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from api.deps import AuthenticatedUser, UserContext
+from api.models import SocialAccount, SocialSession, User
+from api.routers import auth
+
+from .conftest import create_client
+
+
+def _seed(db, history: int) -> tuple[User, SocialSession]:
+    now = datetime.now(timezone.utc)
+    user = User(email="owner@example.com", full_name="Owner")
+    db.add(user)
+    db.flush()
+    x_account = SocialAccount(
+        user_id=user.id, provider="x", social_id="x-1", email="owner@example.com"
+    )
+    fb_account = SocialAccount(
+        user_id=user.id, provider="facebook", social_id="fb-1", email=None
+    )
+    db.add_all([x_account, fb_account])
+    db.flush()
+
+    def social_session(account, created_days_ago, revoked=False):
+        created_at = now - timedelta(days=created_days_ago)
+        return SocialSession(
+            user_id=user.id,
+            social_account_id=account.id,
+            access_token="token",
+            created_at=created_at,
+            expires_at=created_at + timedelta(days=7),
+            revoked_at=created_at + timedelta(hours=1) if revoked else None,
+        )
+
+    # Long refresh history that should not be listed
+    db.add_all(
+        social_session(x_account, 60 + day, revoked=True) for day in range(history)
+    )
+    current = social_session(x_account, 0)
+    db.add_all(
+        [
+            current,
+            social_session(x_account, 2, revoked=True),
+            social_session(fb_account, 1),
+        ]
+    )
+    db.commit()
+    return user, current
+
+
+def _client(db, user, current):
+    ctx = UserContext(
+        user=AuthenticatedUser(id=user.id, email=user.email), session_id=current.id
+    )
+    return create_client(
+        router=auth.router, prefix="/auth", fake_db=db, current_user=ctx
+    )
+
+
+def test_social_dashboard_aggregates_sessions_per_account(db):
+    user, current = _seed(db, history=50)
+
+    payload = _client(db, user, current).get("/auth/social/dashboard").json()
+
+    accounts = {account["provider"]: account for account in payload["accounts"]}
+    assert accounts["x"]["active_sessions"] == 1
+    assert accounts["facebook"]["active_sessions"] == 1
+    assert accounts["x"]["last_login_at"] is not None
+    # The 50 old revoked sessions are left out of the list
+    assert len(payload["sessions"]) == 3
+    assert payload["sessions"][0]["id"] == str(current.id)
+    assert payload["sessions"][0]["is_current"] is True
+    assert payload["has_more_sessions"] is False
+
+
+def test_social_dashboard_paginates_sessions(db):
+    user, current = _seed(db, history=0)
+    client = _client(db, user, current)
+
+    first = client.get("/auth/social/dashboard?sessions_limit=2").json()
+    second = client.get(
+        "/auth/social/dashboard?sessions_limit=2&sessions_offset=2"
+    ).json()
+
+    assert [s["is_current"] for s in first["sessions"]] == [True, False]
+    assert first["has_more_sessions"] is True
+    assert len(second["sessions"]) == 1
+    assert second["has_more_sessions"] is False
+    ids = {UUID(s["id"]) for s in first["sessions"] + second["sessions"]}
+    assert len(ids) == 3
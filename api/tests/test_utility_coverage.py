@@ -3,7 +3,10 @@ import importlib
 import json
 import logging
 import sys
+import threading
+import time
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from types import SimpleNamespace
 from uuid import uuid4
 
@@ -11,17 +14,25 @@ import httpx
 import pytest
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, ConfigDict
+from sqlalchemy import text
 from starlette.requests import Request
 
+from api import database
 from api.config import Settings
-from api.database import get_db, normalize_database_url
-from api.deps import UserContext, get_current_user
+from api.database import get_db, normalize_database_url, to_async_database_url
+from api.deps import (
+    AuthenticatedUser,
+    UserContext,
+    get_current_user,
+    get_current_user_async,
+)
 from api.models import SocialSession, User
 from api.schemas import CarFullOut, SeatOut, UserOut
 from api.services import oauth_service
 from api.utils import logging_config, logging_patterns, seats, security
 from api.utils.base_models import BaseModelWithLabels
 from api.utils.enums import CarLayout
+from api.utils.session_cache import CachedPrincipal, SessionValidationCache
 
 
 class _FakeLogger:
@@ -54,19 +65,45 @@ class _FakeQuery:
         return self._result
 
 
+class _FakeDepsResult:
+    def __init__(self, row: object | None) -> None:
+        self._row = row
+
+    def first(self) -> object | None:
+        return self._row
+
+
 class _FakeDbForDeps:
+    """Answers get_current_user's column queries from a user and session."""
+
     def __init__(self, user: object | None, session: object | None):
         self._user = user
         self._session = session
-        self._queries: list[object] = []
+        self._statements: list[object] = []
+
+    def execute(self, statement: object) -> _FakeDepsResult:
+        self._statements.append(statement)
+        user, session = self._user, self._session
+        if user is None or (self._checks_session(statement) and session is None):
+            return _FakeDepsResult(None)
+        return _FakeDepsResult(
+            SimpleNamespace(
+                id=user.id,
+                email=getattr(user, "email", None),
+                expires_at=getattr(session, "expires_at", None),
+            )
+        )
+
+    @staticmethod
+    def _checks_session(statement: object) -> bool:
+        return any(
+            column["entity"] is SocialSession
+            for column in statement.column_descriptions
+        )
 
-    def query(self, model: object) -> _FakeQuery:
-        self._queries.append(model)
-        if model is User:
-            return _FakeQuery(self._user)
-        if model is SocialSession:
-            return _FakeQuery(self._session)
-        return _FakeQuery(None)
+    @property
+    def session_checks(self) -> int:
+        return sum(self._checks_session(s) for s in self._statements)
 
 
 class _FakeSession:
@@ -243,10 +280,220 @@ def test_get_current_user_validates_token_and_session(
     )
 
     assert isinstance(context, UserContext)
-    assert context.user is user
+    assert context.user == AuthenticatedUser(id=user.id, email=None)
     assert context.session_id == session.id
 
 
+def test_to_async_database_url_swaps_driver_and_sslmode() -> None:
+    assert (
+        to_async_database_url("postgresql+psycopg2://u:p@db:5432/sitzy")
+        == "postgresql+asyncpg://u:p@db:5432/sitzy"
+    )
+    assert (
+        to_async_database_url("postgresql://u:p@db/sitzy?sslmode=require")
+        == "postgresql+asyncpg://u:p@db/sitzy?ssl=require"
+    )
+    assert to_async_database_url("sqlite:///tmp.db") == "sqlite+aiosqlite:///tmp.db"
+    with pytest.raises(ValueError):
+        to_async_database_url("mysql://u:p@db/sitzy")
+
+
+def test_get_async_db_opens_sqlite_sessions(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    # The dev setup runs on SQLite, so its async driver must be installed
+    monkeypatch.setattr(database, "DATABASE_URL", f"sqlite:///{tmp_path}/dev.db")
+    monkeypatch.setattr(database, "_async_engine", None)
+
+    async def select_one() -> object:
+        try:
+            async for db in database.get_async_db():
+                return (await db.execute(text("SELECT 1"))).scalar_one()
+        finally:
+            await database.dispose_async_engine()
+        return None
+
+    assert asyncio.run(select_one()) == 1
+
+
+def test_get_current_user_async_uses_same_resolution(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    user = SimpleNamespace(id=uuid4(), email="async@example.com")
+    session = SimpleNamespace(
+        id=uuid4(), expires_at=datetime.now(timezone.utc) + timedelta(minutes=5)
+    )
+    token = {"sub": str(user.id), "session_id": str(session.id), "type": "access"}
+    monkeypatch.setattr("api.deps.jwt.decode", lambda *args, **kwargs: token)
+    monkeypatch.setattr(
+        "api.deps.session_validation_cache",
+        SessionValidationCache(ttl=30, max_entries=10),
+    )
+    sync_db = _FakeDbForDeps(user=user, session=session)
+
+    class _AsyncDb:
+        async def execute(self, statement: object) -> _FakeDepsResult:
+            return sync_db.execute(statement)
+
+    context = asyncio.run(get_current_user_async(token="access-token", db=_AsyncDb()))
+
+    assert context.user == AuthenticatedUser(id=user.id, email="async@example.com")
+    assert sync_db.session_checks == 1
+
+
+def test_get_current_user_caches_session_validation_until_invalidated(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = SessionValidationCache(ttl=30, max_entries=10)
+    monkeypatch.setattr("api.deps.session_validation_cache", cache)
+    user = SimpleNamespace(id=uuid4(), email="cached@example.com")
+    session = SimpleNamespace(
+        id=uuid4(),
+        revoked_at=None,
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+    )
+    token = {"sub": str(user.id), "session_id": str(session.id), "type": "access"}
+    monkeypatch.setattr("api.deps.jwt.decode", lambda *args, **kwargs: token)
+
+    db = _FakeDbForDeps(user=user, session=session)
+    first = get_current_user(token="access-token", db=db)
+    second = get_current_user(token="access-token", db=db)
+    # A cache hit resolves the caller without touching the database
+    assert len(db._statements) == 1
+    assert db.session_checks == 1
+    assert second == first
+    assert second.user == AuthenticatedUser(id=user.id, email="cached@example.com")
+
+    # After revocation the session is checked against the database again
+    cache.invalidate([session.id])
+    db._session = None
+    with pytest.raises(Exception, match="Could not validate credentials"):
+        get_current_user(token="access-token", db=db)
+    assert db.session_checks == 2
+
+
+def test_session_validation_cache_respects_session_expiry_and_ttl() -> None:
+    cache = SessionValidationCache(ttl=30, max_entries=2)
+    principal = CachedPrincipal(user_id=uuid4(), email="user@example.com")
+    expired, live = uuid4(), uuid4()
+
+    cache.set(expired, principal, datetime.now(timezone.utc) - timedelta(seconds=1))
+    cache.set(live, principal, datetime.now(timezone.utc) + timedelta(hours=1))
+    assert cache.get(expired) is None
+    assert cache.get(live) == principal
+
+    # Oldest entries are evicted beyond max_entries
+    cache.set(uuid4(), principal, datetime.now(timezone.utc) + timedelta(hours=1))
+    cache.set(uuid4(), principal, datetime.now(timezone.utc) + timedelta(hours=1))
+    assert cache.get(live) is None
+    assert len(cache) == 2
+
+    disabled = SessionValidationCache(ttl=0, max_entries=2)
+    disabled.set(live, principal, datetime.now(timezone.utc) + timedelta(hours=1))
+    assert disabled.get(live) is None
+
+
+class _FakeSessionRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.reads: list[threading.Thread] = []
+
+    def get(self, key: str) -> str | None:
+        self.reads.append(threading.current_thread())
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, px: int) -> None:
+        self.values[key] = value
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_session_validation_cache_round_trips_principal_through_redis() -> None:
+    redis = _FakeSessionRedis()
+    cache = SessionValidationCache(ttl=30, max_entries=2, redis_client=redis)
+    principal = CachedPrincipal(user_id=uuid4(), email=None)
+    session_id, legacy = uuid4(), uuid4()
+
+    cache.set(session_id, principal, datetime.now(timezone.utc) + timedelta(hours=1))
+    assert cache.get(session_id) == principal
+
+    # Entries written in another format are treated as misses
+    redis.values[f"auth:session:{legacy}"] = str(principal.user_id)
+    assert cache.get(legacy) is None
+
+    cache.invalidate([session_id])
+    assert cache.get(session_id) is None
+
+
+def test_session_validation_cache_keeps_local_tier_in_front_of_redis() -> None:
+    redis = _FakeSessionRedis()
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    principal = CachedPrincipal(user_id=uuid4(), email="user@example.com")
+    session_id = uuid4()
+    worker = SessionValidationCache(
+        ttl=30, max_entries=10, redis_client=redis, local_ttl=30
+    )
+    other_worker = SessionValidationCache(
+        ttl=30, max_entries=10, redis_client=redis, local_ttl=0
+    )
+
+    worker.set(session_id, principal, expires_at)
+    assert worker.get(session_id) == principal
+    assert redis.reads == []
+    assert other_worker.get(session_id) == principal
+    assert len(redis.reads) == 1
+
+    # A revocation in one worker reaches the others once their local copy
+    # expires, immediately here with local_ttl=0
+    worker.invalidate([session_id])
+    assert other_worker.get(session_id) is None
+
+
+def test_session_validation_cache_without_redis_is_per_worker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(
+        "api.utils.session_cache.time",
+        SimpleNamespace(monotonic=lambda: clock[0], time=time.time),
+    )
+    principal = CachedPrincipal(user_id=uuid4(), email=None)
+    session_id = uuid4()
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    worker = SessionValidationCache(ttl=30, max_entries=10)
+    other_worker = SessionValidationCache(ttl=30, max_entries=10)
+    worker.set(session_id, principal, expires_at)
+    other_worker.set(session_id, principal, expires_at)
+
+    # The revoking worker forgets the session at once, the other one only
+    # once its entry expires: the documented bound is the TTL
+    worker.invalidate([session_id])
+    assert worker.get(session_id) is None
+    assert other_worker.get(session_id) == principal
+    clock[0] += 30
+    assert other_worker.get(session_id) is None
+
+
+def test_session_validation_cache_reads_redis_off_the_event_loop() -> None:
+    redis = _FakeSessionRedis()
+    cache = SessionValidationCache(
+        ttl=30, max_entries=10, redis_client=redis, local_ttl=0
+    )
+    principal = CachedPrincipal(user_id=uuid4(), email=None)
+    session_id = uuid4()
+
+    async def round_trip() -> CachedPrincipal | None:
+        await cache.set_async(
+            session_id, principal, datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+        return await cache.get_async(session_id)
+
+    assert asyncio.run(round_trip()) == principal
+    assert redis.reads and threading.main_thread() not in redis.reads
+
+
 @pytest.mark.parametrize(
     "decode_result, expected_message",
     [
@@ -415,17 +662,15 @@ def test_x_oauth_exchange_code_success_and_failure(
             return {"access_token": "token-123"}
 
     class _SuccessClient:
-        def __init__(self, *args: object, **kwargs: object) -> None:
+        def __init__(self) -> None:
             self.calls: list[tuple[str, dict[str, object], tuple[str, str]]] = []
 
-        def __enter__(self) -> "_SuccessClient":
-            return self
-
-        def __exit__(self, exc_type, exc, tb) -> None:
-            return None
-
-        def post(
-            self, url: str, data: dict[str, object], auth: tuple[str, str]
+        async def post(
+            self,
+            url: str,
+            data: dict[str, object],
+            auth: tuple[str, str],
+            timeout: httpx.Timeout,
         ) -> _SuccessResponse:
             self.calls.append((url, data, auth))
             return _SuccessResponse()
@@ -435,19 +680,27 @@ def test_x_oauth_exchange_code_success_and_failure(
             raise httpx.HTTPError("boom")
 
     class _FailureClient(_SuccessClient):
-        def post(
-            self, url: str, data: dict[str, object], auth: tuple[str, str]
+        async def post(
+            self,
+            url: str,
+            data: dict[str, object],
+            auth: tuple[str, str],
+            timeout: httpx.Timeout,
         ) -> _FailureResponse:
             self.calls.append((url, data, auth))
             return _FailureResponse()
 
-    monkeypatch.setattr(oauth_service.httpx, "Client", _SuccessClient)
-    result = oauth_service.XOAuthClient().exchange_code("code-1", "verifier-1")
+    success_client = _SuccessClient()
+    monkeypatch.setattr(oauth_service, "get_http_client", lambda: success_client)
+    result = asyncio.run(
+        oauth_service.XOAuthClient().exchange_code("code-1", "verifier-1")
+    )
     assert result == {"access_token": "token-123"}
+    assert success_client.calls[0][0] == oauth_service.XOAuthClient.TOKEN_URL
 
-    monkeypatch.setattr(oauth_service.httpx, "Client", _FailureClient)
+    monkeypatch.setattr(oauth_service, "get_http_client", _FailureClient)
     with pytest.raises(httpx.HTTPError):
-        oauth_service.XOAuthClient().exchange_code("code-2", "verifier-2")
+        asyncio.run(oauth_service.XOAuthClient().exchange_code("code-2", "verifier-2"))
 
 
 def test_x_oauth_get_user_info_success(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -479,7 +732,7 @@ def test_x_oauth_get_user_info_success(monkeypatch: pytest.MonkeyPatch) -> None:
         async def get(self, *args: object, **kwargs: object) -> _FakeResponse:
             return _FakeResponse()
 
-    monkeypatch.setattr(oauth_service.httpx, "AsyncClient", _FakeAsyncClient)
+    monkeypatch.setattr(oauth_service, "get_http_client", _FakeAsyncClient)
     result = asyncio.run(oauth_service.XOAuthClient().get_user_info("token-1"))
 
     assert result["id"] == "x-1"
@@ -497,17 +750,13 @@ def test_facebook_oauth_exchange_code_success_and_failure(
             return {"access_token": "fb-token"}
 
     class _SuccessClient:
-        def __init__(self, *args: object, **kwargs: object) -> None:
-            self.calls: list[tuple[str, dict[str, object]]] = []
+        def __init__(self) -> None:
+            self.calls: list[tuple[str, dict[str, object], httpx.Timeout]] = []
 
-        def __enter__(self) -> "_SuccessClient":
-            return self
-
-        def __exit__(self, exc_type, exc, tb) -> None:
-            return None
-
-        def get(self, url: str, params: dict[str, object]) -> _SuccessResponse:
-            self.calls.append((url, params))
+        async def get(
+            self, url: str, params: dict[str, object], timeout: httpx.Timeout
+        ) -> _SuccessResponse:
+            self.calls.append((url, params, timeout))
             return _SuccessResponse()
 
     class _FailureResponse:
@@ -515,17 +764,22 @@ def test_facebook_oauth_exchange_code_success_and_failure(
             raise httpx.HTTPError("boom")
 
     class _FailureClient(_SuccessClient):
-        def get(self, url: str, params: dict[str, object]) -> _FailureResponse:
-            self.calls.append((url, params))
+        async def get(
+            self, url: str, params: dict[str, object], timeout: httpx.Timeout
+        ) -> _FailureResponse:
+            self.calls.append((url, params, timeout))
             return _FailureResponse()
 
-    monkeypatch.setattr(oauth_service.httpx, "Client", _SuccessClient)
-    result = oauth_service.FacebookOAuthClient().exchange_code("code-1")
+    monkeypatch.setattr(oauth_service.settings, "oauth_facebook_timeout_seconds", 2.5)
+    success_client = _SuccessClient()
+    monkeypatch.setattr(oauth_service, "get_http_client", lambda: success_client)
+    result = asyncio.run(oauth_service.FacebookOAuthClient().exchange_code("code-1"))
     assert result == {"access_token": "fb-token"}
+    assert success_client.calls[0][2] == httpx.Timeout(2.5)
 
-    monkeypatch.setattr(oauth_service.httpx, "Client", _FailureClient)
+    monkeypatch.setattr(oauth_service, "get_http_client", _FailureClient)
     with pytest.raises(httpx.HTTPError):
-        oauth_service.FacebookOAuthClient().exchange_code("code-2")
+        asyncio.run(oauth_service.FacebookOAuthClient().exchange_code("code-2"))
 
 
 @pytest.mark.parametrize(
@@ -0,0 +1,164 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api.models import Passenger, Ride, User
+from api.scripts import warm_og_cache as warm_module
+from api.scripts.warm_og_cache import warm_og_cache
+from api.utils.og_cache import OGImageCache, OGRenderInputs
+from api.utils.og_pool import OGRenderPool, OGRenderPoolBusy
+
+from .conftest import seed_car
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(warm_module, "SessionLocal", session_factory)
+    return session_factory
+
+
+def _seed_rides(Session, upcoming: int, past: int) -> list[Ride]:
+    db = Session()
+    now = datetime.now(timezone.utc)
+    seeded = seed_car(
+        db,
+        {
+            **{
+                f"Destination {i}": now + timedelta(hours=i + 1)
+                for i in range(upcoming)
+            },
+            **{f"Past {i}": now - timedelta(days=i + 1) for i in range(past)},
+        },
+    )
+    passenger = User(email="passenger@example.com", full_name="Passenger")
+    db.add(passenger)
+    db.flush()
+    db.add(Passenger(ride_id=seeded.rides[0].id, user_id=passenger.id, seat_position=2))
+    db.commit()
+    db.close()
+    return seeded.rides
+
+
+def _inline_pool() -> OGRenderPool:
+    return OGRenderPool(workers=0, max_pending=2, timeout=5)
+
+
+def test_warm_og_cache_renders_only_upcoming_rides(session_factory):
+    _seed_rides(session_factory, upcoming=5, past=2)
+    cache = OGImageCache(max_bytes=10_000_000)
+
+    stats = warm_og_cache(chunk_size=2, pool=_inline_pool(), cache=cache)
+
+    assert stats.scanned == 5
+    assert stats.rendered == 5
+    assert stats.failed == 0
+    assert len(cache) == 5
+
+
+def test_warm_og_cache_skips_cached_images(session_factory):
+    _seed_rides(session_factory, upcoming=3, past=0)
+    cache = OGImageCache(max_bytes=10_000_000)
+    warm_og_cache(chunk_size=10, pool=_inline_pool(), cache=cache)
+
+    stats = warm_og_cache(chunk_size=10, pool=_inline_pool(), cache=cache)
+
+    assert stats.rendered == 0
+    assert stats.skipped == 3
+
+
+def test_warm_og_cache_cache_key_matches_endpoint(session_factory):
+    rides = _seed_rides(session_factory, upcoming=1, past=0)
+    cache = OGImageCache(max_bytes=10_000_000)
+    warm_og_cache(pool=_inline_pool(), cache=cache)
+
+    db = session_factory()
+    ride = db.query(Ride).filter(Ride.id == rides[0].id).one()
+    assert OGRenderInputs.from_ride(ride).key in cache
+    db.close()
+
+
+def test_warm_og_cache_resumes_from_checkpoint(session_factory, tmp_path):
+    rides = _seed_rides(session_factory, upcoming=4, past=0)
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(
+        json.dumps(
+            {
+                "departure_time": rides[1].departure_time.isoformat(),
+                "ride_id": str(rides[1].id),
+            }
+        )
+    )
+    cache = OGImageCache(max_bytes=10_000_000)
+
+    stats = warm_og_cache(
+        chunk_size=1, pool=_inline_pool(), cache=cache, checkpoint=str(checkpoint)
+    )
+
+    assert stats.scanned == 2
+    # A completed run removes its checkpoint
+    assert not checkpoint.exists()
+
+
+def test_warm_og_cache_counts_failed_renders(session_factory, monkeypatch):
+    _seed_rides(session_factory, upcoming=2, past=0)
+    cache = OGImageCache(max_bytes=10_000_000)
+
+    def broken_render(self):
+        raise OSError("sprite missing")
+
+    monkeypatch.setattr(OGRenderInputs, "render", broken_render)
+
+    stats = warm_og_cache(pool=_inline_pool(), cache=cache)
+
+    assert stats.failed == 2
+    assert stats.rendered == 0
+    assert len(cache) == 0
+
+
+class _LaggingPool(OGRenderPool):
+    """Inline pool that frees its only slot one submit() after a render.
+
+    Mimics the process pool, whose done-callback lowering the pending count
+    can run after wait() already returned the finished future.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(workers=0, max_pending=1, timeout=5)
+        self.rejected = 0
+        self._slot_taken = False
+
+    def submit(self, inputs):
+        if self._slot_taken:
+            self._slot_taken = False
+            self.rejected += 1
+            raise OGRenderPoolBusy
+        self._slot_taken = True
+        return super().submit(inputs)
+
+
+def test_warm_og_cache_waits_out_busy_pool(session_factory, tmp_path):
+    _seed_rides(session_factory, upcoming=3, past=0)
+    cache = OGImageCache(max_bytes=10_000_000)
+    pool = _LaggingPool()
+
+    stats = warm_og_cache(
+        chunk_size=2, pool=pool, cache=cache, checkpoint=str(tmp_path / "cp.json")
+    )
+
+    assert pool.rejected == 2
+    assert stats.rendered == 3
+    assert stats.failed == 0
+    assert len(cache) == 3
+
+
+def test_warm_og_cache_with_single_slot_process_pool(session_factory):
+    _seed_rides(session_factory, upcoming=3, past=0)
+    cache = OGImageCache(max_bytes=10_000_000)
+    pool = OGRenderPool(workers=1, max_pending=1, timeout=60)
+
+    stats = warm_og_cache(chunk_size=2, pool=pool, cache=cache)
+
+    assert stats.rendered == 3
+    assert stats.failed == 0
+    assert pool.pending == 0
@@ -0,0 +1,256 @@
+"""Disk-backed LRU of avatar image bytes served by the avatar proxy.
+
+Entries are keyed by user_id and a hash of the upstream avatar URL, so a
+new avatar URL (re-login, background refresh) is a cache miss by
+construction. The SHA-256 of the stored bytes doubles as a strong ETag.
+
+All API workers share the directory. A file's mtime is when it was
+stored and its atime when it was last served, so the byte budget and the
+LRU order are enforced on what is on disk, not on one worker's index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from api.config import settings
+from api.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+AVATAR_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+_MEDIA_TYPES = {ext: media_type for media_type, ext in AVATAR_EXTENSIONS.items()}
+_STALE_TMP_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class CachedAvatar:
+    """Avatar bytes with the metadata needed to serve them."""
+
+    content: bytes
+    media_type: str
+    etag: str
+    stored_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.stored_at
+
+
+@dataclass(frozen=True)
+class _Entry:
+    path: str
+    size: int
+    media_type: str
+    etag: str
+    stored_at: float
+
+
+def avatar_cache_key(user_id: UUID, avatar_url: str) -> str:
+    url_hash = hashlib.sha256(avatar_url.encode("utf-8")).hexdigest()[:32]
+    return f"{user_id}-{url_hash}"
+
+
+class AvatarDiskCache:
+    """Byte-bounded LRU of avatar files in a local directory.
+
+    load() indexes the files already on disk, oldest first, so the cache
+    survives restarts; the app calls it at startup. Every write re-reads
+    the directory and evicts the least recently served files until it fits
+    max_bytes again, dropping index entries other workers evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: dict[str, _Entry] = {}
+        self._size = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Index the files already on disk (done once, before serving)."""
+        with self._lock:
+            self._ensure_loaded()
+
+    def get(self, user_id: UUID, avatar_url: str) -> CachedAvatar | None:
+        """Return the cached avatar of a user for the given upstream URL."""
+        key = avatar_cache_key(user_id, avatar_url)
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            try:
+                with open(entry.path, "rb") as f:
+                    content = f.read()
+                # Record the access for LRU, keeping mtime as the store time
+                os.utime(entry.path, ns=(time.time_ns(), int(entry.stored_at * 1e9)))
+            except OSError:
+                # Evicted by another worker
+                self._forget(key)
+                return None
+        return CachedAvatar(
+            content=content,
+            media_type=entry.media_type,
+            etag=entry.etag,
+            stored_at=entry.stored_at,
+        )
+
+    def set(
+        self, user_id: UUID, avatar_url: str, content: bytes, media_type: str
+    ) -> CachedAvatar | None:
+        """Store avatar bytes, replacing older avatars of the same user.
+
+        Returns None when the content is not cacheable (unknown image type
+        or larger than the whole cache).
+        """
+        extension = AVATAR_EXTENSIONS.get(media_type)
+        if extension is None or len(content) > self.max_bytes:
+            return None
+
+        key = avatar_cache_key(user_id, avatar_url)
+        path = os.path.join(self.directory, f"{key}.{extension}")
+        etag = hashlib.sha256(content).hexdigest()
+        stored_ns = time.time_ns()
+        stored_at = stored_ns / 1e9
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                # Per-process temporary name: workers may store the same key
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.utime(tmp_path, ns=(stored_ns, stored_ns))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning("Avatar cache write failed", extra={"error": str(e)})
+                return None
+            self._entries[key] = _Entry(path, len(content), media_type, etag, stored_at)
+            self._reconcile(keep=key, stale_prefix=f"{user_id}-")
+        return CachedAvatar(content, media_type, etag, stored_at)
+
+    def clear(self) -> None:
+        """Remove every cached file."""
+        with self._lock:
+            self._ensure_loaded()
+            for _, _, path, _ in self._scan():
+                self._remove(path)
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes in the directory as of the last load or write."""
+        return self._size
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Avatar cache eviction failed", extra={"error": str(e)})
+
+    def _scan(self) -> list[tuple[int, str, str, int]]:
+        """Return (last access ns, key, path, size) of every cached file."""
+        files = []
+        for name in os.listdir(self.directory):
+            key, _, extension = name.rpartition(".")
+            if extension not in _MEDIA_TYPES:
+                # In-flight or interrupted write
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_atime_ns, key, path, stat.st_size))
+        return files
+
+    def _reconcile(
+        self, keep: str | None = None, stale_prefix: str | None = None
+    ) -> None:
+        """Enforce max_bytes on the shared directory, least recently used first."""
+        files = self._scan()
+        on_disk = {key for _, key, _, _ in files}
+        for key in [key for key in self._entries if key not in on_disk]:
+            self._entries.pop(key)
+
+        total = 0
+        kept = []
+        for file in files:
+            _, key, path, size = file
+            # Older avatars of this user, possibly stored by another worker
+            if stale_prefix and key.startswith(stale_prefix) and key != keep:
+                self._remove(path)
+                self._entries.pop(key, None)
+                continue
+            total += size
+            kept.append(file)
+
+        for _, key, path, size in sorted(kept):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._remove(path)
+            self._entries.pop(key, None)
+            total -= size
+        self._size = total
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if not name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                age = time.time() - os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            # Leftover of an interrupted write (recent ones may be in flight)
+            if age > _STALE_TMP_SECONDS:
+                self._remove(path)
+
+        for _, key, path, size in sorted(self._scan()):
+            _, _, extension = path.rpartition(".")
+            try:
+                with open(path, "rb") as f:
+                    content = f.read()
+                stored_at = os.path.getmtime(path)
+            except OSError:
+                continue
+            etag = hashlib.sha256(content).hexdigest()
+            self._entries[key] = _Entry(
+                path, size, _MEDIA_TYPES[extension], etag, stored_at
+            )
+        self._reconcile()
+
+
+avatar_cache = AvatarDiskCache(
+    directory=settings.avatar_cache_dir,
+    max_bytes=settings.avatar_cache_max_bytes,
+)
@@ -12,3 +12,21 @@ class InvitationStatus(str, Enum):
     ACCEPTED = "Accepted"
     REJECTED = "Rejected"
     EXPIRED = "Expired"
+
+
+class DeletionJobStatus(str, Enum):
+    PENDING = "Pending"
+    RUNNING = "Running"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+
+class RideScope(str, Enum):
+    UPCOMING = "upcoming"
+    PAST = "past"
+
+
+class RideMemberRole(str, Enum):
+    DRIVER = "Driver"
+    OWNER = "Owner"
+    PASSENGER = "Passenger"
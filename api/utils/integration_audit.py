@@ -1,25 +1,181 @@
+"""Integration audit events: structured log lines plus buffered DB rows.
+
+Persisted events are not written in the request transaction. They are
+queued and a background thread bulk-inserts them every `batch_size` events
+or `flush_interval` seconds, so routes never commit just for an audit row.
+When the queue is full new events are dropped (and counted) rather than
+slowing requests down.
+"""
+
 from __future__ import annotations
 
+import queue
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from api.config import settings
+from api.database import SessionLocal
 from api.models import IntegrationAuditLog
 from api.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class AuditEventWriter:
+    """Bounded queue of audit rows flushed in batches by a daemon thread."""
+
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        enabled: bool = True,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.dropped = 0
+        self.failed = 0
+        self._session_factory = session_factory
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, row: dict[str, Any]) -> bool:
+        """Queue a row for insertion; returns False if it was dropped."""
+        if not self.enabled:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(
+                    "Integration audit queue full, dropping events",
+                    extra={"dropped": dropped},
+                )
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """Write everything queued so far in the calling thread.
+
+        Returns the number of rows taken from the queue.
+        """
+        written = 0
+        while True:
+            batch: list[dict[str, Any]] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            self._write(batch)
+            written += len(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the flush thread and write the remaining events."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+            self._stop.clear()
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="integration-audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+
+    def _take_batch(self) -> list[dict[str, Any]]:
+        """Wait for an event, then collect more until the batch or time is up."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(insert(IntegrationAuditLog), batch)
+            db.commit()
+            return
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(
+                "Integration audit batch insert failed, retrying row by row",
+                extra={"error": str(e), "batch_size": len(batch)},
+            )
+            # One bad row (e.g. a user deleted meanwhile) must not lose the rest
+            for row in batch:
+                try:
+                    db.execute(insert(IntegrationAuditLog), [row])
+                    db.commit()
+                except SQLAlchemyError:
+                    db.rollback()
+                    self.failed += 1
+        finally:
+            db.close()
+
+
+audit_writer = AuditEventWriter(
+    batch_size=settings.integration_audit_batch_size,
+    flush_interval=settings.integration_audit_flush_interval_ms / 1000,
+    max_queue=settings.integration_audit_queue_size,
+    enabled=settings.integration_audit_persist_enabled,
+)
+
+
 def emit_integration_event(
     *,
     event: str,
     provider: str | None = None,
     user_id: UUID | None = None,
     metadata: dict[str, Any] | None = None,
-    db: Session | None = None,
+    persist: bool = False,
 ) -> None:
-    """Emit an integration event to logs and optionally persist it in DB."""
+    """Emit an integration event to logs and optionally queue it for the DB."""
     safe_metadata = metadata or {}
 
     logger.info(
@@ -32,14 +188,16 @@ def emit_integration_event(
         },
     )
 
-    if db is None:
+    if not persist:
         return
 
-    db.add(
-        IntegrationAuditLog(
-            user_id=user_id,
-            event=event,
-            provider=provider,
-            metadata_json=safe_metadata,
-        )
+    audit_writer.enqueue(
+        {
+            "user_id": user_id,
+            "event": event,
+            "provider": provider,
+            "metadata_json": safe_metadata,
+            # Stamped here so batching does not shift the event time
+            "created_at": datetime.now(timezone.utc),
+        }
     )
@@ -1,9 +1,13 @@
 import io
 import os
 from datetime import datetime, timedelta, timezone
+from functools import cache, lru_cache
 
 from PIL import Image, ImageDraw, ImageFont
 
+# Bump whenever the rendered output changes so cached images are not reused
+OG_RENDER_VERSION = "1"
+
 # Define coordinates for seats (percentage coordinates matching frontend SeatRenderer)
 SEAT_PERCENTAGES = {
     "Sedan": {
@@ -27,6 +31,31 @@ SEAT_PERCENTAGES = {
     },
 }
 
+ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets"
+)
+
+# Encodings the OG endpoint can serve, in order of preference
+OG_MEDIA_TYPES = {
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+CANVAS_SIZE = (1200, 630)
+BACKGROUND_COLOR = "#0f172a"
+
+# Sprite dimensions on the 1200 x 630 canvas
+LOGO_WIDTH = 180
+CAR_HEIGHT = 480
+SEAT_HEIGHT = 105
+SEAT_OCCUPIED_COLOR = "#3b82f6"
+
+# Right panel: car is centered in a 400 px wide column starting at x=680
+CAR_COLUMN_LEFT = 680
+CAR_COLUMN_WIDTH = 400
+CAR_TOP = 75
+
 # Resolve system fonts with robust fallback list
 FONT_OPTIONS = [
     "segoeui.ttf",  # Windows Segoe UI
@@ -37,14 +66,43 @@ FONT_OPTIONS = [
 ]
 
 
-def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    """Load a system TrueType font or fall back to PIL default."""
+FontType = ImageFont.FreeTypeFont | ImageFont.ImageFont
+
+
+@cache
+def _resolve_font_face() -> str | None:
+    """Return the first font in FONT_OPTIONS available on this host.
+
+    Resolved once per process so hosts without Segoe/Arial do not pay for
+    a failed lookup of every candidate on each size.
+    """
     for font_name in FONT_OPTIONS:
         try:
-            return ImageFont.truetype(font_name, size)
+            ImageFont.truetype(font_name, 12)
+            return font_name
         except OSError:
             continue
-    return ImageFont.load_default()
+    return None
+
+
+@cache
+def _get_font(face: str | None, size: int) -> FontType:
+    """Memoized font registry keyed by (face, size)."""
+    if face is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(face, size)
+
+
+def _load_font(size: int) -> FontType:
+    """Load a system TrueType font or fall back to PIL default."""
+    return _get_font(_resolve_font_face(), size)
+
+
+def _text_length(font: FontType, text: str, size: int) -> float:
+    """Measure rendered text width, estimating it for bitmap fallback fonts."""
+    if hasattr(font, "getlength"):
+        return float(font.getlength(text))
+    return len(text) * (size * 0.6)
 
 
 def get_prague_timezone(dt: datetime) -> timezone:
@@ -76,88 +134,204 @@ def format_czech_datetime(dt: datetime) -> str:
     return f"{day_name} {dt.day}. {dt.month}. v {dt.hour}:{dt.minute:02d}"
 
 
-def get_colored_seat(seat_src: Image.Image, color_hex: str) -> Image.Image:
-    """Tint the gray seat icon with color_hex while preserving details."""
+@cache
+def _tint_lut(color_hex: str) -> list[int]:
+    """256-entry lookup table per RGBA band scaling R, G, B towards color_hex."""
     color_hex = color_hex.lstrip('#')
-    tgt_r, tgt_g, tgt_b = tuple(int(color_hex[i : i + 2], 16) for i in (0, 2, 4))
+    targets = [int(color_hex[i : i + 2], 16) for i in (0, 2, 4)]
+    lut = [int(p * target / 255.0) for target in targets for p in range(256)]
+    # Alpha is left untouched
+    return lut + list(range(256))
 
-    r, g, b, a = seat_src.split()
-    r_tinted = r.point(lambda p: int(p * tgt_r / 255.0))
-    g_tinted = g.point(lambda p: int(p * tgt_g / 255.0))
-    b_tinted = b.point(lambda p: int(p * tgt_b / 255.0))
 
-    return Image.merge("RGBA", (r_tinted, g_tinted, b_tinted, a))
+def get_colored_seat(seat_src: Image.Image, color_hex: str) -> Image.Image:
+    """Tint the gray seat icon with color_hex while preserving details."""
+    return seat_src.point(_tint_lut(color_hex))
 
 
 def get_fitting_font_and_text(
     text: str, max_width: int, initial_size: int, min_size: int = 24
-) -> tuple[ImageFont.FreeTypeFont | ImageFont.ImageFont, str]:
+) -> tuple[FontType, str]:
     """Dynamically scales down the font size or truncates text with ellipsis
-    to fit max_width."""
-    size = initial_size
-    while size >= min_size:
-        font = _load_font(size)
-        if hasattr(font, "getlength"):
-            length = font.getlength(text)
+    to fit max_width.
+
+    Sizes are tried in 2px steps from initial_size down to min_size; both the
+    size and the truncation length are found by binary search, since rendered
+    width grows monotonically with each.
+    """
+    sizes = list(range(initial_size, min_size - 1, -2))
+
+    # Largest size that fits: sizes are descending, find the first fitting one
+    lo, hi = 0, len(sizes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _text_length(_load_font(sizes[mid]), text, sizes[mid]) <= max_width:
+            hi = mid
         else:
-            length = len(text) * (size * 0.6)
-
-        if length <= max_width:
-            return font, text
-        size -= 2
+            lo = mid + 1
+    if lo < len(sizes):
+        return _load_font(sizes[lo]), text
 
-    # Truncate with ellipsis if it still exceeds max_width at min_size
+    # Truncate with ellipsis if it still exceeds max_width at min_size:
+    # longest prefix (at least 3 characters) that fits together with "..."
     font = _load_font(min_size)
-    truncated_text = text
-    while len(truncated_text) > 3:
-        truncated_text = truncated_text[:-1]
-        test_text = truncated_text + "..."
-        if hasattr(font, "getlength"):
-            length = font.getlength(test_text)
+    best: str | None = None
+    lo, hi = 3, len(text) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        candidate = text[:mid] + "..."
+        if _text_length(font, candidate, min_size) <= max_width:
+            best = candidate
+            lo = mid + 1
         else:
-            length = len(test_text) * (min_size * 0.6)
-        if length <= max_width:
-            return font, test_text
+            hi = mid - 1
+    if best is not None:
+        return font, best
 
     return font, text[:10] + "..."
 
 
-def draw_ride_og_image(
+@cache
+def _load_logo() -> Image.Image | None:
+    """Load the Sitzy logo resized to LOGO_WIDTH, or None if unavailable.
+
+    Cached for the lifetime of the process; the returned image is shared and
+    must be treated as read-only.
+    """
+    logo_path = os.path.join(ASSETS_DIR, "sitzy_logo_full.png")
+    if not os.path.exists(logo_path):
+        return None
+    try:
+        with Image.open(logo_path) as logo_img:
+            logo_w, logo_h = logo_img.size
+            new_logo_h = int(LOGO_WIDTH * (logo_h / logo_w))
+            return logo_img.resize((LOGO_WIDTH, new_logo_h), Image.Resampling.LANCZOS)
+    except Exception:
+        return None
+
+
+@cache
+def _load_car_sprite(car_layout: str) -> Image.Image | None:
+    """Load the car body for a layout resized to CAR_HEIGHT (cached, read-only)."""
+    car_path = os.path.join(ASSETS_DIR, f"{car_layout.lower()}.png")
+    if not os.path.exists(car_path):
+        return None
+    try:
+        with Image.open(car_path) as car_img:
+            car_bg = car_img.convert("RGBA")
+        car_w = int(CAR_HEIGHT * (car_bg.size[0] / car_bg.size[1]))
+        return car_bg.resize((car_w, CAR_HEIGHT), Image.Resampling.LANCZOS)
+    except Exception:
+        return None
+
+
+@cache
+def _load_seat_sprite() -> Image.Image | None:
+    """Return the untinted seat sprite resized to SEAT_HEIGHT."""
+    seat_path = os.path.join(ASSETS_DIR, "seat.png")
+    if not os.path.exists(seat_path):
+        return None
+    try:
+        with Image.open(seat_path) as seat_img:
+            seat_src = seat_img.convert("RGBA")
+        seat_w = int(SEAT_HEIGHT * (seat_src.size[0] / seat_src.size[1]))
+        return seat_src.resize((seat_w, SEAT_HEIGHT), Image.Resampling.LANCZOS)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=16)
+def _get_tinted_seat(color_hex: str) -> Image.Image | None:
+    """Return the seat sprite tinted with color_hex, computed once per colour."""
+    seat_free = _load_seat_sprite()
+    if seat_free is None:
+        return None
+    return get_colored_seat(seat_free, color_hex)
+
+
+def _load_seat_sprites() -> tuple[Image.Image, Image.Image] | None:
+    """Return (free, occupied) seat sprites resized to SEAT_HEIGHT."""
+    seat_free = _load_seat_sprite()
+    seat_occupied = _get_tinted_seat(SEAT_OCCUPIED_COLOR)
+    if seat_free is None or seat_occupied is None:
+        return None
+    return seat_free, seat_occupied
+
+
+@lru_cache(maxsize=128)
+def _get_car_panel(
+    car_layout: str, occupied: frozenset[int]
+) -> tuple[Image.Image, tuple[int, int]] | None:
+    """Return the precomposited car-plus-seats panel and its canvas position.
+
+    The panel depends only on the layout and the occupied seat set, so every
+    variant (at most 64 for a Minivan) is composited once and then pasted as
+    a single opaque block. It is drawn over the solid canvas background,
+    which is all the right panel ever covers.
+    """
+    car_bg = _load_car_sprite(car_layout)
+    if car_bg is None:
+        return None
+    car_w, car_h = car_bg.size
+    car_left = CAR_COLUMN_LEFT + (CAR_COLUMN_WIDTH - car_w) // 2
+
+    # Sprites to paste in canvas coordinates, car body first
+    layers: list[tuple[Image.Image, int, int]] = [(car_bg, car_left, CAR_TOP)]
+    seat_sprites = _load_seat_sprites()
+    if seat_sprites is not None:
+        seat_free, seat_occupied = seat_sprites
+        seat_w, seat_h = seat_free.size
+        layout_pcts = SEAT_PERCENTAGES.get(car_layout, SEAT_PERCENTAGES["Sedan"])
+        for pos, coords in layout_pcts.items():
+            seat_x = car_left + int((coords["left"] / 100) * car_w)
+            seat_y = CAR_TOP + int((coords["top"] / 100) * car_h)
+            seat = seat_occupied if pos in occupied else seat_free
+            layers.append((seat, seat_x - seat_w // 2, seat_y - seat_h // 2))
+
+    left = min(x for _, x, _ in layers)
+    top = min(y for _, _, y in layers)
+    right = max(x + sprite.width for sprite, x, _ in layers)
+    bottom = max(y + sprite.height for sprite, _, y in layers)
+
+    panel = Image.new("RGBA", (right - left, bottom - top), BACKGROUND_COLOR)
+    for sprite, x, y in layers:
+        panel.paste(sprite, (x - left, y - top), sprite)
+    return panel, (left, top)
+
+
+def preload_og_assets() -> None:
+    """Decode and resize all OG sprites up front so no request pays for it."""
+    _load_logo()
+    for car_layout in SEAT_PERCENTAGES:
+        _load_car_sprite(car_layout)
+    _load_seat_sprites()
+
+
+def compose_ride_og_image(
     destination: str,
     departure_time: datetime,
     car_name: str,
     car_layout: str,  # "Sedan" | "Coupe" | "Minivan"
     occupied_seat_positions: list[int],
-) -> bytes:
-    """Generate a 1200 x 630 px Open Graph image showing ride details
+) -> Image.Image:
+    """Compose the 1200 x 630 px Open Graph canvas showing ride details
     and car occupancy layout."""
     # 1. Initialize canvas (1200 x 630 px) with deep slate color
-    width, height = 1200, 630
-    canvas = Image.new("RGBA", (width, height), "#0f172a")
+    canvas = Image.new("RGBA", CANVAS_SIZE, BACKGROUND_COLOR)
     draw = ImageDraw.Draw(canvas)
 
     # 2. Load fonts
     font_sub = _load_font(24)
 
     # 3. Draw Left Panel (Ride Details)
-    # Load and render Sitzy logo if present
-    assets_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    logo_path = os.path.join(assets_dir, "assets", "sitzy_logo_full.png")
-    if os.path.exists(logo_path):
-        try:
-            logo_img = Image.open(logo_path)
-            logo_w, logo_h = logo_img.size
-            new_logo_h = int(180 * (logo_h / logo_w))
-            logo_resized = logo_img.resize((180, new_logo_h), Image.Resampling.LANCZOS)
-            canvas.paste(
-                logo_resized,
-                (80, 70),
-                logo_resized if logo_resized.mode == "RGBA" else None,
-            )
-        except Exception:
-            # Silent fallback: logo won't be pasted, text brand name drawn instead
-            font_title = _load_font(44)
-            draw.text((80, 70), "SITZY", fill="#aa9bf7", font=font_title)
+    # Render Sitzy logo if present, otherwise fall back to the brand name
+    logo_resized = _load_logo()
+    if logo_resized is not None:
+        canvas.paste(
+            logo_resized,
+            (80, 70),
+            logo_resized if logo_resized.mode == "RGBA" else None,
+        )
     else:
         font_title = _load_font(44)
         draw.text((80, 70), "SITZY", fill="#aa9bf7", font=font_title)
@@ -195,10 +369,7 @@ def draw_ride_og_image(
     occupied_count = len(set(occupied_seat_positions) | {1})
 
     badge_text = f"Obsazeno: {occupied_count} ze {total_seats} míst"
-    if hasattr(font_sub, "getlength"):
-        text_width = font_sub.getlength(badge_text)
-    else:
-        text_width = len(badge_text) * (24 * 0.6)
+    text_width = _text_length(font_sub, badge_text, 24)
 
     badge_right = 80 + 25 + int(text_width) + 25
     badge_right = min(badge_right, 640)  # Ensure it does not overflow left boundary
@@ -215,55 +386,66 @@ def draw_ride_og_image(
     )
 
     # 4. Draw Right Panel (Car Layout Visualization)
-    # Resolve car layout file name
-    car_filename = f"{car_layout.lower()}.png"
-    car_path = os.path.join(assets_dir, "assets", car_filename)
+    # Position 1 (driver) is always occupied
+    layout_positions = SEAT_PERCENTAGES.get(car_layout, SEAT_PERCENTAGES["Sedan"])
+    occupied = frozenset(
+        pos for pos in layout_positions if pos == 1 or pos in occupied_seat_positions
+    )
+    car_panel = _get_car_panel(car_layout, occupied)
+    if car_panel is not None:
+        panel, panel_origin = car_panel
+        canvas.paste(panel, panel_origin)
 
-    if os.path.exists(car_path):
-        try:
-            car_bg = Image.open(car_path).convert("RGBA")
-            car_h = 480
-            car_w = int(car_h * (car_bg.size[0] / car_bg.size[1]))
-            car_bg = car_bg.resize((car_w, car_h), Image.Resampling.LANCZOS)
-
-            car_left = 680 + (400 - car_w) // 2
-            car_top = 75
-            canvas.paste(car_bg, (car_left, car_top), car_bg)
-
-            # Load Seat Image
-            seat_path = os.path.join(assets_dir, "assets", "seat.png")
-            if os.path.exists(seat_path):
-                seat_src = Image.open(seat_path).convert("RGBA")
-                seat_h = 105
-                seat_w = int(seat_h * (seat_src.size[0] / seat_src.size[1]))
-                seat_src = seat_src.resize((seat_w, seat_h), Image.Resampling.LANCZOS)
-
-                # Tinted variants
-                seat_occupied = get_colored_seat(seat_src, "#3b82f6")  # Blue (#3b82f6)
-                seat_free = seat_src  # Gray (untinted)
-
-                # Draw seats
-                layout_pcts = SEAT_PERCENTAGES.get(
-                    car_layout, SEAT_PERCENTAGES["Sedan"]
-                )
-                for pos, coords in layout_pcts.items():
-                    seat_x = car_left + int((coords["left"] / 100) * car_w)
-                    seat_y = car_top + int((coords["top"] / 100) * car_h)
-
-                    paste_x = seat_x - seat_w // 2
-                    paste_y = seat_y - seat_h // 2
-
-                    # Position 1 (driver) is always occupied
-                    is_occupied = (pos == 1) or (pos in occupied_seat_positions)
-
-                    if is_occupied:
-                        canvas.paste(seat_occupied, (paste_x, paste_y), seat_occupied)
-                    else:
-                        canvas.paste(seat_free, (paste_x, paste_y), seat_free)
-        except Exception:
-            pass  # If image processing errors out, serving background only
-
-    # 5. Export to PNG byte stream
-    img_byte_arr = io.BytesIO()
-    canvas.save(img_byte_arr, format="PNG")
-    return img_byte_arr.getvalue()
+    return canvas
+
+
+def encode_og_image(
+    canvas: Image.Image,
+    image_format: str = "png",
+    *,
+    quality: int = 85,
+    compress_level: int = 6,
+    quantize: bool = False,
+) -> bytes:
+    """Encode a composed OG canvas as PNG, WebP or JPEG.
+
+    quality applies to WebP and JPEG, compress_level and quantize to PNG.
+    The slate background is flat enough that a 256-colour palette PNG is
+    several times smaller than the RGBA original.
+    """
+    buffer = io.BytesIO()
+    if image_format == "jpeg":
+        canvas.convert("RGB").save(
+            buffer, format="JPEG", quality=quality, optimize=True
+        )
+    elif image_format == "webp":
+        canvas.convert("RGB").save(buffer, format="WEBP", quality=quality)
+    elif image_format == "png":
+        image = (
+            canvas.convert("RGB").quantize(256, method=Image.Quantize.FASTOCTREE)
+            if quantize
+            else canvas
+        )
+        image.save(buffer, format="PNG", compress_level=compress_level)
+    else:
+        raise ValueError(f"Unsupported OG image format: {image_format}")
+    return buffer.getvalue()
+
+
+def draw_ride_og_image(
+    destination: str,
+    departure_time: datetime,
+    car_name: str,
+    car_layout: str,  # "Sedan" | "Coupe" | "Minivan"
+    occupied_seat_positions: list[int],
+) -> bytes:
+    """Generate a 1200 x 630 px Open Graph PNG showing ride details
+    and car occupancy layout."""
+    canvas = compose_ride_og_image(
+        destination=destination,
+        departure_time=departure_time,
+        car_name=car_name,
+        car_layout=car_layout,
+        occupied_seat_positions=occupied_seat_positions,
+    )
+    return encode_og_image(canvas)
@@ -0,0 +1,276 @@
+"""Content-addressed cache for rendered Open Graph images.
+
+Images are keyed by a hash of every input that affects the rendered output,
+so identical rides share one entry and the key doubles as a strong ETag.
+Bytes live in a bounded in-process LRU with an optional shared Redis tier.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import redis as redis_lib
+
+from api.config import settings
+from api.models import Ride
+from api.utils.logging_config import get_logger
+from api.utils.og import (
+    OG_MEDIA_TYPES,
+    OG_RENDER_VERSION,
+    compose_ride_og_image,
+    encode_og_image,
+)
+
+logger = get_logger(__name__)
+
+
+def _encode_options(image_format: str) -> dict[str, Any]:
+    """Encoder settings for a format; part of the cache key."""
+    if image_format == "webp":
+        return {"quality": settings.og_webp_quality}
+    if image_format == "jpeg":
+        return {"quality": settings.og_jpeg_quality}
+    return {
+        "compress_level": settings.og_png_compress_level,
+        "quantize": settings.og_png_quantize,
+    }
+
+
+@dataclass(frozen=True)
+class RenderedOGImage:
+    """Encoded image plus timings used to tune the encoder settings."""
+
+    content: bytes
+    image_format: str
+    compose_ms: float
+    encode_ms: float
+
+    @property
+    def media_type(self) -> str:
+        return OG_MEDIA_TYPES[self.image_format]
+
+
+@dataclass(frozen=True)
+class OGRenderInputs:
+    """Everything that affects the rendered OG image of a ride."""
+
+    destination: str
+    departure_time: datetime
+    car_name: str
+    car_layout: str
+    occupied_seat_positions: tuple[int, ...]
+    image_format: str = "png"
+
+    @classmethod
+    def from_ride(cls, ride: Ride, image_format: str = "png") -> OGRenderInputs:
+        return cls(
+            destination=ride.destination,
+            departure_time=ride.departure_time,
+            car_name=ride.car.name,
+            car_layout=ride.car.layout.value,
+            occupied_seat_positions=tuple(
+                sorted({p.seat_position for p in ride.passengers})
+            ),
+            image_format=image_format,
+        )
+
+    @property
+    def key(self) -> str:
+        """Stable content hash of the inputs, usable as a strong ETag."""
+        payload = json.dumps(
+            [
+                OG_RENDER_VERSION,
+                self.destination,
+                self.departure_time.isoformat(),
+                self.car_name,
+                self.car_layout,
+                sorted(set(self.occupied_seat_positions)),
+                self.image_format,
+                _encode_options(self.image_format),
+            ],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def render(self) -> RenderedOGImage:
+        started = time.perf_counter()
+        canvas = compose_ride_og_image(
+            destination=self.destination,
+            departure_time=self.departure_time,
+            car_name=self.car_name,
+            car_layout=self.car_layout,
+            occupied_seat_positions=list(self.occupied_seat_positions),
+        )
+        composed = time.perf_counter()
+        content = encode_og_image(
+            canvas, self.image_format, **_encode_options(self.image_format)
+        )
+        return RenderedOGImage(
+            content=content,
+            image_format=self.image_format,
+            compose_ms=round((composed - started) * 1000, 2),
+            encode_ms=round((time.perf_counter() - composed) * 1000, 2),
+        )
+
+
+def negotiate_og_format(accept: str | None) -> str:
+    """Pick the smallest OG encoding the client explicitly accepts.
+
+    WebP and JPEG are only served when named in the Accept header (crawlers
+    sending */* get PNG, which every consumer of og:image understands).
+    """
+    accepted: set[str] = set()
+    for part in (accept or "").split(","):
+        media_range, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(media_range.lower())
+
+    for image_format, media_type in OG_MEDIA_TYPES.items():
+        if media_type in accepted:
+            return image_format
+    return "png"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses weak comparison, so W/ prefixed tags match too
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class OGImageCache:
+    """Byte-bounded LRU of rendered images with an optional Redis tier."""
+
+    _REDIS_PREFIX = "og:image:"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        redis_client: redis_lib.Redis | None = None,
+        redis_ttl: int = 3600,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self._redis = redis_client
+        self._redis_ttl = redis_ttl
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        """Return cached bytes, promoting Redis hits into memory."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(self._REDIS_PREFIX + key)
+        except redis_lib.RedisError as e:
+            logger.warning("OG cache Redis read failed", extra={"error": str(e)})
+            return None
+        if not isinstance(raw, bytes):
+            return None
+        self._store_local(key, raw)
+        return raw
+
+    def set(self, key: str, data: bytes) -> None:
+        """Store bytes in memory and, when configured, in Redis."""
+        self._store_local(key, data)
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(self._REDIS_PREFIX + key, data, ex=self._redis_ttl)
+        except redis_lib.RedisError as e:
+            logger.warning("OG cache Redis write failed", extra={"error": str(e)})
+
+    def exists(self, key: str) -> bool:
+        """Check both tiers without transferring the image bytes."""
+        if key in self:
+            return True
+        if self._redis is None:
+            return False
+        try:
+            return bool(self._redis.exists(self._REDIS_PREFIX + key))
+        except redis_lib.RedisError as e:
+            logger.warning("OG cache Redis read failed", extra={"error": str(e)})
+            return False
+
+    @property
+    def shared(self) -> bool:
+        """Whether entries are visible to other processes (Redis tier)."""
+        return self._redis is not None
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the Redis tier expires on its own)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def _store_local(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def _build_redis_client() -> redis_lib.Redis | None:
+    if not settings.og_cache_redis_enabled:
+        return None
+    # Binary client: the shared OAuth client decodes responses to str
+    kwargs: dict[str, Any] = {"decode_responses": False}
+    if settings.redis_url.startswith("rediss://"):
+        kwargs["ssl_cert_reqs"] = ssl.CERT_NONE
+    return redis_lib.from_url(settings.redis_url, **kwargs)  # type: ignore
+
+
+og_image_cache = OGImageCache(
+    max_bytes=settings.og_cache_max_bytes,
+    redis_client=_build_redis_client(),
+    redis_ttl=settings.og_cache_redis_ttl_seconds,
+)
@@ -0,0 +1,154 @@
+"""Dedicated process pool for CPU-bound Open Graph image rendering.
+
+Pillow compositing and PNG encoding hold the GIL, so rendering inside the
+API worker competes with every other request. Renders are shipped to a
+small pool of warm worker processes instead, with a bounded number of
+in-flight jobs so a crawler burst is shed with 503 rather than queued.
+Request handlers await render_async(), which holds no thread while the
+worker renders.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from api.config import settings
+from api.utils.logging_config import get_logger
+from api.utils.og import preload_og_assets
+from api.utils.og_cache import OGRenderInputs, RenderedOGImage
+
+logger = get_logger(__name__)
+
+
+class OGRenderPoolBusy(Exception):
+    """Raised when the render queue is full and the job was not accepted."""
+
+
+def _render_in_worker(inputs: OGRenderInputs) -> RenderedOGImage:
+    return inputs.render()
+
+
+class OGRenderPool:
+    """Bounded ProcessPoolExecutor wrapper for draw_ride_og_image.
+
+    With workers=0 the pool is disabled and images render in the calling
+    thread, which keeps tests and single-process setups simple.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        """Spawn the workers and let each preload the OG sprites and fonts."""
+        if not self.enabled:
+            return
+        with self._lock:
+            executor = self._ensure_executor()
+        # Submitting one no-op per worker forces every process to start now
+        # instead of on the first crawler request.
+        for future in [executor.submit(preload_og_assets) for _ in range(self.workers)]:
+            future.result()
+        logger.info("OG render pool started", extra={"workers": self.workers})
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def render(self, inputs: OGRenderInputs) -> RenderedOGImage:
+        """Render an OG image, raising OGRenderPoolBusy when saturated."""
+        if not self.enabled:
+            return inputs.render()
+
+        try:
+            return self.submit(inputs).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            self._discard_broken_executor()
+            raise
+
+    async def render_async(self, inputs: OGRenderInputs) -> RenderedOGImage:
+        """Await a render without tying up a thread while the worker runs.
+
+        Raises OGRenderPoolBusy when saturated, TimeoutError when the render
+        takes longer than the pool timeout and BrokenProcessPool when a
+        worker died.
+        """
+        if not self.enabled:
+            return await asyncio.to_thread(inputs.render)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(self.submit(inputs)), self.timeout
+            )
+        except BrokenProcessPool:
+            self._discard_broken_executor()
+            raise
+
+    def submit(self, inputs: OGRenderInputs) -> Future[RenderedOGImage]:
+        """Queue a render without waiting, for batch callers.
+
+        Raises OGRenderPoolBusy when max_pending jobs are already in flight.
+        A disabled pool renders inline and returns a completed future.
+        """
+        if not self.enabled:
+            done: Future[RenderedOGImage] = Future()
+            try:
+                done.set_result(inputs.render())
+            except Exception as e:
+                done.set_exception(e)
+            return done
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise OGRenderPoolBusy
+            future = self._ensure_executor().submit(_render_in_worker, inputs)
+            self._pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future[RenderedOGImage]) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _discard_broken_executor(self) -> None:
+        logger.error("OG render pool broken, restarting on next request")
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: the API process runs threads (uvicorn,
+        # the AnyIO threadpool) that must not be duplicated mid-operation.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=preload_og_assets,
+            )
+        return self._executor
+
+
+og_render_pool = OGRenderPool(
+    workers=settings.og_render_workers,
+    max_pending=settings.og_render_max_pending,
+    timeout=settings.og_render_timeout_seconds,
+)
@@ -0,0 +1,113 @@
+"""Write-through pre-rendering of ride OG images after mutations.
+
+Routes that change what a ride's OG image shows call schedule() after they
+commit. The render runs on a timer a short while later, so a burst of
+bookings on the same ride collapses into one render of its final state and
+the next crawler fetch is a cache hit.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.database import SessionLocal
+from api.models import Ride
+from api.utils.logging_config import get_logger
+from api.utils.og_cache import OGRenderInputs, og_image_cache
+from api.utils.og_pool import OGRenderPoolBusy, og_render_pool
+
+logger = get_logger(__name__)
+
+# Crawlers typically send Accept: */*, which negotiates to PNG
+PRERENDER_FORMATS = ("png",)
+
+
+def prerender_ride_og_image(
+    ride: Ride, formats: Iterable[str] = PRERENDER_FORMATS
+) -> int:
+    """Render a ride's OG image into the cache unless already cached.
+
+    Returns the number of images rendered.
+    """
+    rendered_count = 0
+    for image_format in formats:
+        inputs = OGRenderInputs.from_ride(ride, image_format)
+        key = inputs.key
+        if key in og_image_cache:
+            continue
+        og_image_cache.set(key, og_render_pool.render(inputs).content)
+        rendered_count += 1
+    return rendered_count
+
+
+class OGPrerenderer:
+    """Coalescing scheduler that re-renders a ride's OG image after a delay."""
+
+    def __init__(self, delay: float, enabled: bool = True) -> None:
+        self.delay = delay
+        self.enabled = enabled
+        self._timers: dict[UUID, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, ride_id: UUID) -> None:
+        """Queue a re-render; repeated calls within the delay are merged."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if ride_id in self._timers:
+                return
+            timer = threading.Timer(self.delay, self._run, args=(ride_id,))
+            timer.daemon = True
+            self._timers[ride_id] = timer
+        timer.start()
+
+    def pending(self) -> set[UUID]:
+        with self._lock:
+            return set(self._timers)
+
+    def shutdown(self) -> None:
+        """Cancel renders that have not started yet."""
+        with self._lock:
+            timers, self._timers = list(self._timers.values()), {}
+        for timer in timers:
+            timer.cancel()
+
+    def _run(self, ride_id: UUID) -> None:
+        # Release the slot first so a mutation during the render queues
+        # another pass instead of being lost.
+        with self._lock:
+            self._timers.pop(ride_id, None)
+
+        db: Session = SessionLocal()
+        try:
+            ride = db.query(Ride).filter(Ride.id == ride_id).first()
+            if ride is None:
+                return
+            rendered_count = prerender_ride_og_image(ride)
+            logger.debug(
+                "OG image pre-rendered",
+                extra={"ride_id": str(ride_id), "rendered": rendered_count},
+            )
+        except OGRenderPoolBusy:
+            logger.info(
+                "OG pre-render skipped, render pool saturated",
+                extra={"ride_id": str(ride_id)},
+            )
+        except Exception as e:
+            logger.warning(
+                "OG pre-render failed",
+                extra={"ride_id": str(ride_id), "error": str(e)},
+            )
+        finally:
+            db.close()
+
+
+og_prerenderer = OGPrerenderer(
+    delay=settings.og_prerender_delay_seconds,
+    enabled=settings.og_prerender_enabled,
+)
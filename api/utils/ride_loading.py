@@ -0,0 +1,27 @@
+"""Eager-loading plan for serializing rides with RideOut.from_ride.
+
+RideOut reads each ride's car and its owner, the driver, the passengers with
+their users and the invitations (for the public invite token). Left to lazy
+loading that is several queries per ride; every query that returns rides
+for RideOut applies RIDE_OUT_OPTIONS instead, so a listing costs the same
+handful of queries whatever the number of rides.
+
+Many-to-one relations are joined into the ride query; collections are
+fetched with one SELECT ... IN per relation for all rides at once. Rides
+reached through another entity nest the plan under that relation, e.g.
+``selectinload(Invitation.ride).options(*RIDE_OUT_OPTIONS)``.
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+from api.models import Car, CarDriver, Passenger, Ride
+
+RIDE_OUT_OPTIONS: tuple[_AbstractLoad, ...] = (
+    joinedload(Ride.car, innerjoin=True).joinedload(Car.owner, innerjoin=True),
+    joinedload(Ride.car_driver, innerjoin=True).joinedload(
+        CarDriver.driver, innerjoin=True
+    ),
+    selectinload(Ride.passengers).joinedload(Passenger.user, innerjoin=True),
+    selectinload(Ride.invitations),
+)
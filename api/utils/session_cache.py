@@ -0,0 +1,239 @@
+"""Short-lived cache of successful session validations for get_current_user.
+
+Access tokens live for minutes and almost every request re-checks the same
+session, so a positive validation is remembered for a few seconds together
+with the caller's identity, and a cache hit resolves the caller without a
+database round trip. Routes that revoke or delete sessions call
+invalidate() after committing, so a revoked session is rejected on the
+very next request.
+
+Every worker keeps a small in-process TTL map on the hot path. Without
+Redis that map is the whole cache, so a session revoked in one worker is
+still accepted by the other workers until their entry expires (at most
+ttl seconds). With Redis enabled the map sits in front of a shared tier
+whose entries revocations delete, and local entries only live for
+local_ttl seconds, which bounds that window accordingly. Async callers
+use get_async/set_async so the Redis round trip never blocks the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import redis as redis_lib
+
+from api.config import settings
+from api.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedPrincipal:
+    """Identity of a validated session's user, as get_current_user needs it."""
+
+    user_id: UUID
+    email: str | None
+
+
+class SessionValidationCache:
+    """TTL cache mapping a valid session_id to the principal it belongs to."""
+
+    _REDIS_PREFIX = "auth:session:"
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        redis_client: redis_lib.Redis | None = None,
+        local_ttl: float | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._redis = redis_client
+        # Only Redis-backed caches need a shorter local tier
+        self.local_ttl = ttl if local_ttl is None else min(local_ttl, ttl)
+        # session_id -> (principal, monotonic deadline)
+        self._entries: OrderedDict[UUID, tuple[CachedPrincipal, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, session_id: UUID) -> CachedPrincipal | None:
+        """Return the owning principal if the session was recently validated."""
+        if not self.enabled:
+            return None
+        principal = self._get_local(session_id)
+        if principal is not None or self._redis is None:
+            return principal
+        return self._get_shared(session_id)
+
+    async def get_async(self, session_id: UUID) -> CachedPrincipal | None:
+        """get() for the event loop: the Redis lookup runs in a thread."""
+        if not self.enabled:
+            return None
+        principal = self._get_local(session_id)
+        if principal is not None or self._redis is None:
+            return principal
+        return await asyncio.to_thread(self._get_shared, session_id)
+
+    def set(
+        self, session_id: UUID, principal: CachedPrincipal, expires_at: datetime
+    ) -> None:
+        """Remember a validated session, never beyond its own expiry."""
+        remaining = self._remaining(expires_at)
+        if remaining <= 0:
+            return
+        self._set_local(session_id, principal, remaining)
+        if self._redis is not None:
+            self._set_shared(session_id, principal, remaining)
+
+    async def set_async(
+        self, session_id: UUID, principal: CachedPrincipal, expires_at: datetime
+    ) -> None:
+        """set() for the event loop: the Redis write runs in a thread."""
+        remaining = self._remaining(expires_at)
+        if remaining <= 0:
+            return
+        self._set_local(session_id, principal, remaining)
+        if self._redis is not None:
+            await asyncio.to_thread(self._set_shared, session_id, principal, remaining)
+
+    def _remaining(self, expires_at: datetime) -> float:
+        if not self.enabled:
+            return 0.0
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+    def _get_local(self, session_id: UUID) -> CachedPrincipal | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            principal, deadline = entry
+            if deadline <= time.monotonic():
+                del self._entries[session_id]
+                return None
+            return principal
+
+    def _set_local(
+        self, session_id: UUID, principal: CachedPrincipal, remaining: float
+    ) -> None:
+        ttl = min(self.local_ttl, remaining)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(session_id, None)
+            self._entries[session_id] = (principal, time.monotonic() + ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, session_id: UUID) -> CachedPrincipal | None:
+        assert self._redis is not None
+        try:
+            raw = self._redis.get(self._REDIS_PREFIX + str(session_id))
+        except redis_lib.RedisError as e:
+            logger.warning("Session cache Redis read failed", extra={"error": str(e)})
+            return None
+        decoded = self._decode(raw)
+        if decoded is None:
+            return None
+        principal, expires_at = decoded
+        self._set_local(session_id, principal, expires_at - time.time())
+        return principal
+
+    def _set_shared(
+        self, session_id: UUID, principal: CachedPrincipal, remaining: float
+    ) -> None:
+        assert self._redis is not None
+        ttl = min(self.ttl, remaining)
+        try:
+            self._redis.set(
+                self._REDIS_PREFIX + str(session_id),
+                json.dumps(
+                    {
+                        "user_id": str(principal.user_id),
+                        "email": principal.email,
+                        # Session expiry, so local copies never outlive it
+                        "expires_at": time.time() + remaining,
+                    }
+                ),
+                px=max(int(ttl * 1000), 1),
+            )
+        except redis_lib.RedisError as e:
+            logger.warning("Session cache Redis write failed", extra={"error": str(e)})
+
+    def invalidate(self, session_ids: Iterable[UUID]) -> None:
+        """Forget sessions that were revoked or deleted."""
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+
+        with self._lock:
+            for session_id in session_ids:
+                self._entries.pop(session_id, None)
+
+        if self._redis is None:
+            return
+        try:
+            self._redis.delete(
+                *(self._REDIS_PREFIX + str(session_id) for session_id in session_ids)
+            )
+        except redis_lib.RedisError as e:
+            logger.error(
+                "Session cache Redis invalidation failed",
+                extra={"error": str(e), "session_count": len(session_ids)},
+            )
+
+    @staticmethod
+    def _decode(raw: object) -> tuple[CachedPrincipal, float] | None:
+        # Anything unreadable (e.g. an entry in an older format) is a miss
+        if not isinstance(raw, str):
+            return None
+        try:
+            data = json.loads(raw)
+            principal = CachedPrincipal(
+                user_id=UUID(data["user_id"]), email=data["email"]
+            )
+            return principal, float(data["expires_at"])
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _build_redis_client() -> redis_lib.Redis | None:
+    if not settings.auth_session_cache_redis_enabled:
+        return None
+    kwargs: dict[str, Any] = {"decode_responses": True}
+    if settings.redis_url.startswith("rediss://"):
+        kwargs["ssl_cert_reqs"] = ssl.CERT_NONE
+    return redis_lib.from_url(settings.redis_url, **kwargs)  # type: ignore
+
+
+session_validation_cache = SessionValidationCache(
+    ttl=settings.auth_session_cache_ttl_seconds,
+    max_entries=settings.auth_session_cache_max_entries,
+    redis_client=_build_redis_client(),
+    local_ttl=settings.auth_session_cache_local_ttl_seconds,
+)
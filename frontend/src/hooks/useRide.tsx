@@ -2,11 +2,14 @@ import { useState, useCallback } from 'react'
 import { isAxiosError } from 'axios'
 import { toast } from 'react-toastify'
 import instance from '../api/axios'
-import type { RideOut, RideCreate, RideUpdate } from '../types/models';
+import type { RideOut, RideCreate, RideUpdate, RideScope } from '../types/models';
+
+const RIDES_PAGE_LIMIT = 100
 
 export function useRide() {
   const [ride, setRide] = useState<RideOut | null>(null)
   const [rides, setRides] = useState<RideOut[]>([])
+  const [pastCursor, setPastCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [notFound, setNotFound] = useState(false)
@@ -26,14 +29,39 @@ export function useRide() {
     toast.error(msg)
   }
 
-  // GET /rides/ – seznam všech jízd
+  // GET /rides/ – jedna stránka jízd, kurzor další stránky je v hlavičce X-Next-Cursor
+  const fetchRidesPage = async (scope: RideScope, cursor?: string | null, limit = RIDES_PAGE_LIMIT) => {
+    const res = await instance.get<RideOut[]>('/rides/', {
+      params: { scope, limit, cursor: cursor ?? undefined },
+    })
+    return { rides: res.data, nextCursor: (res.headers['x-next-cursor'] as string | undefined) ?? null }
+  }
+
+  // Všechny nadcházející jízdy – projde všechny stránky podle kurzoru
+  const fetchAllUpcomingRides = async () => {
+    const upcoming: RideOut[] = []
+    let cursor: string | null = null
+    do {
+      const page = await fetchRidesPage('upcoming', cursor)
+      upcoming.push(...page.rides)
+      cursor = page.nextCursor
+    } while (cursor)
+    return upcoming
+  }
+
+  // Nadcházející jízdy a první stránka historie
   const fetchMyRides = useCallback(async () => {
     setLoading(true)
     setError(null)
     try {
-      const res = await instance.get<RideOut[]>('/rides/')
-      setRides(res.data) // TADY JE ZMĚNA: Ukládáme všechno, nic nemažeme
-      return res.data
+      const [upcoming, past] = await Promise.all([
+        fetchAllUpcomingRides(),
+        fetchRidesPage('past'),
+      ])
+      const all = [...upcoming, ...past.rides]
+      setRides(all)
+      setPastCursor(past.nextCursor)
+      return all
     } catch (err) {
       handleError(err, 'Nepodařilo se načíst jízdy.')
       return []
@@ -42,6 +70,36 @@ export function useRide() {
     }
   }, [])
 
+  // Další stránka historie
+  const fetchOlderRides = useCallback(async () => {
+    if (!pastCursor) return []
+    try {
+      const page = await fetchRidesPage('past', pastCursor)
+      setRides(prev => [...prev, ...page.rides])
+      setPastCursor(page.nextCursor)
+      return page.rides
+    } catch (err) {
+      toastError(err, 'Nepodařilo se načíst starší jízdy.')
+      return []
+    }
+  }, [pastCursor])
+
+  // Jen nejbližší nadcházející jízda (přehled)
+  const fetchNextRide = useCallback(async () => {
+    setLoading(true)
+    setError(null)
+    try {
+      const page = await fetchRidesPage('upcoming', null, 1)
+      setRides(page.rides)
+      return page.rides[0] ?? null
+    } catch (err) {
+      handleError(err, 'Nepodařilo se načíst jízdy.')
+      return null
+    } finally {
+      setLoading(false)
+    }
+  }, [])
+
   // GET /rides/:id
   const fetchRide = useCallback(async (rideId: string, inviteToken?: string) => {
     if (rideId === 'survey-mock-ride') {
@@ -337,7 +395,10 @@ export function useRide() {
     loading,
     error,
     notFound,
+    hasOlderRides: pastCursor !== null,
     fetchMyRides,
+    fetchOlderRides,
+    fetchNextRide,
     fetchRide,
     createRide,
     updateRide,
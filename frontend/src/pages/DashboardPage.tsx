@@ -10,12 +10,12 @@ import { getCzechVocative } from '../utils/nameUtils';
 export default function Dashboard() {
   const navigate = useNavigate();
   const { user } = useAuth();
-  const { rides, fetchMyRides, loading } = useRide();
+  const { rides, fetchNextRide, loading } = useRide();
 
   useEffect(() => {
-    fetchMyRides();
+    fetchNextRide();
     document.title = 'Sitzy - Přehled';
-  }, [fetchMyRides]);
+  }, [fetchNextRide]);
 
   const now = new Date();
   
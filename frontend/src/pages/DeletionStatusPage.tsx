@@ -1,12 +1,20 @@
+import { isAxiosError } from 'axios';
 import { useEffect, useState } from 'react';
 import { useSearchParams, useNavigate } from 'react-router';
+import instance from '../api/axios';
+import type { AccountDeletionStatus } from '../types/models';
+
+const POLL_INTERVAL_MS = 5000;
 
 export default function DeletionStatusPage() {
   const [searchParams] = useSearchParams();
   const navigate = useNavigate();
   const confirmationCode = searchParams.get('code');
   const statusParam = searchParams.get('status');
-  const [status] = useState<'confirmed' | 'pending'>((statusParam as 'confirmed' | 'pending') || 'pending');
+  const [status, setStatus] = useState<
+    'confirmed' | 'pending' | 'failed' | 'not_found'
+  >(statusParam === 'confirmed' ? 'confirmed' : 'pending');
+  const [progress, setProgress] = useState<AccountDeletionStatus | null>(null);
 
   useEffect(() => {
     // Pokud není zadán status nebo code, přesměruj na login
@@ -19,6 +27,45 @@ export default function DeletionStatusPage() {
     document.title = 'Stav smazání účtu - Sitzy';
   }, []);
 
+  useEffect(() => {
+    // Potvrzený stav je konečný, není na co se ptát
+    if (!confirmationCode || statusParam === 'confirmed') return;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let cancelled = false;
+
+    // Smazání běží na pozadí, průběžně se ptáme na jeho stav
+    const poll = async () => {
+      try {
+        const res = await instance.get<AccountDeletionStatus>(
+          `/auth/deletion-status/${encodeURIComponent(confirmationCode)}`
+        );
+        if (cancelled) return;
+        setProgress(res.data);
+        if (res.data.status === 'Completed') {
+          setStatus('confirmed');
+          return;
+        }
+        if (res.data.status === 'Failed') {
+          setStatus('failed');
+          return;
+        }
+      } catch (err) {
+        if (cancelled) return;
+        if (isAxiosError(err) && err.response?.status === 404) {
+          setStatus('not_found');
+          return;
+        }
+      }
+      timer = setTimeout(poll, POLL_INTERVAL_MS);
+    };
+    poll();
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [confirmationCode, statusParam]);
+
   return (
     <div className="page-container flex-col py-12">
       <div className="page-content max-w-lg mx-auto p-6">
@@ -54,6 +101,40 @@ export default function DeletionStatusPage() {
                 Pokud si to rozmyslíte, můžete se znovu přihlásit a vytvořit nový účet.
               </p>
             </>
+          ) : status === 'failed' || status === 'not_found' ? (
+            <>
+              <div className="w-16 h-16 mx-auto mb-4 rounded-full bg-red-100 dark:bg-red-900 flex items-center justify-center">
+                <svg
+                  className="w-8 h-8 text-red-600 dark:text-red-400"
+                  fill="none"
+                  stroke="currentColor"
+                  viewBox="0 0 24 24"
+                >
+                  <path
+                    strokeLinecap="round"
+                    strokeLinejoin="round"
+                    strokeWidth={2}
+                    d="M6 18L18 6M6 6l12 12"
+                  />
+                </svg>
+              </div>
+              <h1 className="text-2xl font-bold mb-3">
+                {status === 'failed'
+                  ? 'Smazání se nepodařilo dokončit'
+                  : 'Požadavek nebyl nalezen'}
+              </h1>
+              <p className="text-gray-600 dark:text-gray-400 mb-6">
+                {status === 'failed'
+                  ? 'Při mazání vašich dat došlo k chybě. Kontaktujte nás prosím a uveďte potvrzovací kód.'
+                  : 'K tomuto potvrzovacímu kódu neevidujeme žádný požadavek na smazání dat.'}
+              </p>
+              {confirmationCode && (
+                <div className="bg-gray-100 dark:bg-gray-800 rounded-lg p-3">
+                  <p className="text-xs text-gray-500 mb-1">Potvrzovací kód:</p>
+                  <code className="text-sm font-mono">{confirmationCode}</code>
+                </div>
+              )}
+            </>
           ) : (
             <>
               <div className="w-16 h-16 mx-auto mb-4 rounded-full bg-blue-100 dark:bg-blue-900 flex items-center justify-center">
@@ -81,6 +162,11 @@ export default function DeletionStatusPage() {
               <p className="text-gray-600 dark:text-gray-400">
                 Váš požadavek na smazání dat je v procesu.
               </p>
+              {progress && progress.rides_total > 0 && (
+                <p className="text-sm text-gray-500 mt-2">
+                  Smazáno jízd: {progress.rides_deleted} / {progress.rides_total}
+                </p>
+              )}
             </>
           )}
         </div>
@@ -37,7 +37,7 @@ function RideStatusBadge({ departureTime }: { departureTime: string }) {
 
 export default function RidesPage() {
   const navigate = useNavigate()
-  const { rides, loading, error, fetchMyRides } = useRide()
+  const { rides, loading, error, hasOlderRides, fetchMyRides, fetchOlderRides } = useRide()
   const { user } = useAuth()
   
   const [searchQuery, setSearchQuery] = useState('')
@@ -155,6 +155,14 @@ export default function RidesPage() {
             </div>
           </button>
         ))}
+        {hasOlderRides && timeFilter !== 'upcoming' && (
+          <button
+            onClick={() => fetchOlderRides()}
+            className="button-secondary mx-auto mt-2"
+          >
+            Načíst starší jízdy
+          </button>
+        )}
       </div>
     )
   }
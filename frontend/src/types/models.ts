@@ -41,10 +41,22 @@ export interface IntegrationAuditEvent {
   metadata: Record<string, unknown>;
 }
 
+export type DeletionJobStatus = 'Pending' | 'Running' | 'Completed' | 'Failed';
+
+export interface AccountDeletionStatus {
+  confirmation_code: string;
+  status: DeletionJobStatus;
+  requested_at: string;
+  completed_at: string | null;
+  rides_total: number;
+  rides_deleted: number;
+}
+
 export interface SocialDashboard {
   accounts: SocialAccountDashboardInfo[];
   sessions: SocialSessionInfo[];
   events: IntegrationAuditEvent[];
+  has_more_sessions: boolean;
 }
 
 export interface Car {
@@ -69,6 +81,8 @@ export interface PassengerOut {
   avatar_url: string | null;
 }
 
+export type RideScope = 'upcoming' | 'past';
+
 export interface RideOut {
   id: string;
   car_id: string;